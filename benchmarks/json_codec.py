@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark the JSON codec on AppMagic ``publisher-applications`` pages.
+
+Compares stdlib ``json`` with the backend picked by :mod:`core.infra.codec`
+(orjson / msgspec when installed) and measures what the fetcher → parser
+hand-over costs with the old ``dumps().encode()`` → ``loads()`` round trip
+versus passing the decoded object through ``RawItem.data``.
+
+No captured API responses are kept in the repository, so by default the
+pages are synthetic, shaped like the response (12 countries of 30-day and
+lifetime metrics per app).  Pass captured pages with ``--payload`` to
+benchmark real data.
+
+Usage:
+    python benchmarks/json_codec.py                       # synthetic pages
+    python benchmarks/json_codec.py --payload page1.json page2.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.infra import codec
+from core.models import RawItem
+
+COUNTRIES = ["WW", "US", "GB", "DE", "FR", "JP", "KR", "CN", "BR", "SE", "IN", "CA"]
+
+
+def synthetic_page(n_apps: int = 100, seed: int = 0) -> List[Dict[str, Any]]:
+    """One page (PAGE_SIZE=100) shaped like the AppMagic API response."""
+    rnd = random.Random(seed)
+
+    def metrics() -> List[Dict[str, Any]]:
+        return [
+            {"country": c, "downloads": rnd.randint(0, 10**7), "revenue": rnd.random() * 10**6}
+            for c in COUNTRIES
+        ]
+
+    return [
+        {
+            "id": 10**8 + i,
+            "name": f"Application {i} – Puzzle Adventure",
+            "icon": f"https://static.appmagic.rocks/icons/{i}.png",
+            "releaseDate": "2021-03-14",
+            "contains_ads": bool(i % 2),
+            "has_in_app_purchases": True,
+            "metrics_30d": metrics(),
+            "metrics_lifetime": metrics(),
+            "applications": [
+                {
+                    "store": [s],
+                    "store_application_id": f"com.example.app{i}.{s}",
+                    "name": f"Application {i}",
+                    "url": f"https://store.example/{s}/app{i}",
+                }
+                for s in (1, 2)
+            ],
+            "tags": [{"id": t, "name": f"tag-{t}"} for t in range(8)],
+        }
+        for i in range(n_apps)
+    ]
+
+
+def load_pages(paths: List[str]) -> List[Any]:
+    pages = []
+    for path in paths:
+        with open(path, "rb") as fh:
+            pages.append(json.loads(fh.read()))
+    return pages
+
+
+def bench(label: str, fn, number: int) -> float:
+    best = min(timeit.repeat(fn, number=number, repeat=5)) / number
+    print(f"  {label:<44} {best * 1e3:8.3f} ms")
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--payload", nargs="*", help="captured AppMagic JSON pages")
+    parser.add_argument("--number", type=int, default=50)
+    args = parser.parse_args()
+
+    pages = load_pages(args.payload) if args.payload else [synthetic_page(seed=s) for s in range(5)]
+    docs = [{"united_publisher_id": 1, "company": {"name": "X"}, "applications": p, "from_offset": 0} for p in pages]
+    blobs = [json.dumps(d).encode() for d in docs]
+    size = sum(map(len, blobs)) / len(blobs)
+    source = "captured" if args.payload else "synthetic"
+    print(f"{len(pages)} {source} page(s), avg {size / 1024:.1f} KiB, codec backend: {codec.BACKEND}")
+
+    print(f"decode ({len(pages)} pages)")
+    base = bench("stdlib json.loads", lambda: [json.loads(b) for b in blobs], args.number)
+    fast = bench(f"codec.loads ({codec.BACKEND})", lambda: [codec.loads(b) for b in blobs], args.number)
+    print(f"  speed-up: {base / fast:.1f}x")
+
+    print(f"encode ({len(pages)} pages)")
+    base = bench("stdlib json.dumps().encode()", lambda: [json.dumps(d).encode() for d in docs], args.number)
+    fast = bench(f"codec.dumps ({codec.BACKEND})", lambda: [codec.dumps(d) for d in docs], args.number)
+    print(f"  speed-up: {base / fast:.1f}x")
+
+    print(f"fetcher -> parser hand-over ({len(pages)} pages)")
+    round_trip = bench(
+        "RawItem(payload=dumps) + json.loads",
+        lambda: [json.loads(RawItem(source="s", payload=json.dumps(d).encode()).payload) for d in docs],
+        args.number,
+    )
+    pass_through = bench(
+        "RawItem(data=obj).load_json()",
+        lambda: [RawItem(source="s", data=d).load_json() for d in docs],
+        args.number,
+    )
+    print(f"  speed-up: {round_trip / pass_through:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
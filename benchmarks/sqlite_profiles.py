@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark the SQLite PRAGMA profiles on our sink workloads.
+
+For every profile in :data:`core.infra.db.PROFILES` (plus the previous
+WAL-only defaults) a fresh database file is written through the real
+``DatabaseSink`` (FI short interest, current + history topics) and
+``TcgDatabaseSink`` (price history), then read back with the queries the
+Discord commands run.  Rows are synthetic but shaped like the real feeds.
+
+Usage:
+    python benchmarks/sqlite_profiles.py
+    python benchmarks/sqlite_profiles.py --positions 20000 --prices 100000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.infra.db import PROFILES, Database, configure_databases
+from core.models import ParsedItem
+from plugins.fi_shortinterest.sinks import DatabaseSink
+from plugins.tcgplayer.sinks import TcgDatabaseSink
+
+
+def fi_items(n: int, seed: int = 0) -> List[ParsedItem]:
+    rnd = random.Random(seed)
+    items = []
+    for i in range(n):
+        company = f"Company {i % 400} AB"
+        stamp = f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}T{i % 24:02d}:00:00"
+        pct = round(rnd.random() * 5, 2)
+        items.append(ParsedItem(topic="fi.short.aggregate", content={
+            "lei": f"LEI{i % 400:016d}", "company_name": company, "position_percent": pct,
+            "latest_position_date": stamp[:10], "timestamp": stamp,
+        }))
+        items.append(ParsedItem(topic="fi.short.aggregate.diff", content={
+            "lei": f"LEI{i % 400:016d}", "company_name": company, "position_percent": pct,
+            "latest_position_date": stamp[:10], "event_timestamp": f"{stamp}.{i:06d}",
+            "old_pct": pct - 0.1, "new_pct": pct,
+        }))
+        items.append(ParsedItem(topic="fi.short.positions.diff", content={
+            "entity_name": f"Fund {i % 150}", "issuer_name": company, "isin": f"SE{i % 400:010d}",
+            "position_percent": pct, "position_date": stamp[:10],
+            "event_timestamp": f"{stamp}.{i:06d}", "old_pct": pct - 0.1, "new_pct": pct,
+        }))
+    return items
+
+
+def tcg_items(n: int, seed: int = 0) -> List[ParsedItem]:
+    rnd = random.Random(seed)
+    return [
+        ParsedItem(topic="tcg.price_history", content={
+            "product_id": 500000 + i % 2000, "sku_id": str(7000000 + i % 6000),
+            "variant": "Normal", "language": "English", "condition": "Near Mint",
+            "market_price": round(rnd.random() * 300, 2), "quantity_sold": rnd.randint(0, 50),
+            "low_sale_price": 1.0, "high_sale_price": 400.0,
+            "bucket_start_date": f"2024-{1 + (i // 6000) % 12:02d}-{1 + (i // 72000) % 28:02d}",
+        })
+        for i in range(n)
+    ]
+
+
+async def write(sink, items: List[ParsedItem]) -> float:
+    start = time.perf_counter()
+    async with sink:
+        for item in items:
+            await sink.handle(item)
+    return time.perf_counter() - start
+
+
+async def read(fi_path: str, tcg_path: str, profile: Optional[str], rounds: int) -> float:
+    db = Database(fi_path, pooled=True, readers=2, profile=profile)
+    tcg = Database(tcg_path, profile=profile)
+    start = time.perf_counter()
+    for i in range(rounds):
+        await db.fetch_all(
+            "SELECT DISTINCT company_name FROM short_positions_history "
+            "WHERE LOWER(company_name) LIKE ? ORDER BY company_name LIMIT 5",
+            (f"company {i % 40}%",),
+        )
+        await db.fetch_all(
+            "SELECT event_timestamp, position_percent FROM short_positions_history "
+            "WHERE company_name = ? AND event_timestamp >= ? ORDER BY event_timestamp",
+            (f"Company {i % 400} AB", "2024-06-01"),
+        )
+        await db.fetch_all(
+            "SELECT event_timestamp, entity_name, isin, position_percent FROM position_holders_history "
+            "WHERE event_timestamp <= ? ORDER BY event_timestamp, entity_name, isin",
+            ("2024-09-01",),
+        )
+        await tcg.fetch_all(
+            "SELECT bucket_start_date, AVG(market_price) FROM price_history "
+            "WHERE product_id = ? GROUP BY bucket_start_date",
+            (500000 + i % 2000,),
+        )
+    elapsed = time.perf_counter() - start
+    await db.close()
+    await tcg.close()
+    return elapsed
+
+
+async def run_profile(profile: Optional[str], args, workdir: str) -> Dict[str, float]:
+    label = profile or "wal-only"
+    fi_path = os.path.join(workdir, f"fi-{label}.db")
+    tcg_path = os.path.join(workdir, f"tcg-{label}.db")
+    if profile is not None:
+        configure_databases({fi_path: profile, tcg_path: profile})
+    return {
+        "fi write": await write(DatabaseSink(fi_path), fi_items(args.positions)),
+        "tcg write": await write(TcgDatabaseSink(tcg_path), tcg_items(args.prices)),
+        "reads": await read(fi_path, tcg_path, profile, args.rounds),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--positions", type=int, default=5000, help="FI snapshots (3 rows each)")
+    parser.add_argument("--prices", type=int, default=30000, help="TCG price history rows")
+    parser.add_argument("--rounds", type=int, default=50, help="read query rounds")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        results = {}
+        for profile in [None, *PROFILES]:
+            results[profile or "wal-only"] = await run_profile(profile, args, workdir)
+
+    columns = list(next(iter(results.values())))
+    print(f"{'profile':<12}" + "".join(f"{c:>12}" for c in columns))
+    for label, timings in results.items():
+        print(f"{label:<12}" + "".join(f"{timings[c]:>11.2f}s" for c in columns))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-row upsert cost on the DatabaseSink / AppMagicSink column layouts.
+
+"before" rebuilds the ``INSERT ... ON CONFLICT`` string for every row;
+"after" uses the ``lru_cache``'d :meth:`Database._upsert_sql`.  Two numbers
+are reported per layout set:
+
+* SQL generation alone (what changed in Python)
+* a full ``Database.upsert`` per row against an in-memory database, for
+  scale: generation is a small fraction of it, so the cache is a wash
+  end-to-end
+
+Usage:
+    python benchmarks/upsert_sql.py
+    python benchmarks/upsert_sql.py --rows 5000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import timeit
+from typing import Any, Dict, List, Sequence, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.infra.db import Database
+from plugins.appmagic.sinks import AppMagicSink
+from plugins.fi_shortinterest.sinks import DatabaseSink
+
+Layout = Tuple[str, Tuple[str, ...], Tuple[str, ...]]
+
+
+def layouts() -> Dict[str, List[Layout]]:
+    """(table, columns, pk) for every topic each sink writes."""
+
+    def collect(cfgs: Dict[str, Dict[str, Any]]) -> List[Layout]:
+        return [(c["table"], tuple(sorted(c["cols"])), tuple(c["pk"])) for c in cfgs.values()]
+
+    return {
+        "DatabaseSink": collect(DatabaseSink.topics),
+        "AppMagicSink": collect(AppMagicSink.topics),
+    }
+
+
+def make_rows(layout: Layout, n: int) -> List[Dict[str, Any]]:
+    _, columns, _ = layout
+    return [{col: f"{col}-{i}" if i % 2 else i for col in columns} for i in range(n)]
+
+
+async def create_tables(db: Database, sink_layouts: Sequence[Layout]) -> None:
+    seen = set()
+    for table, columns, pk in sink_layouts:
+        if table in seen:
+            continue
+        seen.add(table)
+        await db.execute(
+            f"CREATE TABLE {table} ({', '.join(columns)}, PRIMARY KEY ({', '.join(pk)}))"
+        )
+    await db.commit()
+
+
+async def upsert_rows(sink_layouts: Sequence[Layout], n: int) -> float:
+    """Seconds per row for ``Database.upsert`` across all layouts."""
+    db = Database(":memory:")
+    await db.connect()
+    await create_tables(db, sink_layouts)
+    work = [(layout, make_rows(layout, n)) for layout in sink_layouts]
+    start = time.perf_counter()
+    for (table, _, pk), rows in work:
+        for row in rows:
+            await db.upsert(table, row, list(pk))
+    elapsed = time.perf_counter() - start
+    await db.close()
+    return elapsed / (n * len(sink_layouts))
+
+
+def report(label: str, before: float, after: float) -> None:
+    print(f"  {label:<30} {before * 1e6:8.2f} us/row -> {after * 1e6:8.2f} us/row"
+          f"  ({before / after:.1f}x)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2000, help="rows per table layout")
+    args = parser.parse_args()
+
+    for sink, sink_layouts in layouts().items():
+        print(f"{sink}: {len(sink_layouts)} layout(s), {args.rows} rows each")
+
+        def build(fn):
+            return lambda: [fn(t, c, p) for t, c, p in sink_layouts]
+
+        number = 2000
+        before = min(timeit.repeat(build(Database._upsert_sql.__wrapped__), number=number, repeat=5))
+        after = min(timeit.repeat(build(Database._upsert_sql), number=number, repeat=5))
+        per_call = number * len(sink_layouts)
+        report("SQL generation", before / per_call, after / per_call)
+
+        upsert = min(asyncio.run(upsert_rows(sink_layouts, args.rows)) for _ in range(3))
+        print(f"  {'Database.upsert (:memory:)':<30} {upsert * 1e6:8.2f} us/row"
+              f"  (generation saved {(before - after) / per_call / upsert:.1%} of it)")
+
+
+if __name__ == "__main__":
+    main()
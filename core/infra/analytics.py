@@ -0,0 +1,289 @@
+"""
+analytics.py – read-only DuckDB layer over the SQLite stores and Parquet archives.
+
+Full-history aggregates (analysis scripts, ad-hoc notebooks) are scans, and
+a vectorized engine does them in one pass instead of one SQLite query per
+key.  :class:`Analytics` opens an in-memory DuckDB, ``ATTACH``es each
+database file ``READ_ONLY`` under an alias and, for history tables, unions
+the ``<table>_all`` view with the table's Parquet archive written by
+:mod:`core.infra.retention`::
+
+    with Analytics({"tcg": snapshot("db/tcg.db")}, archive_dir="archive") as a:
+        df = a.dollar_volume_by_set({"Base Set": [12345, 12346]})
+
+duckdb is an optional dependency (``pip install .[analytics]``); its
+``sqlite`` extension is installed on first use.  Results are pandas
+DataFrames.
+"""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Sequence, Union
+
+try:
+    import duckdb
+except ImportError:  # pragma: no cover - depends on installed extras
+    duckdb = None
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["Analytics", "DEFAULT_DATABASES", "available"]
+
+# alias -> database file, as laid out by pipelines.yml
+DEFAULT_DATABASES: Dict[str, str] = {
+    "tcg": "db/tcg.db",
+    "fi": "db/fi_shortinterest.db",
+    "apps": "db/mobile_analytics.db",
+}
+
+
+def available() -> bool:
+    return duckdb is not None
+
+
+class Analytics:
+    """DuckDB connection with the SQLite databases attached read-only."""
+
+    def __init__(
+        self,
+        databases: Optional[Mapping[str, Union[str, Path]]] = None,
+        *,
+        archive_dir: Optional[Union[str, Path]] = None,
+        threads: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+            databases: alias -> SQLite file (default :data:`DEFAULT_DATABASES`,
+                skipping files that do not exist)
+            archive_dir: Retention archive root; ``<archive_dir>/<db name>/<table>``
+                is read for history tables.  The db name is the file name up
+                to the first dot, so snapshots map to their source's archive
+            threads: DuckDB worker threads (DuckDB default if None)
+        """
+        if duckdb is None:
+            raise RuntimeError(
+                "duckdb is required for analytics; install it with "
+                "`pip install duckdb` or `pip install .[analytics]`"
+            )
+        if databases is None:
+            databases = {alias: path for alias, path in DEFAULT_DATABASES.items() if Path(path).exists()}
+        self.databases = {alias: Path(path) for alias, path in databases.items()}
+        self.archive_dir = Path(archive_dir) if archive_dir is not None else None
+        self.threads = threads
+        self._con: Optional["duckdb.DuckDBPyConnection"] = None
+
+    @property
+    def con(self) -> "duckdb.DuckDBPyConnection":
+        if self._con is None:
+            self.connect()
+        return self._con
+
+    def connect(self) -> None:
+        con = duckdb.connect(":memory:")
+        if self.threads is not None:
+            con.execute(f"SET threads = {int(self.threads)}")
+        if self.databases:
+            con.execute("INSTALL sqlite")
+            con.execute("LOAD sqlite")
+        for alias, path in self.databases.items():
+            if not path.exists():
+                raise FileNotFoundError(f"Database {path} (alias {alias}) does not exist")
+            escaped = str(path).replace("'", "''")
+            con.execute(f"ATTACH '{escaped}' AS {alias} (TYPE SQLITE, READ_ONLY)")
+        self._con = con
+        logger.debug(f"Analytics attached {', '.join(self.databases) or 'no databases'}")
+
+    def close(self) -> None:
+        if self._con is not None:
+            self._con.close()
+            self._con = None
+
+    def __enter__(self) -> "Analytics":
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------ #
+    def _archives(self, alias: str, table: str) -> Optional[str]:
+        """Glob of the table's Parquet archive, if there is one."""
+        if self.archive_dir is None:
+            return None
+        directory = self.archive_dir / self.databases[alias].name.split(".", 1)[0] / table
+        if not any(directory.glob("*.parquet")):
+            return None
+        return str(directory / "*.parquet").replace("'", "''")
+
+    def history(self, alias: str, table: str) -> str:
+        """FROM-clause source with every row of a history table: hot, partitions and archive.
+
+        Uses the ``<table>_all`` view the sinks' migrations create; archived
+        Parquet rows are appended by column name.
+        """
+        if alias not in self.databases:
+            raise KeyError(f"No database attached as '{alias}' (attached: {', '.join(self.databases)})")
+        source = f"{alias}.{table}_all"
+        archive = self._archives(alias, table)
+        if archive is None:
+            return source
+        return (
+            f"(SELECT * FROM {source} "
+            f"UNION ALL BY NAME SELECT * FROM read_parquet('{archive}', union_by_name = true))"
+        )
+
+    def query(self, sql: str, params: Optional[Sequence[Any]] = None):
+        """Run *sql* and return a pandas DataFrame."""
+        return self.con.execute(sql, list(params or [])).df()
+
+    # ------------------------------------------------------------------ #
+    def dollar_volume_by_set(
+        self,
+        sets: Mapping[str, Sequence[int]],
+        *,
+        created_at: Optional[str] = None,
+        aggregate: bool = False,
+    ):
+        """Dollar volume (market_price * quantity_sold) for the products of each set.
+
+        Args:
+            sets: set name -> product ids (a product may belong to several sets)
+            created_at: Only rows written at this ``created_at``
+            aggregate: Sum per (set_name, date) instead of one row per price row
+
+        Returns:
+            DataFrame with set_name, product_id, date, market_price,
+            quantity_sold, dollar_volume, created_at (or set_name, date,
+            dollar_volume when aggregated)
+        """
+        pairs = [(name, int(pid)) for name, pids in sets.items() for pid in pids]
+        if not pairs:
+            return self.query("SELECT NULL::VARCHAR AS set_name, NULL::DATE AS date, "
+                              "NULL::DOUBLE AS dollar_volume WHERE false")
+        values = ", ".join("(?, ?)" for _ in pairs)
+        params: list = [v for pair in pairs for v in pair]
+        rows = f"""
+            SELECT s.set_name,
+                   p.product_id,
+                   CAST(p.bucket_start_date AS DATE) AS date,
+                   CAST(p.market_price AS DOUBLE) AS market_price,
+                   CAST(p.quantity_sold AS BIGINT) AS quantity_sold,
+                   CAST(p.market_price AS DOUBLE) * p.quantity_sold AS dollar_volume,
+                   p.created_at
+              FROM {self.history("tcg", "price_history")} AS p
+              JOIN (VALUES {values}) AS s(set_name, product_id)
+                ON p.product_id = s.product_id
+             WHERE p.market_price IS NOT NULL
+               AND p.quantity_sold IS NOT NULL
+        """
+        if created_at is not None:
+            rows += " AND CAST(p.created_at AS VARCHAR) = ?"
+            params.append(created_at)
+        if aggregate:
+            sql = f"""
+                SELECT set_name, date, SUM(dollar_volume) AS dollar_volume
+                  FROM ({rows})
+                 GROUP BY set_name, date
+                 ORDER BY date, set_name
+            """
+        else:
+            sql = rows + " ORDER BY set_name, product_id, date"
+        return self.query(sql, params)
+
+    def short_interest_by_company(
+        self,
+        companies: Optional[Sequence[str]] = None,
+        *,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ):
+        """Daily closing aggregate short position (%) per company.
+
+        The last ``position_percent`` reported on each day is used, so days
+        with several FI updates count once.
+
+        Returns:
+            DataFrame with company_name, date, position_percent
+        """
+        where, params = ["TRUE"], []
+        if companies:
+            where.append(f"company_name IN ({', '.join('?' for _ in companies)})")
+            params.extend(companies)
+        if start is not None:
+            where.append("CAST(event_timestamp AS VARCHAR) >= ?")
+            params.append(start)
+        if end is not None:
+            where.append("CAST(event_timestamp AS VARCHAR) <= ?")
+            params.append(end)
+        return self.query(f"""
+            SELECT company_name,
+                   CAST(left(CAST(event_timestamp AS VARCHAR), 10) AS DATE) AS date,
+                   arg_max(CAST(position_percent AS DOUBLE), CAST(event_timestamp AS VARCHAR)) AS position_percent
+              FROM {self.history("fi", "short_positions_history")}
+             WHERE {' AND '.join(where)}
+             GROUP BY company_name, date
+             ORDER BY company_name, date
+        """, params)
+
+    def app_metrics_by_publisher(
+        self,
+        publisher_ids: Optional[Sequence[int]] = None,
+        *,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ):
+        """30-day downloads and revenue summed over each publisher's apps per scrape date.
+
+        Snapshots are only stored when an app's metrics change, so each app
+        contributes its latest snapshot on or before every scrape date.
+
+        Returns:
+            DataFrame with united_publisher_id, publisher_name, scrape_date,
+            apps, downloads_30d, revenue_30d
+        """
+        dates, where, params = ["TRUE"], ["TRUE"], []
+        if start is not None:
+            dates.append("scrape_date >= CAST(? AS DATE)")
+            params.append(start)
+        if end is not None:
+            dates.append("scrape_date <= CAST(? AS DATE)")
+            params.append(end)
+        if publisher_ids:
+            where.append(f"a.united_publisher_id IN ({', '.join('?' for _ in publisher_ids)})")
+            params.extend(int(pid) for pid in publisher_ids)
+        return self.query(f"""
+            WITH snapshots AS (
+                SELECT united_application_id,
+                       CAST(scrape_date AS DATE) AS scrape_date,
+                       snapshot_30d_downloads,
+                       CAST(snapshot_30d_revenue AS DOUBLE) AS snapshot_30d_revenue
+                  FROM {self.history("apps", "ApplicationSnapshotMetrics")}
+            ),
+            grid AS (
+                SELECT d.scrape_date, f.united_application_id
+                  FROM (SELECT DISTINCT scrape_date FROM snapshots WHERE {' AND '.join(dates)}) AS d
+                  JOIN (SELECT united_application_id, MIN(scrape_date) AS first_date
+                          FROM snapshots GROUP BY united_application_id) AS f
+                    ON f.first_date <= d.scrape_date
+            ),
+            filled AS (
+                SELECT g.scrape_date, g.united_application_id, s.snapshot_30d_downloads, s.snapshot_30d_revenue
+                  FROM grid AS g
+                  ASOF JOIN snapshots AS s
+                    ON s.united_application_id = g.united_application_id AND s.scrape_date <= g.scrape_date
+            )
+            SELECT a.united_publisher_id,
+                   any_value(p.name) AS publisher_name,
+                   m.scrape_date,
+                   COUNT(*) AS apps,
+                   SUM(m.snapshot_30d_downloads) AS downloads_30d,
+                   SUM(m.snapshot_30d_revenue) AS revenue_30d
+              FROM filled AS m
+              JOIN apps.UnitedApplications AS a ON a.united_application_id = m.united_application_id
+              LEFT JOIN apps.UnitedPublishers AS p ON p.united_publisher_id = a.united_publisher_id
+             WHERE {' AND '.join(where)}
+             GROUP BY a.united_publisher_id, m.scrape_date
+             ORDER BY a.united_publisher_id, m.scrape_date
+        """, params)
@@ -0,0 +1,209 @@
+"""
+cdc.py – in-process change-data-capture feed for committed sink writes.
+
+Every group commit of :class:`core.infra.db.BufferedWriter` (and every
+:class:`core.infra.table_sink.TableSink` delete) publishes one compact
+:class:`ChangeEvent` per row on :data:`change_bus` *after* the transaction
+committed, so subscribers never see rolled-back rows::
+
+    async with change_bus.subscribe("db/fi_shortinterest.db", tables=["short_positions_history"]) as feed:
+        async for event in feed:
+            invalidate_chart(event.new["company_name"])
+
+Each subscriber has its own bounded queue.  Publishing never blocks or
+awaits: when a slow subscriber's queue is full its oldest event is dropped
+(``overflow="drop_oldest"``, the right choice for cache invalidation) or
+the new one is (``"drop_newest"``), and ``dropped`` is counted.
+
+Nothing is captured for tables nobody subscribed to.  ``old`` values cost
+one extra ``SELECT`` per table and commit, so they are only read when a
+subscriber asks for them with ``old_values=True``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["ChangeBus", "ChangeEvent", "Subscription", "change_bus"]
+
+OVERFLOW = ("drop_oldest", "drop_newest")
+
+# queued by Subscription.close() to wake consumers waiting on an empty queue
+_CLOSED = object()
+
+
+class ChangeEvent(NamedTuple):
+    """One committed row change."""
+    db: Path                      # resolved database file
+    table: str
+    op: str                       # "upsert" | "delete"
+    pk: Tuple[Any, ...]
+    new: Optional[Dict[str, Any]]  # columns as written; None for deletes
+    old: Optional[Dict[str, Any]]  # stored row before the change, if requested and present
+    committed_at: float
+
+
+@functools.lru_cache(maxsize=64)
+def _resolve(path: Union[str, Path]) -> Path:
+    return Path(path).resolve()
+
+
+class Subscription:
+    """Bounded event queue of one subscriber; iterate it or call :meth:`get`."""
+
+    def __init__(
+        self,
+        bus: "ChangeBus",
+        db: Optional[Path],
+        tables: Optional[Set[str]],
+        maxsize: int,
+        overflow: str,
+        old_values: bool,
+    ) -> None:
+        self.bus = bus
+        self.db = db
+        self.tables = tables
+        self.overflow = overflow
+        self.old_values = old_values
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.dropped = 0
+        self.closed = False
+
+    def matches(self, db: Path, table: str) -> bool:
+        return (self.db is None or self.db == db) and (self.tables is None or table.lower() in self.tables)
+
+    def _offer(self, event: ChangeEvent) -> None:
+        try:
+            self.queue.put_nowait(event)
+            return
+        except asyncio.QueueFull:
+            pass
+        if self.overflow == "drop_oldest":
+            self.queue.get_nowait()
+            self.queue.put_nowait(event)
+        self.dropped += 1
+        if self.dropped == 1 or self.dropped % 1000 == 0:
+            logger.warning(f"CDC subscriber on {self.tables or 'all tables'} is lagging: {self.dropped} events dropped")
+
+    async def get(self) -> ChangeEvent:
+        """Next event; raises StopAsyncIteration once closed and drained."""
+        if self.closed and self.queue.empty():
+            raise StopAsyncIteration
+        event = await self.queue.get()
+        if event is _CLOSED:
+            # leave it for any other waiting consumer
+            self.queue.put_nowait(_CLOSED)
+            raise StopAsyncIteration
+        return event
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self.bus._unsubscribe(self)
+            # nothing is offered after unsubscribing; a consumer can only be
+            # blocked on an empty queue, which always has room for the marker
+            if self.queue.empty():
+                self.queue.put_nowait(_CLOSED)
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> ChangeEvent:
+        return await self.get()
+
+    async def __aenter__(self) -> "Subscription":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class ChangeBus:
+    """Broadcast committed row changes to in-process subscribers."""
+
+    def __init__(self) -> None:
+        self._subscribers: List[Subscription] = []
+        self.published = 0
+
+    def subscribe(
+        self,
+        db: Union[None, str, Path] = None,
+        tables: Optional[Iterable[str]] = None,
+        *,
+        maxsize: int = 1000,
+        overflow: str = "drop_oldest",
+        old_values: bool = False,
+    ) -> Subscription:
+        """Subscribe to changes of *tables* in *db* (``None`` = any file / any table)."""
+        if overflow not in OVERFLOW:
+            raise ValueError(f"overflow must be one of {OVERFLOW}, got {overflow!r}")
+        subscription = Subscription(
+            self,
+            _resolve(db) if db is not None else None,
+            {t.lower() for t in tables} if tables is not None else None,
+            maxsize,
+            overflow,
+            old_values,
+        )
+        self._subscribers.append(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        try:
+            self._subscribers.remove(subscription)
+        except ValueError:
+            pass
+
+    def wants(self, db: Union[str, Path], table: str) -> bool:
+        """Whether anyone listens to *table*; writers skip building events otherwise."""
+        if not self._subscribers:
+            return False
+        key = _resolve(db)
+        return any(s.matches(key, table) for s in self._subscribers)
+
+    def wants_old(self, db: Union[str, Path], table: str) -> bool:
+        key = _resolve(db)
+        return any(s.old_values and s.matches(key, table) for s in self._subscribers)
+
+    def publish(self, events: Sequence[ChangeEvent]) -> None:
+        """Fan *events* out to matching subscribers; never blocks."""
+        if not events or not self._subscribers:
+            return
+        for subscription in list(self._subscribers):
+            for event in events:
+                if subscription.matches(event.db, event.table):
+                    subscription._offer(event)
+        self.published += len(events)
+
+    def events(
+        self,
+        db: Union[str, Path],
+        table: str,
+        op: str,
+        pk_columns: Sequence[str],
+        rows: Sequence[Dict[str, Any]],
+        old: Optional[Dict[Tuple[Any, ...], Dict[str, Any]]] = None,
+    ) -> List[ChangeEvent]:
+        """Build one event per row, keyed by *pk_columns*."""
+        key = _resolve(db)
+        now = time.time()
+        out = []
+        for row in rows:
+            pk = tuple(row.get(col) for col in pk_columns)
+            out.append(ChangeEvent(
+                key, table, op, pk,
+                row if op != "delete" else None,
+                old.get(pk) if old is not None else None,
+                now,
+            ))
+        return out
+
+
+change_bus = ChangeBus()
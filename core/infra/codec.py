@@ -0,0 +1,48 @@
+"""
+codec.py – JSON encode / decode through the fastest available backend.
+
+Backends are tried in order **orjson → msgspec → stdlib json**; whichever
+imports first is used for the whole process.  All backends share the same
+contract:
+
+* :func:`loads` accepts ``bytes`` / ``bytearray`` / ``str``
+* :func:`dumps` always returns UTF-8 ``bytes`` (what ``RawItem.payload`` and
+  aiohttp request bodies want)
+"""
+
+from __future__ import annotations
+
+import json as _json
+from typing import Any, Callable
+
+__all__ = ["BACKEND", "dumps", "loads"]
+
+
+def _stdlib_loads(data: bytes | bytearray | str) -> Any:
+    return _json.loads(data)
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return _json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+loads: Callable[[bytes | bytearray | str], Any]
+dumps: Callable[[Any], bytes]
+
+try:
+    import orjson as _orjson
+
+    def _orjson_dumps(obj: Any) -> bytes:
+        # non-str keys are accepted by stdlib json, keep that behaviour
+        return _orjson.dumps(obj, option=_orjson.OPT_NON_STR_KEYS)
+
+    loads, dumps, BACKEND = _orjson.loads, _orjson_dumps, "orjson"
+except ImportError:  # pragma: no cover - depends on installed extras
+    try:
+        import msgspec as _msgspec
+
+        _decoder = _msgspec.json.Decoder()
+        _encoder = _msgspec.json.Encoder()
+        loads, dumps, BACKEND = _decoder.decode, _encoder.encode, "msgspec"
+    except ImportError:
+        loads, dumps, BACKEND = _stdlib_loads, _stdlib_dumps, "json"
@@ -3,21 +3,349 @@ Database infrastructure with SQLite and async support.
 """
 
 import asyncio
+import functools
 import logging
-from contextlib import asynccontextmanager
+import os
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from contextlib import AsyncExitStack, asynccontextmanager
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
 
 import aiosqlite
 
+from .cdc import ChangeEvent, change_bus
+from .http import current_pipeline
 
 logger = logging.getLogger(__name__)
 
+# Statements slower than this are logged with their query plan
+SLOW_QUERY_SECONDS = 0.25
+
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE_RE = re.compile(r"\s+")
+_EXPLAINABLE_RE = re.compile(r"^\s*(SELECT|WITH|INSERT|UPDATE|DELETE|REPLACE)\b", re.IGNORECASE)
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse literals, placeholder lists and whitespace so variants aggregate."""
+    sql = _LITERAL_RE.sub("?", sql)
+    sql = _WHITESPACE_RE.sub(" ", sql).strip()
+    return _PLACEHOLDER_LIST_RE.sub("(?, ...)", sql)
+
+
+class QueryStat:
+    """Timing aggregate for one normalized statement."""
+
+    __slots__ = ("sql", "calls", "total", "max", "rows", "slow", "plan")
+
+    def __init__(self, sql: str) -> None:
+        self.sql = sql
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.slow = 0
+        self.plan: Optional[List[str]] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "sql": self.sql,
+            "calls": self.calls,
+            "total": round(self.total, 6),
+            "avg": round(self.total / self.calls, 6) if self.calls else 0.0,
+            "max": round(self.max, 6),
+            "rows": self.rows,
+            "slow": self.slow,
+            "plan": self.plan,
+        }
+
+
+class QueryStats:
+    """Process-wide statement metrics aggregated per pipeline and normalized SQL."""
+
+    def __init__(self, slow_threshold: float = SLOW_QUERY_SECONDS) -> None:
+        self.slow_threshold = slow_threshold
+        self._stats: Dict[Tuple[Optional[str], str], QueryStat] = {}
+        # rows that never reached the database (rejected or failed writes), per pipeline
+        self._dropped: Dict[str, int] = {}
+
+    def observe(self, sql: str, seconds: float, rows: int = 0) -> QueryStat:
+        normalized = normalize_sql(sql)
+        key = (current_pipeline.get(), normalized)
+        stat = self._stats.get(key)
+        if stat is None:
+            stat = self._stats[key] = QueryStat(normalized)
+        stat.calls += 1
+        stat.total += seconds
+        stat.rows += rows
+        if seconds > stat.max:
+            stat.max = seconds
+        return stat
+
+    def record_dropped(self, rows: int) -> None:
+        pipeline = current_pipeline.get()
+        self._dropped[pipeline] = self._dropped.get(pipeline, 0) + rows
+
+    def dropped(self, pipeline: Optional[str] = None) -> int:
+        """Rows lost on their way to the database in *pipeline*'s (default: the current one's) run."""
+        return self._dropped.get(current_pipeline.get() if pipeline is None else pipeline, 0)
+
+    def snapshot(self, pipeline: Optional[str] = None, top: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Statement stats (optionally for one pipeline), slowest total first."""
+        stats = [st for (pipe, _), st in self._stats.items() if pipeline is None or pipe == pipeline]
+        stats.sort(key=lambda st: st.total, reverse=True)
+        return [st.as_dict() for st in stats[:top]]
+
+    def reset(self, pipeline: Optional[str] = None) -> None:
+        for key in [k for k in self._stats if pipeline is None or k[0] == pipeline]:
+            del self._stats[key]
+        for key in [k for k in self._dropped if pipeline is None or k == pipeline]:
+            del self._dropped[key]
+
+    def log_summary(self, pipeline: str, top: int = 5) -> None:
+        for st in self.snapshot(pipeline, top):
+            logger.info(
+                f"SQL {pipeline} | {st['calls']} calls, {st['total']:.3f}s total, "
+                f"max {st['max']:.3f}s, {st['slow']} slow: {st['sql'][:200]}"
+            )
+
+
+query_stats = QueryStats()
+
+
+# Named PRAGMA sets.  Connection-level pragmas are applied on every connect;
+# page_size only takes effect when the file is created.
+PROFILES: Dict[str, Dict[str, Any]] = {
+    # scheduled sinks writing large batches: fewer checkpoints, big cache
+    "bulk-load": {
+        "synchronous": "NORMAL",
+        "cache_size": -65536,          # KiB → 64 MiB
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "wal_autocheckpoint": 10000,   # pages
+        "page_size": 8192,
+    },
+    "balanced": {
+        "synchronous": "NORMAL",
+        "cache_size": -16384,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "wal_autocheckpoint": 1000,
+        "page_size": 4096,
+    },
+    # files mostly queried by Discord commands: map the whole file, keep the WAL short
+    "read-heavy": {
+        "synchronous": "NORMAL",
+        "cache_size": -32768,
+        "mmap_size": 1024 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "wal_autocheckpoint": 500,
+        "page_size": 4096,
+    },
+}
+
+# resolved db path → pragmas, filled from the ``databases:`` section of pipelines.yml
+_DB_PRAGMAS: Dict[Path, Dict[str, Any]] = {}
+
+
+def resolve_profile(spec: Union[None, str, Mapping[str, Any]]) -> Dict[str, Any]:
+    """Turn a profile name, or ``{"profile": name, "pragmas": {...}}``, into pragmas."""
+    if spec is None:
+        return {}
+    if isinstance(spec, str):
+        spec = {"profile": spec}
+    name = spec.get("profile")
+    if name is not None and name not in PROFILES:
+        raise ValueError(f"Unknown SQLite profile {name!r}; expected one of {sorted(PROFILES)}")
+    pragmas = dict(PROFILES[name]) if name is not None else {}
+    pragmas.update(spec.get("pragmas") or {})
+    return pragmas
+
+
+def configure_databases(databases: Mapping[str, Any]) -> None:
+    """Register per-file profiles, e.g. ``{"db/tcg.db": "bulk-load"}``."""
+    for db_path, spec in databases.items():
+        _DB_PRAGMAS[Path(db_path).resolve()] = resolve_profile(spec)
+        logger.info(f"SQLite profile for {db_path}: {spec}")
+
+
+class Migration(NamedTuple):
+    """One versioned schema step registered by a plugin for :meth:`Database.migrate`."""
+
+    version: int
+    name: str
+    statements: Union[str, Sequence[str]]
+
+
+async def _open_connection(
+    path: Path,
+    *,
+    read_only: bool = False,
+    pragmas: Optional[Mapping[str, Any]] = None,
+) -> aiosqlite.Connection:
+    """Open an aiosqlite connection with the pragmas every connection needs."""
+    pragmas = dict(pragmas or {})
+    page_size = pragmas.pop("page_size", None)
+    if read_only:
+        conn = await aiosqlite.connect(
+            f"{path.resolve().as_uri()}?mode=ro",
+            uri=True,
+            timeout=30,
+        )
+    else:
+        is_new = not path.exists() or path.stat().st_size == 0
+        conn = await aiosqlite.connect(path, timeout=30)
+        if is_new and page_size:
+            # must precede WAL and the first write to take effect
+            await conn.execute(f"PRAGMA page_size={int(page_size)};")
+        # Improve concurrency: use WAL journal mode so readers never block on writers
+        await conn.execute("PRAGMA journal_mode=WAL;")
+    conn.row_factory = aiosqlite.Row
+    await conn.execute("PRAGMA busy_timeout=30000;")
+    for name, value in pragmas.items():
+        await conn.execute(f"PRAGMA {name}={value};")
+    return conn
+
+
+class _SharedWriter:
+    """The single writer connection for one SQLite file, shared process-wide."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.connection: Optional[aiosqlite.Connection] = None
+        self.refs = 0
+        # serialises transactions of every pooled Database on this file
+        self.lock = asyncio.Lock()
+        self.owner: Optional[asyncio.Task] = None
+
+
+_WRITERS: Dict[Path, _SharedWriter] = {}
+
+
+async def _acquire_writer(path: Path, pragmas: Mapping[str, Any]) -> _SharedWriter:
+    while True:
+        writer = _WRITERS.get(path)
+        if writer is None:
+            writer = _WRITERS[path] = _SharedWriter(path)
+        # take the reference before waiting, so a release in progress keeps it open
+        writer.refs += 1
+        async with writer.lock:
+            if _WRITERS.get(path) is writer:
+                if writer.connection is None:
+                    try:
+                        writer.connection = await _open_connection(path, pragmas=pragmas)
+                    except BaseException:
+                        writer.refs -= 1
+                        if writer.refs == 0:
+                            _WRITERS.pop(path, None)
+                        raise
+                    logger.info(f"Opened shared writer connection for {path}")
+                return writer
+        # released and retired while we waited for its lock: use the file's current one
+        writer.refs -= 1
+
+
+async def _release_writer(writer: _SharedWriter) -> None:
+    writer.refs -= 1
+    if writer.refs > 0:
+        return
+    async with writer.lock:
+        # an acquire may have taken a new reference while we waited
+        if writer.refs == 0 and _WRITERS.get(writer.path) is writer:
+            # retire it before closing: later openers get a fresh writer
+            _WRITERS.pop(writer.path)
+            if writer.connection is not None:
+                await writer.connection.close()
+                writer.connection = None
+
+
+# How long a query-cache hit may trust the last ``PRAGMA data_version``
+# reading; in-process writes are seen immediately through the generations
+# of the tables a query reads (views expanded to their base tables)
+DATA_VERSION_CHECK_SECONDS = 1.0
+
+_WRITE_TARGET_RE = re.compile(
+    r"^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)"
+    r"\s+[\"`\[]?(\w+)",
+    re.IGNORECASE,
+)
+_READ_TABLES_RE = re.compile(r"\b(?:FROM|JOIN)\s+[\"`\[]?(\w+)", re.IGNORECASE)
+_SELECT_RE = re.compile(r"^\s*(SELECT|WITH|PRAGMA|EXPLAIN)\b", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=256)
+def _read_tables(sql: str) -> Tuple[str, ...]:
+    return tuple(sorted({name.lower() for name in _READ_TABLES_RE.findall(sql)}))
+
+
+class _Generations:
+    """Per-file write counters, bumped by every in-process write."""
+
+    __slots__ = ("schema", "tables")
+
+    def __init__(self) -> None:
+        self.schema = 0
+        self.tables: Dict[str, int] = {}
+
+    def bump(self, table: Optional[str] = None) -> None:
+        if table is None:
+            self.schema += 1
+        else:
+            table = table.lower()
+            self.tables[table] = self.tables.get(table, 0) + 1
+
+    def bump_for(self, sql: str) -> None:
+        """Bump whatever *sql* may modify; unknown statements bump the file."""
+        if _SELECT_RE.match(sql):
+            return
+        match = _WRITE_TARGET_RE.match(sql)
+        self.bump(match.group(1) if match else None)
+
+    def stamp(self, tables: Sequence[str]) -> Tuple[int, Tuple[int, ...]]:
+        return self.schema, tuple(self.tables.get(t, 0) for t in tables)
+
+
+_GENERATIONS: Dict[Path, _Generations] = {}
+
 
 class Database:
-    """Async SQLite database wrapper."""
+    """Async SQLite database wrapper.
+    
+    By default every instance owns one connection used for reads and
+    writes.  With ``pooled=True`` the instance instead shares a single
+    process-wide writer connection per file (transactions from all pooled
+    instances are serialised on it) and serves :meth:`fetch_one` /
+    :meth:`fetch_all` from ``readers`` read-only connections, so reads run
+    concurrently under WAL and never queue behind a write transaction.
+    Pooled reads only see committed data.
     
-    def __init__(self, db_path: str = "db/scraper.db"):
+    ``profile`` picks a PRAGMA set from :data:`PROFILES` (or a mapping with
+    ``profile`` and ``pragmas`` overrides); when omitted, the profile
+    configured for the file via :func:`configure_databases` is used.
+    
+    ``query_cache`` > 0 keeps that many ``fetch_one`` / ``fetch_all``
+    results keyed by (sql, params).  An entry is reused while ``PRAGMA
+    data_version`` (writes by other connections and processes) and the
+    write counters of the tables it reads – through any views – are
+    unchanged; hits within :data:`DATA_VERSION_CHECK_SECONDS` of the last
+    check skip SQLite.  Pooled instances read ``data_version`` on a
+    dedicated connection, opened with the first cached query.
+    """
+    
+    def __init__(
+        self,
+        db_path: str = "db/scraper.db",
+        *,
+        pooled: bool = False,
+        readers: int = 4,
+        slow_query_threshold: Optional[float] = None,
+        profile: Union[None, str, Mapping[str, Any]] = None,
+        query_cache: int = 0,
+    ):
         # Handle SQLite URL format if provided
         if db_path.startswith("sqlite"):
             # Handle sqlite+aiosqlite:///path format
@@ -28,26 +356,101 @@ class Database:
             self.db_path = Path(actual_path)
         else:
             self.db_path = Path(db_path)
+        self.pooled = pooled
+        # explicit profile, else the one configured for this file in pipelines.yml
+        self.pragmas = resolve_profile(profile) if profile is not None else None
+        # None → query_stats.slow_threshold
+        self.slow_query_threshold = slow_query_threshold
+        self.readers = readers if pooled else 0
         self._connection: Optional[aiosqlite.Connection] = None
+        self._writer: Optional[_SharedWriter] = None
+        self._reader_pool: Optional[asyncio.Queue] = None
+        self._reader_conns: List[aiosqlite.Connection] = []
+        
+        self._generations = _GENERATIONS.setdefault(self.db_path.resolve(), _Generations())
+        self.query_cache = query_cache
+        self._cache: "OrderedDict[Tuple[Any, ...], Tuple[Any, Any]]" = OrderedDict()
+        self._data_version: Optional[int] = None
+        self._data_version_at = 0.0
+        self._probe: Optional[aiosqlite.Connection] = None
+        # view -> names it selects from, as of (schema generation, data_version)
+        self._views: Optional[Dict[str, Tuple[str, ...]]] = None
+        self._views_at: Optional[Tuple[int, int]] = None
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     async def connect(self) -> None:
         """Connect to the database and run migrations."""
         if self._connection:
             return
         
-        # Open connection with a longer busy timeout
-        self._connection = await aiosqlite.connect(self.db_path, timeout=30)
-        self._connection.row_factory = aiosqlite.Row
-        # Improve concurrency: use WAL journal mode and set busy timeout (ms)
-        await self._connection.execute("PRAGMA journal_mode=WAL;")
-        await self._connection.execute("PRAGMA busy_timeout=30000;")
-        await self._run_migrations()
+        pragmas = self.pragmas
+        if pragmas is None:
+            pragmas = _DB_PRAGMAS.get(self.db_path.resolve(), {})
+        
+        if not self.pooled:
+            self._connection = await _open_connection(self.db_path, pragmas=pragmas)
+            await self._run_migrations()
+            return
+        
+        self._writer = await _acquire_writer(self.db_path.resolve(), pragmas)
+        self._connection = self._writer.connection
+        async with self._write_lock():
+            await self._run_migrations()
+            await self._connection.commit()
+        # readers are opened once the writer has created the file
+        self._reader_pool = asyncio.Queue()
+        for _ in range(self.readers):
+            conn = await _open_connection(self.db_path, read_only=True, pragmas=pragmas)
+            self._reader_conns.append(conn)
+            self._reader_pool.put_nowait(conn)
 
     async def close(self) -> None:
         """Close the database connection."""
-        if self._connection:
+        if not self._connection:
+            return
+        if self._writer is None:
             await self._connection.close()
             self._connection = None
+            return
+        
+        for conn in self._reader_conns:
+            await conn.close()
+        self._reader_conns = []
+        if self._probe is not None:
+            await self._probe.close()
+            self._probe = None
+        self._reader_pool = None
+        self._connection = None
+        writer, self._writer = self._writer, None
+        await _release_writer(writer)
+
+    @asynccontextmanager
+    async def _write_lock(self):
+        """Hold the shared writer (no-op for unpooled instances); re-entrant per task."""
+        writer = self._writer
+        if writer is None or writer.owner is asyncio.current_task():
+            yield
+            return
+        async with writer.lock:
+            writer.owner = asyncio.current_task()
+            try:
+                yield
+            finally:
+                writer.owner = None
+
+    @asynccontextmanager
+    async def _read_connection(self):
+        """Borrow a read-only connection (the writer when there are none)."""
+        if self._reader_pool is None or not self._reader_conns:
+            async with self._write_lock():
+                yield self._connection
+            return
+        conn = await self._reader_pool.get()
+        try:
+            yield conn
+        finally:
+            self._reader_pool.put_nowait(conn)
 
     @asynccontextmanager
     async def transaction(self):
@@ -55,40 +458,256 @@ class Database:
         if not self._connection:
             await self.connect()
         
-        try:
-            await self._connection.execute("BEGIN")
-            yield self._connection
-            await self._connection.commit()
-        except Exception:
-            await self._connection.rollback()
-            raise
+        async with self._write_lock():
+            try:
+                # join an implicit transaction opened by an earlier DML statement
+                if not self._connection.in_transaction:
+                    await self._connection.execute("BEGIN")
+                yield self._connection
+                await self._connection.commit()
+            except Exception:
+                await self._connection.rollback()
+                raise
+
+    async def _timed(
+        self,
+        conn: aiosqlite.Connection,
+        sql: str,
+        params: Tuple[Any, ...],
+        fetch: Optional[str] = None,
+    ) -> Any:
+        """Run *sql* on *conn*, fetch ``"one"``/``"all"`` rows, and record timing."""
+        start = time.perf_counter()
+        cursor = await conn.execute(sql, params)
+        if fetch is None:
+            result, rows = cursor, max(cursor.rowcount, 0)
+        elif fetch == "one":
+            result = await cursor.fetchone()
+            rows = int(result is not None)
+        else:
+            result = await cursor.fetchall()
+            rows = len(result)
+        await self._observe(conn, sql, params, time.perf_counter() - start, rows)
+        return result
+
+    async def _observe(
+        self,
+        conn: aiosqlite.Connection,
+        sql: str,
+        params: Optional[Tuple[Any, ...]],
+        seconds: float,
+        rows: int,
+    ) -> None:
+        stat = query_stats.observe(sql, seconds, rows)
+        threshold = self.slow_query_threshold
+        if threshold is None:
+            threshold = query_stats.slow_threshold
+        if seconds < threshold:
+            return
+        
+        stat.slow += 1
+        # capture the plan once per normalized statement
+        if stat.plan is None and params is not None and _EXPLAINABLE_RE.match(sql):
+            try:
+                cursor = await conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+                stat.plan = [row[3] for row in await cursor.fetchall()]
+            except Exception as e:
+                stat.plan = [f"<unavailable: {e}>"]
+        plan = f" | plan: {'; '.join(stat.plan)}" if stat.plan else ""
+        logger.warning(
+            f"Slow query on {self.db_path.name} ({seconds * 1000:.0f} ms, {rows} rows): "
+            f"{stat.sql[:500]}{plan}"
+        )
 
     async def execute(self, sql: str, params: Tuple[Any, ...] = ()) -> aiosqlite.Cursor:
-        """Execute a SQL statement."""
+        """Execute a SQL statement.
+        
+        On a pooled instance the writer is shared with other instances, so
+        a writing statement issued outside :meth:`transaction` is committed
+        right away instead of being left open until :meth:`commit`; group
+        statements that belong together in :meth:`transaction`.
+        """
         if not self._connection:
             await self.connect()
-        return await self._connection.execute(sql, params)
+        writer = self._writer
+        if writer is not None and writer.owner is not asyncio.current_task() and not _SELECT_RE.match(sql):
+            async with self.transaction():
+                return await self.execute(sql, params)
+        async with self._write_lock():
+            self._generations.bump_for(sql)
+            return await self._timed(self._connection, sql, params)
+
+    async def commit(self) -> None:
+        """Commit statements issued through :meth:`execute`."""
+        if self._connection:
+            async with self._write_lock():
+                await self._connection.commit()
 
     async def fetch_one(self, sql: str, params: Tuple[Any, ...] = ()) -> Optional[aiosqlite.Row]:
         """Fetch one row."""
-        cursor = await self.execute(sql, params)
-        return await cursor.fetchone()
+        if not self._connection:
+            await self.connect()
+        if self.query_cache:
+            return await self._cached_fetch(sql, params, "one")
+        async with self._read_connection() as conn:
+            return await self._timed(conn, sql, params, "one")
 
     async def fetch_all(self, sql: str, params: Tuple[Any, ...] = ()) -> List[aiosqlite.Row]:
         """Fetch all rows."""
-        cursor = await self.execute(sql, params)
-        return await cursor.fetchall()
+        if not self._connection:
+            await self.connect()
+        if self.query_cache:
+            # callers may mutate the list; the rows themselves are immutable
+            return list(await self._cached_fetch(sql, params, "all"))
+        async with self._read_connection() as conn:
+            return await self._timed(conn, sql, params, "all")
 
-    async def upsert(
+    async def _current_data_version(self) -> int:
+        now = time.monotonic()
+        if self._data_version is not None and now - self._data_version_at < DATA_VERSION_CHECK_SECONDS:
+            return self._data_version
+        # data_version is per connection, so always ask the same one; pooled
+        # connections are borrowed by other tasks, so those get their own
+        if self._writer is None:
+            conn = self._connection
+        else:
+            if self._probe is None:
+                self._probe = await _open_connection(self.db_path, read_only=True)
+            conn = self._probe
+        cursor = await conn.execute("PRAGMA data_version")
+        self._data_version = (await cursor.fetchone())[0]
+        self._data_version_at = now
+        return self._data_version
+
+    async def _cached_fetch(self, sql: str, params: Tuple[Any, ...], fetch: str) -> Any:
+        key = (sql, tuple(params), fetch)
+        try:
+            hash(key)
+        except TypeError:
+            async with self._read_connection() as conn:
+                return await self._timed(conn, sql, params, fetch)
+        
+        # stamp before querying: a write racing the query leaves a stale stamp
+        version = await self._current_data_version()
+        stamp = (version, self._generations.stamp(await self._base_tables(sql)))
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] == stamp:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return entry[1]
+        
+        self.cache_misses += 1
+        async with self._read_connection() as conn:
+            result = await self._timed(conn, sql, params, fetch)
+        self._cache[key] = (stamp, result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.query_cache:
+            self._cache.popitem(last=False)
+        return result
+
+    async def _base_tables(self, sql: str) -> Tuple[str, ...]:
+        """Names *sql* reads, with views expanded to the tables behind them."""
+        names = _read_tables(sql)
+        views = await self._view_map()
+        if not any(name in views for name in names):
+            return names
+        seen: set = set()
+        todo = list(names)
+        while todo:
+            name = todo.pop()
+            if name not in seen:
+                seen.add(name)
+                todo.extend(views.get(name, ()))
+        return tuple(sorted(seen))
+
+    async def _view_map(self) -> Dict[str, Tuple[str, ...]]:
+        # views change with DDL: ours bumps the schema generation, anyone
+        # else's the data_version read just before
+        at = (self._generations.schema, self._data_version)
+        if self._views is None or self._views_at != at:
+            async with self._read_connection() as conn:
+                cursor = await conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'view'")
+                rows = await cursor.fetchall()
+            self._views = {row[0].lower(): _read_tables(row[1]) for row in rows}
+            self._views_at = at
+        return self._views
+
+    def clear_cache(self) -> None:
+        """Drop every cached query result."""
+        self._cache.clear()
+
+    async def iterate(
         self,
-        table: str,
-        data: Dict[str, Any],
-        pk_columns: List[str],
-    ) -> None:
-        """Upsert data into a table."""
-        columns = list(data.keys())
+        sql: str,
+        params: Tuple[Any, ...] = (),
+        chunk_size: int = 1000,
+        *,
+        columnar: bool = False,
+    ) -> AsyncIterator[Union[List[aiosqlite.Row], Dict[str, Tuple[Any, ...]]]]:
+        """Stream a query's result in chunks of at most *chunk_size* rows.
+        
+        Yields lists of rows, or with ``columnar=True`` one
+        ``{column: tuple_of_values}`` dict per chunk (plain tuples from
+        sqlite, no Row objects) that ``pandas.DataFrame`` accepts directly.
+        
+        Pooled instances hold one read-only connection – a consistent
+        snapshot – until the iterator is exhausted or closed.  Without
+        readers the shared writer is only locked while a chunk is fetched.
+        Wrap the iterator in :func:`contextlib.aclosing` when breaking out
+        early so the cursor is released before the database is closed.
+        """
+        if not self._connection:
+            await self.connect()
+        
+        async with AsyncExitStack() as stack:
+            if self._reader_conns:
+                conn = await stack.enter_async_context(self._read_connection())
+                chunk_lock = None
+            else:
+                conn = self._connection
+                chunk_lock = self._write_lock
+            
+            async def step(call):
+                if chunk_lock is None:
+                    return await call()
+                async with chunk_lock():
+                    return await call()
+            
+            spent = 0.0
+            total = 0
+            start = time.perf_counter()
+            cursor = await step(lambda: conn.execute(sql, params))
+            stack.push_async_callback(cursor.close)
+            if columnar:
+                cursor.row_factory = None
+                names = [d[0] for d in cursor.description]
+            spent += time.perf_counter() - start
+            
+            try:
+                while True:
+                    start = time.perf_counter()
+                    rows = await step(lambda: cursor.fetchmany(chunk_size))
+                    spent += time.perf_counter() - start
+                    if not rows:
+                        break
+                    total += len(rows)
+                    yield dict(zip(names, zip(*rows))) if columnar else rows
+            finally:
+                # time spent by the consumer between chunks is not counted;
+                # no EXPLAIN on the shared writer outside its lock
+                shared = chunk_lock is not None and self._writer is not None
+                await self._observe(conn, sql, None if shared else params, spent, total)
+
+    @staticmethod
+    # sinks write a handful of (table, column set) shapes
+    @functools.lru_cache(maxsize=256)
+    def _upsert_sql(table: str, columns: Tuple[str, ...], pk_columns: Tuple[str, ...]) -> str:
+        """Build the ``INSERT ... ON CONFLICT`` statement for one column set.
+        
+        Cached per (table, columns, pk_columns); returning the identical
+        string also lets sqlite reuse its prepared statement.
+        """
         placeholders = ", ".join("?" * len(columns))
-        values = list(data.values())
         
         # Build the conflict resolution clause
         update_columns = [col for col in columns if col not in pk_columns]
@@ -98,24 +717,527 @@ class Database:
         else:
             conflict_clause = f"ON CONFLICT({', '.join(pk_columns)}) DO NOTHING"
         
-        sql = f"""
+        return f"""
             INSERT INTO {table} ({', '.join(columns)})
             VALUES ({placeholders})
             {conflict_clause}
         """
-        
+
+    async def upsert(
+        self,
+        table: str,
+        data: Dict[str, Any],
+        pk_columns: List[str],
+    ) -> None:
+        """Upsert data into a table."""
         # Execute and immediately commit to persist data
-        await self.execute(sql, tuple(values))
-        await self._connection.commit()
+        await self.upsert_many(table, [data], pk_columns)
+
+    async def upsert_many(
+        self,
+        table: str,
+        rows: Iterable[Dict[str, Any]],
+        pk_columns: List[str],
+    ) -> int:
+        """Upsert many rows in a single transaction.
+        
+        Rows may carry different column sets; they are grouped by column
+        signature and each group is written with one ``executemany``.
+        Returns the number of rows inserted or updated.
+        """
+        rows = list(rows)
+        if not rows:
+            return 0
+        return await self._upsert_batches({(table, tuple(pk_columns)): rows})
+
+    @staticmethod
+    def _group_rows(rows: Iterable[Mapping[str, Any]]) -> Dict[Tuple[str, ...], List[Tuple[Any, ...]]]:
+        """Group rows by column signature: one ``executemany`` per group."""
+        groups: Dict[Tuple[str, ...], List[Tuple[Any, ...]]] = {}
+        for row in rows:
+            columns = tuple(sorted(row))
+            groups.setdefault(columns, []).append(tuple(row[col] for col in columns))
+        return groups
+
+    async def _upsert_batches(
+        self,
+        batches: Mapping[Tuple[str, Tuple[str, ...]], List[Dict[str, Any]]],
+    ) -> int:
+        """Write rows for several (table, pk) targets in one transaction.
+
+        Committed rows are published on :data:`core.infra.cdc.change_bus`
+        for tables somebody subscribed to.
+        """
+        if not self._connection:
+            await self.connect()
+        affected = 0
+        events: List[ChangeEvent] = []
+        async with self.transaction() as conn:
+            for (table, pk_columns), rows in batches.items():
+                capture = change_bus.wants(self.db_path, table)
+                old = None
+                if capture and change_bus.wants_old(self.db_path, table):
+                    old = await self._rows_by_pk(conn, table, pk_columns, rows)
+                self._generations.bump(table)
+                for columns, values in self._group_rows(rows).items():
+                    sql = self._upsert_sql(table, columns, tuple(pk_columns))
+                    start = time.perf_counter()
+                    cursor = await conn.executemany(sql, values)
+                    # executemany has no single parameter set to EXPLAIN with
+                    await self._observe(conn, sql, None, time.perf_counter() - start, len(values))
+                    affected += max(cursor.rowcount, 0)
+                if capture:
+                    events.extend(change_bus.events(self.db_path, table, "upsert", pk_columns, rows, old))
+        # only after COMMIT: subscribers never see rolled-back rows
+        change_bus.publish(events)
+        return affected
+
+    async def _rows_by_pk(
+        self,
+        conn: aiosqlite.Connection,
+        table: str,
+        pk_columns: Sequence[str],
+        rows: Sequence[Mapping[str, Any]],
+    ) -> Dict[Tuple[Any, ...], Dict[str, Any]]:
+        """Stored rows for the keys of *rows*, keyed by pk tuple (one query per chunk)."""
+        keys = list(dict.fromkeys(tuple(row.get(col) for col in pk_columns) for row in rows))
+        target = f"({', '.join(pk_columns)})" if len(pk_columns) > 1 else pk_columns[0]
+        marker = f"({', '.join('?' * len(pk_columns))})" if len(pk_columns) > 1 else "?"
+        found: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        chunk = max(1, 900 // len(pk_columns))  # stay under SQLITE_MAX_VARIABLE_NUMBER
+        for i in range(0, len(keys), chunk):
+            part = keys[i:i + chunk]
+            values = "VALUES " + ", ".join([marker] * len(part)) if len(pk_columns) > 1 else ", ".join([marker] * len(part))
+            cursor = await conn.execute(
+                f"SELECT * FROM {table} WHERE {target} IN ({values})",
+                tuple(v for key in part for v in key),
+            )
+            for row in await cursor.fetchall():
+                record = dict(row)
+                found[tuple(record.get(col) for col in pk_columns)] = record
+        return found
 
     async def _run_migrations(self) -> None:
-        """Run database migrations."""
+        """Create the bookkeeping table used by :meth:`migrate`."""
         await self._connection.execute("""
-            CREATE TABLE IF NOT EXISTS migrations (
-                version INTEGER PRIMARY KEY,
-                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                scope TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (scope, version)
             )
         """)
         
-        # No hardcoded migrations - plugins should handle their own table creation
-        # This ensures the core Database class is plugin-agnostic
+        # No hardcoded migrations - plugins register their own steps through
+        # migrate(), which keeps the core Database class plugin-agnostic
+
+    async def backup(
+        self,
+        dest: Union[str, Path],
+        *,
+        pages: int = 256,
+        sleep: float = 0.01,
+    ) -> Path:
+        """Write a consistent snapshot of this database to *dest*.
+        
+        Runs :func:`backup_file` in a worker thread on its own connection,
+        so pipelines keep writing while the copy is taken.
+        """
+        return await asyncio.to_thread(backup_file, self.db_path, dest, pages=pages, sleep=sleep)
+
+    async def _applied_versions(self, scope: str, conn: Optional[aiosqlite.Connection] = None) -> set:
+        sql = "SELECT version FROM schema_migrations WHERE scope = ?"
+        if conn is None:
+            rows = await self.fetch_all(sql, (scope,))
+        else:
+            rows = await (await conn.execute(sql, (scope,))).fetchall()
+        return {row[0] for row in rows}
+
+    async def migrate(self, scope: str, steps: Sequence[Migration]) -> List[int]:
+        """Apply the pending *steps* of *scope* once, in version order.
+        
+        Each plugin owns a scope (e.g. ``"fi_shortinterest"``) with versions
+        starting at 1.  Applied versions are recorded in ``schema_migrations``
+        so later connects only pay one indexed lookup.  Pending steps run in
+        a single ``BEGIN IMMEDIATE`` transaction, which also keeps two
+        processes from applying the same step concurrently.  Returns the
+        versions applied by this call.
+        """
+        versions = [step.version for step in steps]
+        if versions != sorted(set(versions)):
+            raise ValueError(f"{scope}: migration versions must be unique and ascending, got {versions}")
+        if not self._connection:
+            await self.connect()
+        
+        if (await self._applied_versions(scope)).issuperset(versions):
+            return []
+        
+        applied: List[int] = []
+        async with self._write_lock():
+            conn = self._connection
+            try:
+                if not conn.in_transaction:
+                    await conn.execute("BEGIN IMMEDIATE")
+                # re-check under the write lock – another process may have won
+                done = await self._applied_versions(scope, conn)
+                for step in steps:
+                    if step.version in done:
+                        continue
+                    statements = [step.statements] if isinstance(step.statements, str) else step.statements
+                    for statement in statements:
+                        await conn.execute(statement)
+                    await conn.execute(
+                        "INSERT INTO schema_migrations (scope, version, name) VALUES (?, ?, ?)",
+                        (scope, step.version, step.name),
+                    )
+                    applied.append(step.version)
+                self._generations.bump()
+                await conn.commit()
+            except Exception:
+                await conn.rollback()
+                logger.error(f"Migration of {scope} in {self.db_path} failed; rolled back")
+                raise
+        
+        for step in steps:
+            if step.version in applied:
+                logger.info(f"Applied migration {scope} v{step.version} ({step.name}) to {self.db_path}")
+        return applied
+
+
+class _BackupRestarted(Exception):
+    pass
+
+
+def backup_file(
+    src: Union[str, Path],
+    dest: Union[str, Path],
+    *,
+    pages: int = 256,
+    sleep: float = 0.01,
+    max_restarts: int = 3,
+) -> Path:
+    """Copy a live SQLite file to *dest* with the online backup API (blocking).
+    
+    The copy runs *pages* pages per step and sleeps *sleep* seconds between
+    steps, so writers are never locked out for long.  A write by another
+    connection restarts an incremental backup; after *max_restarts* the
+    copy falls back to a single step, which under WAL only holds a read
+    snapshot.  The result is written to a temporary file, switched to
+    rollback-journal mode (snapshots are opened read-only) and atomically
+    renamed over *dest*.
+    """
+    src, dest = Path(src), Path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f".{dest.name}.tmp")
+    
+    restarts = 0
+    last_remaining: Optional[int] = None
+    
+    def progress(status: int, remaining: int, total: int) -> None:
+        nonlocal restarts, last_remaining
+        if last_remaining is not None and remaining > last_remaining:
+            restarts += 1
+            if restarts > max_restarts:
+                raise _BackupRestarted
+        last_remaining = remaining
+    
+    source = sqlite3.connect(f"{src.resolve().as_uri()}?mode=ro", uri=True, timeout=30)
+    try:
+        for step_pages in (pages, -1):
+            tmp.unlink(missing_ok=True)
+            target = sqlite3.connect(tmp)
+            try:
+                source.backup(target, pages=step_pages, progress=progress, sleep=sleep)
+                target.execute("PRAGMA journal_mode=DELETE")
+                break
+            except _BackupRestarted:
+                logger.info(f"Backup of {src} kept restarting under writes; copying in one step")
+            finally:
+                target.close()
+    finally:
+        source.close()
+    
+    os.replace(tmp, dest)
+    return dest
+
+
+def snapshot(
+    src: Union[str, Path],
+    dest_dir: Union[None, str, Path] = None,
+    *,
+    max_age: float = 300.0,
+    **backup_options: Any,
+) -> Path:
+    """Return a consistent copy of *src*, reusing one younger than *max_age* seconds.
+    
+    Snapshots live in ``<src dir>/snapshots/<name>.snapshot.db`` by default;
+    analytics scripts should query those instead of the live file.
+    """
+    src = Path(src)
+    dest_dir = Path(dest_dir) if dest_dir is not None else src.parent / "snapshots"
+    dest = dest_dir / f"{src.stem}.snapshot.db"
+    if dest.exists() and time.time() - dest.stat().st_mtime < max_age:
+        return dest
+    started = time.perf_counter()
+    backup_file(src, dest, **backup_options)
+    logger.info(f"Snapshot of {src} written to {dest} in {time.perf_counter() - started:.2f}s")
+    return dest
+
+
+def _row_size(row: Mapping[str, Any]) -> int:
+    """Cheap estimate of a row's size in bytes for flush thresholds."""
+    size = 0
+    for value in row.values():
+        if isinstance(value, (str, bytes)):
+            size += len(value)
+        else:
+            size += 8
+    return size
+
+
+class BufferedWriter:
+    """Write-behind buffer that turns per-row upserts into group commits.
+
+    Sinks call :meth:`put` per row; a single background task flushes the
+    buffer with :meth:`Database._upsert_batches` – one transaction for every
+    table touched – as soon as ``max_rows`` rows or ``max_bytes`` bytes are
+    buffered, or ``linger`` seconds after the first buffered row.
+
+    Durability:
+
+    * ``"buffered"`` (default) – :meth:`put` returns immediately; rows are
+      durable once the next group commit lands, so a crash can lose at most
+      one linger window.  Call :meth:`flush` (or :meth:`close`) at the end of
+      a run to make everything durable.
+    * ``"acked"`` – :meth:`put` waits until the group commit holding its row
+      has committed.  Only worth it with many concurrent producers.
+
+    Failures:
+
+    * a group commit rejected because of individual rows (constraint
+      violations, unbindable values) is retried per table and then per row,
+      so only the offending rows are lost; each is counted in
+      ``rows_rejected`` and passed to ``on_reject(table, row, error)``
+    * any other error (locked or full database, I/O) drops the batch; with
+      ``"acked"`` it is raised by every :meth:`put` waiting on that batch,
+      otherwise by the next :meth:`put`, :meth:`flush` or :meth:`close`
+    * if the background task is cancelled, rows it had not committed are
+      dropped the same way, so no producer is left waiting
+
+    ``on_commit(table, pk_columns, rows)`` is called for every committed
+    group of rows.
+
+    The writer must be the only thing writing through its Database while it
+    holds rows; call :meth:`flush` before issuing other statements.
+    """
+
+    DURABILITY = ("buffered", "acked")
+
+    # errors one row can cause; anything else fails the whole flush
+    ROW_ERRORS = (sqlite3.IntegrityError, sqlite3.InterfaceError, sqlite3.DataError, sqlite3.ProgrammingError)
+
+    def __init__(
+        self,
+        db: Database,
+        *,
+        max_rows: int = 1000,
+        max_bytes: int = 1 << 20,
+        linger: float = 1.0,
+        durability: str = "buffered",
+        on_commit: Optional[Callable[[str, Tuple[str, ...], List[Dict[str, Any]]], None]] = None,
+        on_reject: Optional[Callable[[str, Dict[str, Any], BaseException], None]] = None,
+    ) -> None:
+        if durability not in self.DURABILITY:
+            raise ValueError(f"durability must be one of {self.DURABILITY}, got {durability!r}")
+        self.db = db
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.linger = linger
+        self.durability = durability
+        self.on_commit = on_commit
+        self.on_reject = on_reject
+
+        self._buffer: Dict[Tuple[str, Tuple[str, ...]], List[Dict[str, Any]]] = {}
+        self._rows = 0
+        self._bytes = 0
+        self._first_at: Optional[float] = None
+        self._pending: Optional[asyncio.Future] = None  # resolves when the current buffer commits
+        self._inflight: Optional[asyncio.Future] = None  # resolves when the flush in progress commits
+        self._flush_now = False
+        self._closing = False
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+
+        self.rows_written = 0
+        self.rows_rejected = 0
+        self.commits = 0
+
+    # ---------------------------------------------- #
+    async def put(self, table: str, row: Dict[str, Any], pk_columns: Sequence[str]) -> None:
+        """Queue one row for upsert into *table*."""
+        self._raise_error()
+        self._ensure_task()
+
+        self._buffer.setdefault((table, tuple(pk_columns)), []).append(row)
+        self._rows += 1
+        self._bytes += _row_size(row)
+        if self._first_at is None:
+            # first row of a batch starts the linger clock
+            self._first_at = asyncio.get_running_loop().time()
+            self._wake.set()
+        if self._rows >= self.max_rows or self._bytes >= self.max_bytes:
+            self._wake.set()
+
+        if self.durability == "acked":
+            await self._pending_future()
+            self._raise_error()
+        elif self._rows >= 2 * self.max_rows:
+            # producer outruns the writer – apply backpressure
+            await self._pending_future()
+
+    async def flush(self) -> None:
+        """Commit everything queued so far."""
+        if self._inflight is not None:
+            await asyncio.shield(self._inflight)
+        if self._rows:
+            self._ensure_task()
+            self._flush_now = True
+            self._wake.set()
+            await self._pending_future()
+        self._raise_error()
+
+    async def close(self) -> None:
+        """Flush remaining rows and stop the background task."""
+        self._closing = True
+        self._wake.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        self._raise_error()
+
+    # ---------------------------------------------- #
+    def _ensure_task(self) -> None:
+        if self._task is None or self._task.done():
+            self._closing = False
+            self._task = asyncio.create_task(self._run(), name=f"db-writer:{self.db.db_path.name}")
+
+    def _pending_future(self) -> asyncio.Future:
+        if self._pending is None:
+            self._pending = asyncio.get_running_loop().create_future()
+        return asyncio.shield(self._pending)
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _fail(self, future: Optional[asyncio.Future], error: BaseException) -> None:
+        if self.durability == "acked":
+            # every producer waiting on the batch gets the error
+            if future is not None and not future.done():
+                future.set_exception(error)
+            return
+        # surfaced to the producer by the next put() / flush() / close()
+        self._error = error
+        if future is not None and not future.done():
+            future.set_result(0)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                if not self._rows:
+                    if self._closing:
+                        return
+                    self._wake.clear()
+                    await self._wake.wait()
+                    continue
+
+                due = (self._first_at or loop.time()) + self.linger
+                full = self._rows >= self.max_rows or self._bytes >= self.max_bytes
+                if not (full or self._flush_now or self._closing) and loop.time() < due:
+                    self._wake.clear()
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), due - loop.time())
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                await self._flush_buffer()
+        except asyncio.CancelledError:
+            # rows still buffered will not be written by this task
+            if self._rows:
+                error = RuntimeError(f"Writer for {self.db.db_path} cancelled with {self._rows} rows buffered")
+                logger.error(str(error))
+                query_stats.record_dropped(self._rows)
+                self._buffer, self._rows, self._bytes, self._first_at = {}, 0, 0, None
+                future, self._pending = self._pending, None
+                self._fail(future, error)
+            raise
+
+    async def _flush_buffer(self) -> None:
+        batch, self._buffer = self._buffer, {}
+        rows = self._rows
+        future, self._pending = self._pending, None
+        self._rows = self._bytes = 0
+        self._first_at = None
+        self._flush_now = False
+
+        self._inflight = future = future or asyncio.get_running_loop().create_future()
+        # rows of this batch already committed or rejected when a later step fails
+        settled = self.rows_written + self.rows_rejected
+        error: Optional[BaseException] = None
+        try:
+            try:
+                affected = await self.db._upsert_batches(batch)
+            except self.ROW_ERRORS as e:
+                logger.warning(f"Group commit of {rows} rows to {self.db.db_path} failed ({e}); retrying per table and row")
+                affected = await self._commit_isolated(batch)
+            else:
+                self._committed(batch)
+            self.commits += 1
+            logger.debug("Group commit to %s: %d rows (%d affected)", self.db.db_path, rows, affected)
+            if not future.done():
+                future.set_result(affected)
+        except asyncio.CancelledError:
+            error = RuntimeError(f"Group commit of {rows} rows to {self.db.db_path} was cancelled")
+            logger.error(str(error))
+            raise
+        except Exception as e:
+            logger.error(f"Group commit of {rows} rows to {self.db.db_path} failed: {e}")
+            error = e
+        finally:
+            self._inflight = None
+            if error is not None:
+                query_stats.record_dropped(rows - (self.rows_written + self.rows_rejected - settled))
+                self._fail(future, error)
+
+    async def _commit_isolated(self, batch: Mapping[Tuple[str, Tuple[str, ...]], List[Dict[str, Any]]]) -> int:
+        """Commit each table's rows on its own, and rows one by one where that fails."""
+        affected = 0
+        for target, rows in batch.items():
+            try:
+                affected += await self.db._upsert_batches({target: rows})
+                self._committed({target: rows})
+                continue
+            except self.ROW_ERRORS:
+                pass
+            for row in rows:
+                try:
+                    affected += await self.db._upsert_batches({target: [row]})
+                    self._committed({target: [row]})
+                except self.ROW_ERRORS as e:
+                    self.rows_rejected += 1
+                    query_stats.record_dropped(1)
+                    logger.error(f"Rejected row for {target[0]} in {self.db.db_path}: {e}")
+                    if self.on_reject is not None:
+                        self.on_reject(target[0], row, e)
+        return affected
+
+    def _committed(self, batch: Mapping[Tuple[str, Tuple[str, ...]], List[Dict[str, Any]]]) -> None:
+        for (table, pk_columns), rows in batch.items():
+            self.rows_written += len(rows)
+            if self.on_commit is not None:
+                self.on_commit(table, pk_columns, rows)
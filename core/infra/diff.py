@@ -0,0 +1,299 @@
+"""
+diff.py – configurable change detection against stored state.
+
+A :class:`DiffParser` compares each ParsedItem of a configured topic with
+the row last stored for the same key and lets only what changed through.
+Everything is configuration::
+
+    - class: core.infra.diff.DiffParser
+      kwargs:
+        db_path: db/tcg.db
+        topics:
+          tcg.price_history:
+            state: price_history            # table, or a SELECT returning the columns below
+            key: [sku_id, bucket_start_date]
+            compare:                        # field: numeric tolerance, or null for exact
+              market_price: 0.005
+              quantity_sold: 0
+            forward: changed                # drop items equal to their stored row
+            diff_topic: tcg.price_history.diff   # optional diff event per change
+            removals: false                 # diff events for stored keys missing from the batch
+
+The state of each topic is read with one query the first time the topic
+is seen in a batch and kept as a dict keyed by the (text-normalised) key,
+so items are diffed in memory instead of with a ``SELECT`` each.  A table
+state is read through its ``<table>_all`` view when one exists, so rows
+that retention moved into partitions still count as stored; ``latest:
+<column>`` keeps only the newest row per key of a history table.  Topics with
+the same state query share one snapshot.
+
+Plugins subclass it and set ``topics`` as a class attribute; override
+:meth:`DiffParser.diff_content` / :meth:`DiffParser.removal_content` to
+shape the emitted diff events.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Literal, Mapping, Optional, Sequence, Set, Tuple, Union
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from ..interfaces import Transform
+from ..models import ParsedItem
+from .db import Database
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["DiffParser", "DiffSpec"]
+
+Key = Tuple[Optional[str], ...]
+
+
+class DiffSpec(BaseModel):
+    """Change detection settings for one topic."""
+    state: str                                   # table name or SELECT statement
+    key: List[str]
+    compare: Dict[str, Optional[float]]          # field -> tolerance (None = exact)
+    carry: List[str] = Field(default_factory=list)  # extra state columns for removal events
+    latest: Optional[str] = Field(default=None, pattern=r"^\w+$")  # newest row per key by this column
+    diff_topic: Optional[str] = None
+    forward: Literal["all", "changed"] = "all"
+    removals: bool = False
+
+    @field_validator("compare", mode="before")
+    @classmethod
+    def _exact_list(cls, value: Any) -> Any:
+        # [a, b] is shorthand for exact comparison of both fields
+        if isinstance(value, (list, tuple)):
+            return {field: None for field in value}
+        return value
+
+    @model_validator(mode="after")
+    def _removals_need_topic(self) -> "DiffSpec":
+        if self.removals and not self.diff_topic:
+            raise ValueError("removals require a diff_topic")
+        return self
+
+    @model_validator(mode="after")
+    def _latest_needs_table(self) -> "DiffSpec":
+        if self.latest and self.table is None:
+            raise ValueError("latest requires a table state")
+        return self
+
+    @property
+    def table(self) -> Optional[str]:
+        """The state table, or None when ``state`` is a SELECT."""
+        return self.state if re.fullmatch(r"\w+", self.state) else None
+
+    def query(self, source: Optional[str] = None) -> str:
+        """The state query, reading *source* (a view over the table) instead of the table if given."""
+        if self.table is None:
+            return self.state
+        source = source or self.table
+        columns = ", ".join(dict.fromkeys([*self.key, *self.compare, *self.carry]))
+        if self.latest is None:
+            return f"SELECT {columns} FROM {source}"
+        return (
+            f"SELECT {columns} FROM (SELECT {columns}, ROW_NUMBER() OVER "
+            f"(PARTITION BY {', '.join(self.key)} ORDER BY {self.latest} DESC) AS _rank FROM {source}) "
+            f"WHERE _rank = 1"
+        )
+
+
+def _key_value(value: Any) -> Optional[str]:
+    # keys are compared as text: parsers hand over ints / dates where SQLite stores TEXT
+    return None if value is None or value == "" else str(value)
+
+
+def changed_fields(spec: DiffSpec, content: Mapping[str, Any], previous: Mapping[str, Any]) -> List[str]:
+    """Compared fields whose current value differs from the stored one."""
+    changed = []
+    for field, tolerance in spec.compare.items():
+        current, stored = content.get(field), previous[field]
+        if tolerance is None:
+            if (current if current is not None else "") != (stored if stored is not None else ""):
+                changed.append(field)
+        elif current is None or stored is None:
+            if current is not stored:
+                changed.append(field)
+        else:
+            try:
+                if abs(float(current) - float(stored)) > tolerance:
+                    changed.append(field)
+            except (TypeError, ValueError):
+                if str(current) != str(stored):
+                    changed.append(field)
+    return changed
+
+
+class DiffParser(Transform):
+    """Pass on only ParsedItems that differ from their stored state, plus diff events."""
+
+    name = "DiffParser"
+
+    # Subclasses declare their topics here; kwargs override per pipeline
+    topics: Mapping[str, Union[DiffSpec, Mapping[str, Any]]] = {}
+    db_path: str = "scraper.db"
+
+    def __init__(
+        self,
+        db_path: Optional[Union[str, Path]] = None,
+        topics: Optional[Mapping[str, Mapping[str, Any]]] = None,
+        **_: Any,
+    ):
+        """
+        Args:
+            db_path: SQLite file holding the state (class default if None)
+            topics: topic -> DiffSpec fields (class ``topics`` if None)
+        """
+        specs = self.topics if topics is None else topics
+        self.specs: Dict[str, DiffSpec] = {
+            topic: spec if isinstance(spec, DiffSpec) else DiffSpec.model_validate(spec)
+            for topic, spec in specs.items()
+        }
+        # state is only read; lookups go through a read-only connection
+        self.db = Database(str(db_path or self.db_path), pooled=True, readers=1)
+        self._initialized = False
+        # topic -> {key: stored row} as of the start of the batch
+        self._state: Dict[str, Dict[Key, Any]] = {}
+        # (query, key columns) -> the same dict, for topics sharing a state query
+        self._snapshots: Dict[Tuple[str, Tuple[str, ...]], Dict[Key, Any]] = {}
+        # topic -> keys seen in the current batch
+        self._seen: Dict[str, Set[Key]] = defaultdict(set)
+        self.counters: Dict[str, Counter] = defaultdict(Counter)
+
+    async def __aenter__(self):
+        await self._ensure_initialized()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def _ensure_initialized(self):
+        if not self._initialized:
+            await self.db.connect()
+            self._initialized = True
+
+    async def _state_query(self, spec: DiffSpec) -> str:
+        """*spec*'s state query, over the table's ``_all`` view when retention keeps one."""
+        if spec.table is None:
+            return spec.query()
+        view = f"{spec.table}_all"
+        row = await self.db.fetch_one("SELECT 1 FROM sqlite_master WHERE type = 'view' AND name = ?", (view,))
+        return spec.query(view if row else None)
+
+    async def _snapshot(self, topic: str) -> Dict[Key, Any]:
+        """Stored rows of *topic*'s state, loaded with one query on first use in a batch."""
+        state = self._state.get(topic)
+        if state is None:
+            spec = self.specs[topic]
+            query = await self._state_query(spec)
+            state = self._snapshots.get((query, tuple(spec.key)))
+            if state is None:
+                state = {}
+                async for chunk in self.db.iterate(query, chunk_size=10_000):
+                    for row in chunk:
+                        state[tuple(_key_value(row[col]) for col in spec.key)] = row
+                self._snapshots[(query, tuple(spec.key))] = state
+                logger.debug(f"{self.name}: loaded {len(state)} stored rows for {topic}")
+            self._state[topic] = state
+        return state
+
+    async def parse(self, item: ParsedItem) -> List[ParsedItem]:
+        """Diff one item: the item (unless unchanged and ``forward: changed``) plus any diff event."""
+        spec = self.specs.get(item.topic)
+        if spec is None:
+            # unknown topics just pass through
+            return [item]
+        await self._ensure_initialized()
+        counts = self.counters[item.topic]
+        counts["received"] += 1
+
+        key = tuple(_key_value(item.content.get(col)) for col in spec.key)
+        if None in key:
+            counts["keyless"] += 1
+            return [item]
+        self._seen[item.topic].add(key)
+        previous = (await self._snapshot(item.topic)).get(key)
+
+        if previous is None:
+            changed = list(spec.compare)
+            counts["new"] += 1
+        else:
+            changed = changed_fields(spec, item.content, previous)
+            if not changed:
+                counts["unchanged"] += 1
+                return [item] if spec.forward == "all" else []
+            counts["changed"] += 1
+
+        out = [item]
+        if spec.diff_topic:
+            content = self.diff_content(item.topic, item, previous, changed)
+            out.append(ParsedItem(topic=spec.diff_topic, content=content, discovered_at=item.discovered_at))
+        return out
+
+    def diff_content(
+        self, topic: str, item: ParsedItem, previous: Optional[Mapping[str, Any]], changed: Sequence[str]
+    ) -> Dict[str, Any]:
+        """Content of the diff event for a new (``previous`` None) or changed item."""
+        content = dict(item.content)
+        content["event_timestamp"] = item.discovered_at.isoformat()
+        content["changed"] = list(changed)
+        content["previous"] = {f: previous[f] for f in self.specs[topic].compare} if previous is not None else None
+        return content
+
+    def removal_content(self, topic: str, row: Mapping[str, Any]) -> Dict[str, Any]:
+        """Content of the diff event for a stored row missing from the batch."""
+        content = {col: row[col] for col in row.keys()}
+        content["event_timestamp"] = datetime.utcnow().isoformat()
+        content["removal_detected"] = True
+        return content
+
+    async def _emit_removals(self) -> AsyncIterator[ParsedItem]:
+        """Diff events for stored keys that were not in the current batch."""
+        for topic, spec in self.specs.items():
+            # only topics that were processed in this batch
+            seen = self._seen.get(topic)
+            if not spec.removals or not seen:
+                continue
+            for key, row in self._state[topic].items():
+                if key not in seen:
+                    self.counters[topic]["removed"] += 1
+                    yield ParsedItem(
+                        topic=spec.diff_topic,
+                        content=self.removal_content(topic, row),
+                        discovered_at=datetime.utcnow(),
+                    )
+
+    def report(self) -> None:
+        """Log the per-topic counters of this batch."""
+        for topic, counts in sorted(self.counters.items()):
+            logger.info(f"{self.name} {topic}: " + ", ".join(f"{k}={v}" for k, v in sorted(counts.items())))
+
+    async def close(self):
+        """Close database connection."""
+        if self._initialized:
+            self._initialized = False
+            await self.db.close()
+
+    async def __call__(self, items: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        """Transform interface: diff ParsedItems, then emit removals at the end of the batch."""
+        # Start from the state saved by the previous batch
+        self._state.clear()
+        self._snapshots.clear()
+        self._seen.clear()
+        self.counters.clear()
+
+        async for item in items:
+            if isinstance(item, ParsedItem):
+                for out in await self.parse(item):
+                    yield out
+
+        async for removal_item in self._emit_removals():
+            yield removal_item
+        self.report()
@@ -208,8 +208,13 @@ def create_bot_commands(bot: ScraperBot):
 
         await interaction.response.defer(thinking=True)
         try:
-            await run_pipeline(bot.pipelines_cfg[name])
-            await interaction.followup.send(f"✅ Pipeline **{name}** completed successfully")
+            result = await run_pipeline(bot.pipelines_cfg[name])
+            if result.level == "ERROR":
+                await interaction.followup.send(f"❌ Pipeline **{name}** {result.message}")
+            elif result.level == "WARNING":
+                await interaction.followup.send(f"⚠️ Pipeline **{name}** {result.message}")
+            else:
+                await interaction.followup.send(f"✅ Pipeline **{name}** completed successfully")
         except Exception as exc:
             logger.exception("Pipeline %s failed: %s", name, exc)
             await interaction.followup.send(f"❌ Pipeline **{name}** failed: {exc}")
@@ -0,0 +1,175 @@
+"""
+fingerprint.py – skip fetched payloads that are byte-identical to the last run.
+
+Many sources publish the same document run after run (the FI ODS files,
+the Pokémon sets CSV, most AppMagic pages).  :class:`FingerprintFilter` sits
+between a fetcher and its parser and drops every :class:`RawItem` whose
+digest and size equal the ones recorded for the same key on the last
+successful run, so the parse, diff and sink work is skipped entirely::
+
+    chain:
+      - class: fi_shortinterest.FiFetcher
+      - class: core.infra.fingerprint.FingerprintFilter
+        kwargs:
+          db_path: db/fingerprints.db
+      - class: fi_shortinterest.FiAggParser
+
+The key is ``RawItem.source``; sources that emit many items (one per page
+or publisher) name the ``data`` fields that tell them apart with ``keys``
+(dotted paths reach into nested mappings)::
+
+    keys:
+      appmagic.publishers: [company.store_publisher_id]
+      appmagic.publisher_apps_api: [united_publisher_id, from_offset]
+
+New fingerprints are only stored when the whole pipeline exits cleanly and
+its writers lost no rows (see :meth:`QueryStats.dropped`) – stages are
+exited in reverse order, so the sinks have committed by then – and any
+other run is therefore retried in full on the next one.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from ..interfaces import Transform
+from ..models import RawItem
+from . import codec
+from .db import Database, Migration, query_stats
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["FingerprintFilter", "FingerprintStore", "fingerprint"]
+
+MIGRATIONS = [
+    Migration(1, "payload fingerprints", [
+        """
+            CREATE TABLE IF NOT EXISTS payload_fingerprints (
+                key TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """,
+    ]),
+]
+
+
+def fingerprint(item: RawItem) -> Tuple[str, int]:
+    """Digest and size of an item's payload (or of its encoded ``data``)."""
+    body = item.payload
+    if not body and item.data is not None:
+        try:
+            body = codec.dumps(item.data)
+        except TypeError:
+            body = json.dumps(item.data, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.blake2b(body, digest_size=16).hexdigest(), len(body)
+
+
+class FingerprintStore:
+    """Last processed fingerprint per key, persisted in a small SQLite table."""
+
+    def __init__(self, db_path: Union[str, Path] = "fingerprints.db") -> None:
+        self.db = Database(db_path, pooled=True, readers=0)
+        self._known: Dict[str, Tuple[str, int]] = {}
+
+    async def open(self) -> None:
+        await self.db.connect()
+        await self.db.migrate("fingerprints", MIGRATIONS)
+        rows = await self.db.fetch_all("SELECT key, digest, size FROM payload_fingerprints")
+        self._known = {row["key"]: (row["digest"], row["size"]) for row in rows}
+
+    def get(self, key: str) -> Optional[Tuple[str, int]]:
+        return self._known.get(key)
+
+    async def save(self, fingerprints: Mapping[str, Tuple[str, int]]) -> None:
+        if not fingerprints:
+            return
+        now = datetime.utcnow().isoformat()
+        await self.db.upsert_many(
+            "payload_fingerprints",
+            [{"key": k, "digest": d, "size": s, "updated_at": now} for k, (d, s) in fingerprints.items()],
+            ["key"],
+        )
+        self._known.update(fingerprints)
+
+    async def close(self) -> None:
+        await self.db.close()
+
+
+class FingerprintFilter(Transform):
+    """Pipeline stage that drops RawItems unchanged since the last successful run."""
+
+    name = "FingerprintFilter"
+
+    def __init__(
+        self,
+        db_path: str = "fingerprints.db",
+        keys: Optional[Mapping[str, Sequence[str]]] = None,
+        sources: Optional[Sequence[str]] = None,
+        **_: Any,
+    ) -> None:
+        """
+        Args:
+            db_path: SQLite file holding the fingerprints (may be shared by pipelines)
+            keys: source -> ``data`` fields that identify one item of that source
+            sources: only filter these sources (default: all); others pass through
+        """
+        self.store = FingerprintStore(db_path)
+        self.keys: Dict[str, List[str]] = {s: list(f) for s, f in (keys or {}).items()}
+        self.sources = set(sources) if sources is not None else None
+        self._pending: Dict[str, Tuple[str, int]] = {}
+        self._dropped_at_start = 0
+        self.counters: Counter = Counter()
+
+    async def __aenter__(self):
+        await self.store.open()
+        self._dropped_at_start = query_stats.dropped()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        try:
+            dropped = query_stats.dropped() - self._dropped_at_start
+            if exc_type is None and not dropped:
+                await self.store.save(self._pending)
+            elif self._pending:
+                reason = "run failed" if exc_type is not None else f"{dropped} rows were not written"
+                logger.info(f"{self.name}: {reason}, not recording {len(self._pending)} fingerprints")
+            if self.counters:
+                logger.info(f"{self.name}: " + ", ".join(f"{k}={v}" for k, v in sorted(self.counters.items())))
+        finally:
+            self._pending.clear()
+            await self.store.close()
+
+    def key(self, item: RawItem) -> str:
+        fields = self.keys.get(item.source)
+        if not fields:
+            return item.source
+        parts = [item.source]
+        for field in fields:
+            value = item.data
+            for name in field.split("."):
+                value = value.get(name) if isinstance(value, dict) else None
+            parts.append(str(value))
+        return "|".join(parts)
+
+    async def __call__(self, items: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        async for item in items:
+            if not isinstance(item, RawItem) or (self.sources is not None and item.source not in self.sources):
+                yield item
+                continue
+            key = self.key(item)
+            current = fingerprint(item)
+            if self.store.get(key) == current and key not in self._pending:
+                self.counters["unchanged"] += 1
+                logger.debug(f"Skipping unchanged payload {key} ({current[1]} bytes)")
+                continue
+            self.counters["changed"] += 1
+            self._pending[key] = current
+            yield item
@@ -1,6 +1,8 @@
 """
 http.py – Async HTTP client built on *aiohttp* with smart retries,
-          transparent 429 / 5xx back-off and per-instance default headers.
+          transparent 429 / 5xx back-off, per-host circuit breakers,
+          per-host / per-pipeline request metrics and per-instance default
+          headers.
 """
 
 from __future__ import annotations
@@ -9,13 +11,445 @@ import asyncio
 import logging
 import random
 import time
-from typing import Any, Dict, Mapping, MutableMapping, Optional
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, Mapping, MutableMapping, Optional, Tuple
+from urllib.parse import urlsplit
 
 import aiohttp
 
+from . import codec
+
 logger = logging.getLogger(__name__)
 
 
+# --------------------------------------------------------------------------- #
+# Request metrics
+# --------------------------------------------------------------------------- #
+# Label under which requests are aggregated; the orchestrator sets it for the
+# duration of a pipeline run (see :func:`pipeline_scope`).
+current_pipeline: ContextVar[str] = ContextVar("http_pipeline", default="-")
+
+
+@contextmanager
+def pipeline_scope(name: str) -> Iterator[None]:
+    """Attribute every request made inside the block to pipeline *name*."""
+    token = current_pipeline.set(name)
+    try:
+        yield
+    finally:
+        current_pipeline.reset(token)
+
+
+class _Timing:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self) -> Dict[str, float]:
+        avg = self.total / self.count if self.count else 0.0
+        return {"count": self.count, "avg": round(avg, 4), "max": round(self.max, 4), "sum": round(self.total, 4)}
+
+
+class HostStats:
+    """Counters and timings for one (pipeline, host) pair."""
+
+    TIMINGS = ("dns", "connect", "ttfb", "total")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.attempts = 0
+        self.retries = 0
+        self.backoff_seconds = 0.0
+        self.bytes_received = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.statuses: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.timings: Dict[str, _Timing] = {name: _Timing() for name in self.TIMINGS}
+        # recent per-attempt latencies (request sent -> response headers), used
+        # for percentile estimates; unlike "total" they exclude backoff sleeps
+        self.latencies: Deque[float] = deque(maxlen=256)
+
+    def observe(self, timing: str, seconds: float) -> None:
+        self.timings[timing].add(seconds)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "backoff_seconds": round(self.backoff_seconds, 3),
+            "bytes_received": self.bytes_received,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "statuses": dict(self.statuses),
+            "errors": dict(self.errors),
+            "timings": {name: t.as_dict() for name, t in self.timings.items()},
+        }
+
+
+class HttpStats:
+    """Process-wide request metrics aggregated per pipeline and host."""
+
+    def __init__(self) -> None:
+        self._buckets: Dict[Tuple[str, str], HostStats] = {}
+
+    def bucket(self, host: str, pipeline: Optional[str] = None) -> HostStats:
+        key = (pipeline if pipeline is not None else current_pipeline.get(), host)
+        stats = self._buckets.get(key)
+        if stats is None:
+            stats = self._buckets[key] = HostStats()
+        return stats
+
+    def snapshot(self, pipeline: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Return ``{pipeline: {host: stats}}`` (optionally for one pipeline)."""
+        out: Dict[str, Dict[str, Any]] = {}
+        for (pipe, host), stats in self._buckets.items():
+            if pipeline is None or pipe == pipeline:
+                out.setdefault(pipe, {})[host] = stats.as_dict()
+        return out
+
+    def latencies(self, host: str) -> list[float]:
+        """Recent per-attempt latencies for *host* across all pipelines."""
+        samples: list[float] = []
+        for (_, h), stats in self._buckets.items():
+            if h == host:
+                samples.extend(stats.latencies)
+        return samples
+
+    def reset(self, pipeline: Optional[str] = None) -> None:
+        for key in [k for k in self._buckets if pipeline is None or k[0] == pipeline]:
+            del self._buckets[key]
+
+    def log_summary(self, pipeline: str) -> None:
+        for (pipe, host), st in sorted(self._buckets.items()):
+            if pipe != pipeline:
+                continue
+            total = st.timings["total"]
+            logger.info(
+                "HTTP %s | %s: %d req, %d retries, %.1fs backoff, %.1fs total, "
+                "ttfb avg %.3fs, %d bytes, statuses=%s",
+                pipeline,
+                host,
+                st.requests,
+                st.retries,
+                st.backoff_seconds,
+                total.total,
+                st.timings["ttfb"].as_dict()["avg"],
+                st.bytes_received,
+                dict(st.statuses),
+            )
+
+
+http_stats = HttpStats()
+
+
+def _trace_stats(ctx: SimpleNamespace) -> Optional[Dict[str, Any]]:
+    req_ctx = ctx.trace_request_ctx
+    return req_ctx if isinstance(req_ctx, dict) and "stats" in req_ctx else None
+
+
+async def _on_request_start(session, ctx, params) -> None:
+    ctx.start = time.monotonic()
+
+
+async def _on_dns_start(session, ctx, params) -> None:
+    ctx.dns_start = time.monotonic()
+
+
+async def _on_dns_end(session, ctx, params) -> None:
+    req = _trace_stats(ctx)
+    if req is not None and hasattr(ctx, "dns_start"):
+        req["stats"].observe("dns", time.monotonic() - ctx.dns_start)
+
+
+async def _on_connect_start(session, ctx, params) -> None:
+    ctx.connect_start = time.monotonic()
+
+
+async def _on_connect_end(session, ctx, params) -> None:
+    req = _trace_stats(ctx)
+    if req is not None and hasattr(ctx, "connect_start"):
+        req["stats"].observe("connect", time.monotonic() - ctx.connect_start)
+
+
+async def _on_request_end(session, ctx, params) -> None:
+    # fired once response headers are in – i.e. time to first byte
+    req = _trace_stats(ctx)
+    if req is not None and hasattr(ctx, "start"):
+        req["stats"].observe("ttfb", time.monotonic() - ctx.start)
+
+
+async def _on_chunk(session, ctx, params) -> None:
+    req = _trace_stats(ctx)
+    if req is not None:
+        req["stats"].bytes_received += len(params.chunk)
+
+
+def _make_trace_config() -> aiohttp.TraceConfig:
+    trace = aiohttp.TraceConfig()
+    trace.on_request_start.append(_on_request_start)
+    trace.on_dns_resolvehost_start.append(_on_dns_start)
+    trace.on_dns_resolvehost_end.append(_on_dns_end)
+    trace.on_connection_create_start.append(_on_connect_start)
+    trace.on_connection_create_end.append(_on_connect_end)
+    trace.on_request_end.append(_on_request_end)
+    trace.on_response_chunk_received.append(_on_chunk)
+    return trace
+
+
+# --------------------------------------------------------------------------- #
+# Run-wide retry budget
+# --------------------------------------------------------------------------- #
+class RetryBudget:
+    """
+    Retries shared by every request of one pipeline run.
+
+    A run may retry ``ratio`` × requests made so far (but at least
+    ``min_retries`` and never more than ``max_retries``).  Once a retry is
+    refused the budget is *exhausted*: failing requests raise on their first
+    error instead of backing off, which puts a ceiling on how long a degraded
+    upstream can stretch a scheduled run.  Only connection errors, timeouts
+    and ``retry_for_status`` responses are charged.
+    """
+
+    def __init__(self, ratio: float = 0.2, max_retries: int = 100, min_retries: int = 10) -> None:
+        self.ratio = ratio
+        self.max_retries = max_retries
+        self.min_retries = min_retries
+        self.requests = 0
+        self.retries = 0
+        self.denied = 0
+
+    @property
+    def allowed(self) -> int:
+        return min(self.max_retries, max(self.min_retries, int(self.ratio * self.requests)))
+
+    @property
+    def exhausted(self) -> bool:
+        return self.denied > 0
+
+    def on_request(self) -> None:
+        self.requests += 1
+
+    def try_spend(self) -> bool:
+        if self.retries < self.allowed:
+            self.retries += 1
+            return True
+        self.denied += 1
+        return False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "allowed": self.allowed,
+            "denied": self.denied,
+        }
+
+
+current_retry_budget: ContextVar[Optional[RetryBudget]] = ContextVar("http_retry_budget", default=None)
+
+
+@contextmanager
+def retry_budget_scope(budget: Optional[RetryBudget]) -> Iterator[Optional[RetryBudget]]:
+    """Make every request inside the block draw its retries from *budget*."""
+    token = current_retry_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        current_retry_budget.reset(token)
+
+
+# --------------------------------------------------------------------------- #
+# Request hedging
+# --------------------------------------------------------------------------- #
+class HedgeBudget:
+    """
+    Token bucket limiting hedged (duplicate) requests for one host.
+
+    Every primary request deposits ``ratio`` tokens (capped at ``burst``) and
+    every hedge spends one, so in steady state at most ``ratio`` of the
+    traffic to a host is duplicated no matter how slow it gets.
+    """
+
+    def __init__(self, ratio: float = 0.1, burst: float = 5.0) -> None:
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = burst
+
+    def on_request(self) -> None:
+        self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        return False
+
+
+_HEDGE_BUDGETS: Dict[str, HedgeBudget] = {}
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, int(round(pct * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+# --------------------------------------------------------------------------- #
+# Circuit breaker
+# --------------------------------------------------------------------------- #
+class CircuitOpenError(aiohttp.ClientError):
+    """Raised instead of sending a request while the host's breaker is open."""
+
+    def __init__(self, host: str, retry_in: float) -> None:
+        super().__init__(f"circuit open for {host} (retry in {retry_in:.1f}s)")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker for a single host.
+
+    * **closed** – requests flow; outcomes go into a rolling window.  Once the
+      window holds ``min_calls`` outcomes and the failure rate reaches
+      ``failure_rate`` the breaker trips.
+    * **open** – every call fails fast with :class:`CircuitOpenError` until
+      ``cooldown`` seconds have passed.
+    * **half_open** – up to ``half_open_calls`` probe requests are let through;
+      a success closes the breaker, a failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        host: str,
+        *,
+        failure_rate: float = 0.5,
+        window: int = 20,
+        min_calls: int = 5,
+        cooldown: float = 30.0,
+        half_open_calls: int = 1,
+    ) -> None:
+        self.host = host
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self.half_open_calls = half_open_calls
+
+        self._state = self.CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._trips = 0
+        self._rejected = 0
+
+    # ---------------------------------------------- #
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+            self._transition(self.HALF_OPEN)
+        return self._state
+
+    def before_call(self) -> None:
+        """Admit a call or raise :class:`CircuitOpenError`."""
+        state = self.state
+        if state == self.OPEN:
+            self._rejected += 1
+            raise CircuitOpenError(self.host, self.cooldown - (time.monotonic() - self._opened_at))
+        if state == self.HALF_OPEN:
+            if self._probes >= self.half_open_calls:
+                self._rejected += 1
+                raise CircuitOpenError(self.host, 0.0)
+            self._probes += 1
+
+    def record_success(self) -> None:
+        self._release()
+        if self._state == self.HALF_OPEN:
+            self._transition(self.CLOSED)
+            return
+        self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        self._release()
+        if self._state == self.HALF_OPEN:
+            self._trip()
+            return
+        self._outcomes.append(False)
+        if self._state == self.CLOSED and len(self._outcomes) >= self.min_calls:
+            failures = self._outcomes.count(False)
+            if failures / len(self._outcomes) >= self.failure_rate:
+                self._trip()
+
+    def release(self) -> None:
+        """Give back an admitted call that ended without an outcome (e.g. cancelled)."""
+        self._release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the breaker's state for metrics / logging."""
+        failures = self._outcomes.count(False)
+        return {
+            "state": self.state,
+            "window_calls": len(self._outcomes),
+            "window_failures": failures,
+            "trips": self._trips,
+            "rejected": self._rejected,
+        }
+
+    # ---------------------------------------------- #
+    def _release(self) -> None:
+        if self._probes:
+            self._probes -= 1
+
+    def _trip(self) -> None:
+        self._opened_at = time.monotonic()
+        self._trips += 1
+        self._transition(self.OPEN)
+
+    def _transition(self, state: str) -> None:
+        if state == self._state:
+            return
+        logger.warning("Circuit for %s: %s -> %s", self.host, self._state, state)
+        self._state = state
+        self._probes = 0
+        if state == self.CLOSED:
+            self._outcomes.clear()
+
+
+# Breakers are shared process-wide so every HttpClient talking to the same
+# host sees (and contributes to) the same health signal.
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(host: str, **options: Any) -> CircuitBreaker:
+    """Return the shared breaker for *host*, creating it with *options* on first use."""
+    breaker = _BREAKERS.get(host)
+    if breaker is None:
+        breaker = _BREAKERS[host] = CircuitBreaker(host, **options)
+    return breaker
+
+
+def circuit_breaker_states() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of every known breaker keyed by host."""
+    return {host: breaker.snapshot() for host, breaker in _BREAKERS.items()}
+
+
 class HttpClient:
     """
     Thin wrapper over *aiohttp.ClientSession* adding:
@@ -23,6 +457,13 @@ class HttpClient:
     * global & per-request headers (keeps user-agent in one place)
     * exponential back-off **with jitter** for 429 / 5xx / network errors
     * transparent parsing of *Retry-After* header
+    * per-host circuit breaker – calls fail fast while a host is down
+    * request metrics (DNS / connect / TTFB / total timings, statuses, retries,
+      backoff time, bytes) aggregated per pipeline and host in :data:`http_stats`
+    * opt-in request hedging for GETs (``hedge=True``): a duplicate is fired if
+      no response arrives within the host's per-attempt latency percentile,
+      bounded by a per-host :class:`HedgeBudget`; other methods raise ValueError
+    * retries drawn from the active run-wide :class:`RetryBudget`, if any
     * async context-manager support
     """
 
@@ -35,6 +476,13 @@ class HttpClient:
         base_delay: float = 1.0,
         max_delay: float = 60.0,
         default_headers: Optional[Mapping[str, str]] = None,
+        circuit_breaker: bool = True,
+        breaker_options: Optional[Mapping[str, Any]] = None,
+        hedge_percentile: float = 0.95,
+        hedge_min_samples: int = 20,
+        hedge_default_delay: float = 1.0,
+        hedge_min_delay: float = 0.05,
+        hedge_budget_ratio: float = 0.1,
     ) -> None:
         self._external_session = session
         self._timeout = timeout
@@ -43,6 +491,13 @@ class HttpClient:
         self._max_delay = max_delay
         self._own_session: Optional[aiohttp.ClientSession] = None
         self._default_headers: Dict[str, str] = dict(default_headers or {})
+        self._circuit_breaker = circuit_breaker
+        self._breaker_options: Dict[str, Any] = dict(breaker_options or {})
+        self._hedge_percentile = hedge_percentile
+        self._hedge_min_samples = hedge_min_samples
+        self._hedge_default_delay = hedge_default_delay
+        self._hedge_min_delay = hedge_min_delay
+        self._hedge_budget_ratio = hedge_budget_ratio
 
     # ---------------------------------------------- #
     # Async context-manager
@@ -60,7 +515,9 @@ class HttpClient:
             return self._external_session
         if self._own_session is None or self._own_session.closed:
             timeout = aiohttp.ClientTimeout(total=self._timeout)
-            self._own_session = aiohttp.ClientSession(timeout=timeout)
+            self._own_session = aiohttp.ClientSession(
+                timeout=timeout, trace_configs=[_make_trace_config()]
+            )
         return self._own_session
 
     async def close(self) -> None:
@@ -88,6 +545,17 @@ class HttpClient:
         except Exception:
             return None
 
+    def _breaker_for(self, url: str) -> Optional[CircuitBreaker]:
+        if not self._circuit_breaker:
+            return None
+        host = urlsplit(url).netloc
+        return get_circuit_breaker(host, **self._breaker_options) if host else None
+
+    @staticmethod
+    def circuit_states() -> Dict[str, Dict[str, Any]]:
+        """Per-host breaker snapshots (see :func:`circuit_breaker_states`)."""
+        return circuit_breaker_states()
+
     def _merge_headers(self, extra: Mapping[str, str] | None) -> Dict[str, str]:
         merged: Dict[str, str] = {**self._default_headers}
         if extra:
@@ -100,17 +568,60 @@ class HttpClient:
         url: str,
         *,
         retry_for_status: tuple[int, ...] = (429, 500, 502, 503, 504),
+        hedged: bool = False,
         **kwargs,
     ) -> aiohttp.ClientResponse:
-        """Perform a request with retries; returns *aiohttp.ClientResponse*."""
+        """Perform a request with retries; returns *aiohttp.ClientResponse*.
+
+        A *hedged* request duplicates one already in flight: it is counted
+        only in ``hedges``, does not credit the retry budget and is not
+        retried itself.
+        """
         session = await self._ensure_session()
 
         headers = self._merge_headers(kwargs.pop("headers", None))
         kwargs["headers"] = headers
 
-        for attempt in range(1, self._max_retries + 1):
+        breaker = self._breaker_for(url)
+        stats = http_stats.bucket(urlsplit(url).netloc)
+        kwargs["trace_request_ctx"] = {"stats": stats}
+        budget = current_retry_budget.get()
+        if hedged:
+            stats.hedges += 1
+            max_attempts = 1
+        else:
+            stats.requests += 1
+            if budget is not None:
+                budget.on_request()
+            max_attempts = self._max_retries
+
+        for attempt in range(1, max_attempts + 1):
+            if breaker is not None:
+                breaker.before_call()
+            if not hedged:
+                stats.attempts += 1
             try:
-                resp = await session.request(method, url, **kwargs)
+                try:
+                    sent = time.monotonic()
+                    resp = await session.request(method, url, **kwargs)
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as exc:
+                    stats.errors[type(exc).__name__] += 1
+                    if breaker is not None:
+                        breaker.record_failure()
+                    raise
+                except asyncio.CancelledError:
+                    if breaker is not None:
+                        breaker.release()
+                    raise
+                stats.latencies.append(time.monotonic() - sent)
+                stats.statuses[resp.status] += 1
+                if breaker is not None:
+                    # 4xx means the host is up and answering – only 5xx counts
+                    if resp.status >= 500:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+
                 if resp.status not in retry_for_status:
                     resp.raise_for_status()
                     return resp
@@ -126,10 +637,25 @@ class HttpClient:
                 )
             except (aiohttp.ClientConnectionError, aiohttp.ClientResponseError) as e:
                 # final attempt – re-raise
-                if attempt == self._max_retries:
+                if attempt == max_attempts:
                     logger.error("HTTP %s %s failed after %d attempts: %s", method, url, attempt, e)
                     raise
 
+                # host just tripped its breaker – don't sleep only to be rejected
+                if breaker is not None and breaker.state == CircuitBreaker.OPEN:
+                    logger.error("HTTP %s %s aborted after %d attempts: circuit open", method, url, attempt)
+                    raise CircuitOpenError(breaker.host, breaker.cooldown) from e
+
+                # the run has used up its retries – fail fast; only retryable
+                # failures draw on it, other 4xx are retried as before for free
+                retryable = not isinstance(e, aiohttp.ClientResponseError) or e.status in retry_for_status
+                if budget is not None and retryable and not budget.try_spend():
+                    logger.error(
+                        "HTTP %s %s failed after %d attempts: retry budget exhausted (%d/%d used)",
+                        method, url, attempt, budget.retries, budget.allowed,
+                    )
+                    raise
+
                 # determine sleep time
                 sleep_seconds: float
                 retry_after_hdr = (
@@ -148,10 +674,12 @@ class HttpClient:
                     method,
                     url,
                     attempt,
-                    self._max_retries,
+                    max_attempts,
                     sleep_seconds,
                     str(e).splitlines()[0],
                 )
+                stats.retries += 1
+                stats.backoff_seconds += sleep_seconds
                 await asyncio.sleep(sleep_seconds)
             except asyncio.CancelledError:  # pragma: no cover
                 raise
@@ -162,21 +690,101 @@ class HttpClient:
         # Should never hit here
         raise RuntimeError("Unreachable retry loop")
 
+    async def _fetch(
+        self,
+        method: str,
+        url: str,
+        read: Callable[[aiohttp.ClientResponse], Awaitable[Any]],
+        *,
+        hedge: bool = False,
+        **kwargs,
+    ) -> Any:
+        """Run :meth:`_request`, read the body and record the wall time."""
+        if hedge and method != "GET":
+            # a duplicate of a non-idempotent request could apply it twice
+            raise ValueError(f"hedge=True is only supported for GET, not {method}")
+        start = time.monotonic()
+        try:
+            if hedge:
+                return await self._hedged_read(method, url, read, **kwargs)
+            return await self._read(method, url, read, **kwargs)
+        finally:
+            # whole logical request: retries, backoff and hedging included
+            http_stats.bucket(urlsplit(url).netloc).observe("total", time.monotonic() - start)
+
+    async def _read(
+        self,
+        method: str,
+        url: str,
+        read: Callable[[aiohttp.ClientResponse], Awaitable[Any]],
+        **kwargs,
+    ) -> Any:
+        async with await self._request(method, url, **kwargs) as resp:
+            return await read(resp)
+
+    def _hedge_delay(self, host: str) -> float:
+        samples = http_stats.latencies(host)
+        if len(samples) < self._hedge_min_samples:
+            return self._hedge_default_delay
+        return max(self._hedge_min_delay, _percentile(samples, self._hedge_percentile))
+
+    async def _hedged_read(
+        self,
+        method: str,
+        url: str,
+        read: Callable[[aiohttp.ClientResponse], Awaitable[Any]],
+        **kwargs,
+    ) -> Any:
+        """Send *url*; if it is slower than the host's percentile, race a duplicate."""
+        host = urlsplit(url).netloc
+        budget = _HEDGE_BUDGETS.get(host)
+        if budget is None:
+            budget = _HEDGE_BUDGETS[host] = HedgeBudget(self._hedge_budget_ratio)
+        budget.on_request()
+
+        primary = asyncio.create_task(self._read(method, url, read, **dict(kwargs)))
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self._hedge_delay(host))
+            if done:
+                return primary.result()
+
+            # don't pile duplicates onto a host that is already failing
+            breaker = self._breaker_for(url)
+            if (breaker is not None and breaker.state != CircuitBreaker.CLOSED) or not budget.try_acquire():
+                return await primary
+
+            logger.debug("Hedging HTTP %s %s", method, url)
+            backup = asyncio.create_task(self._read(method, url, read, hedged=True, **dict(kwargs)))
+            pending.add(backup)
+
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winners = [task for task in done if task.exception() is None]
+                if winners:
+                    if winners[0] is backup:
+                        http_stats.bucket(host).hedge_wins += 1
+                    return winners[0].result()
+                error = next(iter(done)).exception()
+            assert error is not None
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
     # ---------------------------------------------- #
     # Public helpers
     async def get_text(self, url: str, **kwargs) -> str:
-        async with await self._request("GET", url, **kwargs) as resp:
-            return await resp.text()
+        return await self._fetch("GET", url, lambda resp: resp.text(), **kwargs)
 
     async def get_json(self, url: str, **kwargs) -> Any:
-        async with await self._request("GET", url, **kwargs) as resp:
-            return await resp.json(content_type=None)
+        return await self._fetch("GET", url, self._read_json, **kwargs)
 
     async def get_bytes(self, url: str, **kwargs) -> bytes:
         # larger timeout for binary payloads
         kwargs.setdefault("timeout", aiohttp.ClientTimeout(total=self._timeout * 2))
-        async with await self._request("GET", url, **kwargs) as resp:
-            return await resp.read()
+        return await self._fetch("GET", url, lambda resp: resp.read(), **kwargs)
 
     async def post_json(
         self,
@@ -187,11 +795,19 @@ class HttpClient:
         **kwargs,
     ) -> Any:
         if json:
-            kwargs["json"] = data
+            headers = dict(kwargs.pop("headers", None) or {})
+            headers.setdefault("Content-Type", "application/json")
+            kwargs["headers"] = headers
+            kwargs["data"] = codec.dumps(data)
         else:
             kwargs["data"] = data
-        async with await self._request("POST", url, **kwargs) as resp:
-            return await resp.json(content_type=None)
+        return await self._fetch("POST", url, self._read_json, **kwargs)
+
+    @staticmethod
+    async def _read_json(resp: aiohttp.ClientResponse) -> Any:
+        # decode straight from bytes; empty body -> None like resp.json()
+        body = await resp.read()
+        return codec.loads(body) if body.strip() else None
 
     # ---------------------------------------------- #
     # Mutators
@@ -0,0 +1,132 @@
+"""
+parquet.py – atomic Parquet file writing on top of the optional pyarrow.
+
+pyarrow is an optional dependency (``pip install .[parquet]``); importing
+this module always works, :func:`require_pyarrow` raises a clear error when
+a feature actually needs it.
+
+:class:`AtomicParquetWriter` appends column chunks as row groups to a
+hidden temporary file next to the target and only renames it into place on
+:meth:`~AtomicParquetWriter.commit`, so readers never see a partial file.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import uuid
+from pathlib import Path
+from typing import Any, Mapping, Optional, Sequence, Tuple, Union
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on installed extras
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["AtomicParquetWriter", "available", "require_pyarrow", "schema_from_sqlite"]
+
+COMPRESSION = "zstd"
+
+
+def available() -> bool:
+    return pa is not None
+
+
+def require_pyarrow() -> None:
+    if pa is None:
+        raise RuntimeError(
+            "pyarrow is required for Parquet output; install it with "
+            "`pip install pyarrow` or `pip install .[parquet]`"
+        )
+
+
+def _arrow_type(decltype: str) -> "pa.DataType":
+    """Map a SQLite declared column type to Arrow (dates are stored as ISO text)."""
+    decl = (decltype or "").upper()
+    if "INT" in decl:
+        return pa.int64()
+    if any(t in decl for t in ("CHAR", "CLOB", "TEXT", "DATE", "TIME")):
+        return pa.string()
+    if "BLOB" in decl:
+        return pa.binary()
+    if any(t in decl for t in ("REAL", "FLOA", "DOUB", "DEC", "NUM")):
+        return pa.float64()
+    return pa.string()
+
+
+def schema_from_sqlite(columns: Sequence[Tuple[str, str]]) -> "pa.Schema":
+    """Arrow schema from ``(name, declared_type)`` pairs, e.g. ``PRAGMA table_info``."""
+    require_pyarrow()
+    return pa.schema([(name, _arrow_type(decl)) for name, decl in columns])
+
+
+class AtomicParquetWriter:
+    """Write row groups to *path*, visible only after :meth:`commit`."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        *,
+        schema: Optional["pa.Schema"] = None,
+        compression: str = COMPRESSION,
+        compression_level: Optional[int] = None,
+    ) -> None:
+        require_pyarrow()
+        self.path = Path(path)
+        self.schema = schema
+        self.compression = compression
+        self.compression_level = compression_level
+        self.rows = 0
+        self.row_groups = 0
+        self._tmp = self.path.with_name(f".{self.path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        self._writer: Optional["pq.ParquetWriter"] = None
+
+    def write(self, columns: Union[Mapping[str, Sequence[Any]], "pa.Table"]) -> None:
+        """Append one row group from ``{column: values}`` (or an Arrow table)."""
+        if isinstance(columns, Mapping):
+            table = pa.table(dict(columns), schema=self.schema)
+        else:
+            table = columns if self.schema is None else columns.cast(self.schema)
+        if table.num_rows == 0:
+            return
+        if self._writer is None:
+            self.schema = table.schema
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._writer = pq.ParquetWriter(
+                self._tmp,
+                table.schema,
+                compression=self.compression,
+                compression_level=self.compression_level,
+            )
+        # one write_table call per chunk keeps each chunk a single row group
+        self._writer.write_table(table, row_group_size=table.num_rows)
+        self.rows += table.num_rows
+        self.row_groups += 1
+
+    def commit(self) -> Optional[Path]:
+        """Close and atomically move the file into place; ``None`` if nothing was written."""
+        if self._writer is None:
+            return None
+        self._writer.close()
+        self._writer = None
+        os.replace(self._tmp, self.path)
+        logger.debug(f"Committed {self.path} ({self.rows} rows, {self.row_groups} row groups)")
+        return self.path
+
+    def abort(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self._tmp.unlink(missing_ok=True)
+
+    def __enter__(self) -> "AtomicParquetWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
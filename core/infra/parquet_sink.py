@@ -0,0 +1,197 @@
+"""
+parquet_sink.py – columnar copy of ParsedItems as partitioned Parquet datasets.
+
+Runs next to the SQLite sinks so full scans (analysis scripts, DuckDB) read
+compressed column files instead of the operational databases.  Items are
+laid out hive-style, one directory per topic and day::
+
+    <root_dir>/topic=tcg.price_history/date=2024-06-01/part-210003-1a2b3c4d.parquet
+
+Rows are buffered per partition and written as one row group every
+``row_group_rows`` rows; each part file is written under a temporary name
+and renamed into place when the sink closes (or the file reaches
+``max_file_rows``), so readers only ever see complete files.  The partition
+day is the item's ``discovered_at`` unless ``date_field`` names a content
+key (e.g. ``bucket_start_date``).
+
+The copy is independent of the SQLite sinks: it holds every item this sink
+was handed, whether or not the database stored it (a row may still sit in
+a BufferedWriter, or be rejected by a constraint), so don't treat it as a
+mirror of the tables.
+
+Requires pyarrow (``pip install .[parquet]``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..interfaces import Sink
+from ..models import ParsedItem
+from . import parquet
+
+logger = logging.getLogger(__name__)
+
+Partition = Tuple[str, str]  # (topic, date)
+
+
+def _column(values: List[Any]) -> "parquet.pa.Array":
+    """Arrow array for one column; mixed-type columns fall back to text."""
+    pa = parquet.pa
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+
+def _conform(table: "parquet.pa.Table", schema: "parquet.pa.Schema") -> Optional["parquet.pa.Table"]:
+    """Cast *table* to an open file's schema; ``None`` if it cannot be (new file needed)."""
+    pa = parquet.pa
+    if not set(table.column_names) <= set(schema.names):
+        return None
+    columns = []
+    try:
+        for field in schema:
+            if field.name in table.column_names:
+                columns.append(table.column(field.name).cast(field.type))
+            else:
+                columns.append(pa.nulls(table.num_rows, field.type))
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+        return None
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+class ParquetSink(Sink):
+    """Append ParsedItems to ``<root_dir>/topic=<topic>/date=<day>/`` Parquet files."""
+
+    def __init__(
+        self,
+        root_dir: str = "parquet",
+        topics: Optional[Sequence[str]] = None,
+        date_field: Optional[str] = None,
+        row_group_rows: int = 50_000,
+        max_file_rows: int = 1_000_000,
+        compression: str = parquet.COMPRESSION,
+        compression_level: Optional[int] = None,
+        **kwargs,
+    ):
+        """
+        Initialize ParquetSink.
+
+        Args:
+            root_dir: Dataset root directory
+            topics: Topics to write (all topics if None)
+            date_field: Content key holding the partition date (default: discovered_at)
+            row_group_rows: Rows buffered per partition before a row group is written
+            max_file_rows: Rows per part file before it is committed and a new one started
+            compression: Parquet codec (zstd, snappy, gzip, lz4, brotli, none)
+            compression_level: Codec level, codec default if None
+        """
+        parquet.require_pyarrow()
+        self.root_dir = Path(root_dir)
+        self.topics = set(topics) if topics is not None else None
+        self.date_field = date_field
+        self.row_group_rows = row_group_rows
+        self.max_file_rows = max_file_rows
+        self.compression = compression
+        self.compression_level = compression_level
+        self._buffers: Dict[Partition, List[Dict[str, Any]]] = {}
+        self._writers: Dict[Partition, parquet.AtomicParquetWriter] = {}
+        self.files: List[Path] = []
+        self.rows = 0
+
+    @property
+    def name(self) -> str:
+        return "ParquetSink"
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        # Commit whatever was written, even if a later stage failed; the
+        # files are append-only and independent of the SQLite sinks
+        await self.close()
+
+    def _partition(self, item: ParsedItem) -> Partition:
+        value: Any = item.discovered_at
+        if self.date_field is not None:
+            value = item.content.get(self.date_field) or item.discovered_at
+        if isinstance(value, (date, datetime)):
+            day = value.strftime("%Y-%m-%d")
+        else:
+            day = str(value)[:10]
+        return item.topic, day
+
+    async def handle(self, item: Any) -> None:
+        if not isinstance(item, ParsedItem):
+            return
+        if self.topics is not None and item.topic not in self.topics:
+            return
+        key = self._partition(item)
+        row = dict(item.content)
+        row.setdefault("discovered_at", item.discovered_at)
+        buffer = self._buffers.setdefault(key, [])
+        buffer.append(row)
+        if len(buffer) >= self.row_group_rows:
+            await self._flush(key)
+
+    async def _flush(self, key: Partition) -> None:
+        rows = self._buffers.pop(key, None)
+        if rows:
+            # arrow conversion and compression are CPU bound; keep the loop free
+            await asyncio.to_thread(self._write_row_group, key, rows)
+
+    def _new_writer(self, key: Partition) -> parquet.AtomicParquetWriter:
+        topic, day = key
+        stamp = datetime.utcnow().strftime("%H%M%S")
+        path = self.root_dir / f"topic={topic}" / f"date={day}" / f"part-{stamp}-{uuid.uuid4().hex[:8]}.parquet"
+        return parquet.AtomicParquetWriter(
+            path, compression=self.compression, compression_level=self.compression_level
+        )
+
+    def _commit(self, key: Partition) -> None:
+        writer = self._writers.pop(key, None)
+        if writer is not None:
+            path = writer.commit()
+            if path is not None:
+                self.files.append(path)
+
+    def _write_row_group(self, key: Partition, rows: List[Dict[str, Any]]) -> None:
+        names = list(dict.fromkeys(name for row in rows for name in row))
+        table = parquet.pa.table({name: _column([row.get(name) for row in rows]) for name in names})
+
+        writer = self._writers.get(key)
+        if writer is not None:
+            conformed = _conform(table, writer.schema)
+            if conformed is None:
+                # schema changed (new column / incompatible type): start a new file
+                logger.debug(f"Schema change for {key}, starting a new part file")
+                self._commit(key)
+                writer = None
+            else:
+                table = conformed
+        if writer is None:
+            writer = self._writers[key] = self._new_writer(key)
+
+        writer.write(table)
+        self.rows += table.num_rows
+        if writer.rows >= self.max_file_rows:
+            self._commit(key)
+
+    async def close(self) -> None:
+        """Write buffered rows and commit every open part file."""
+        try:
+            for key in list(self._buffers):
+                await self._flush(key)
+        finally:
+            for key in list(self._writers):
+                self._commit(key)
+        if self.files:
+            logger.info(f"ParquetSink wrote {self.rows} rows to {len(self.files)} files under {self.root_dir}")
+            self.files = []
+            self.rows = 0
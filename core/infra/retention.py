@@ -0,0 +1,280 @@
+"""
+Time-partitioned history tables with retention and Parquet archival.
+
+History tables keep only recent rows in the table the sinks write to (the
+*hot* table).  Older rows are moved, one period at a time, into partition
+tables ``<table>__p<period>`` in the same file.  A view ``<table>_all``
+always unions the hot table with every partition, so full-history queries
+keep working.  Partitions past ``archive_after_months`` are written to
+``<archive_dir>/<db name>/<table>/<period>.parquet`` (zstd) and dropped from
+SQLite; anything past ``drop_after_months`` is deleted, Parquet included.
+
+The job runs as a pipeline stage so it can be scheduled like any other::
+
+    retention:
+      schedule: {cron: "30 3 * * *"}
+      chain:
+        - class: core.infra.retention.RetentionJob
+          kwargs:
+            archive_dir: archive
+            tables:
+              - db_path: db/tcg.db
+                table: price_history
+                time_column: bucket_start_date
+                hot_months: 13
+                archive_after_months: 36
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Literal, Mapping, Optional, Sequence
+
+from pydantic import BaseModel, Field
+
+from ..interfaces import Transform
+from . import parquet
+from .db import Database
+
+logger = logging.getLogger(__name__)
+
+# period key length in an ISO timestamp: "2024" / "2024-03"
+_PERIOD_CHARS = {"year": 4, "month": 7}
+
+
+class RetentionPolicy(BaseModel):
+    """Partitioning and retention settings for one history table."""
+    db_path: str
+    table: str = Field(pattern=r"^\w+$")
+    time_column: str = Field(pattern=r"^\w+$")  # ISO date / timestamp text
+    partition: Literal["month", "year"] = "month"
+    hot_months: int = Field(default=3, ge=0)
+    archive_after_months: Optional[int] = None
+    drop_after_months: Optional[int] = None
+
+    @property
+    def view(self) -> str:
+        return f"{self.table}_all"
+
+    def partition_table(self, period: str) -> str:
+        return partition_table(self.table, period)
+
+    def period_of(self, value: str) -> str:
+        return value[: _PERIOD_CHARS[self.partition]]
+
+    def cutoff(self, months: int, today: Optional[date] = None) -> str:
+        """Period key *months* months before today's period; older periods qualify."""
+        today = today or datetime.utcnow().date()
+        index = today.year * 12 + today.month - 1 - months
+        return self.period_of(f"{index // 12:04d}-{index % 12 + 1:02d}")
+
+
+def next_period(period: str) -> str:
+    """Exclusive upper bound of a period key for range predicates."""
+    if len(period) == 4:
+        return f"{int(period) + 1:04d}"
+    year, month = int(period[:4]), int(period[5:7])
+    return f"{year + month // 12:04d}-{month % 12 + 1:02d}"
+
+
+def partition_table(table: str, period: str) -> str:
+    return f"{table}__p{period.replace('-', '_')}"
+
+
+async def _columns(db: Database, table: str) -> List[str]:
+    return [row["name"] for row in await db.fetch_all(f"PRAGMA table_info({table})")]
+
+
+async def partitions(db: Database, table: str) -> List[str]:
+    """Period keys of *table*'s partition tables that exist, oldest first."""
+    prefix = f"{table}__p"
+    rows = await db.fetch_all(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND substr(name, 1, ?) = ?",
+        (len(prefix), prefix),
+    )
+    periods = []
+    for row in rows:
+        suffix = row[0][len(prefix):]
+        if re.fullmatch(r"\d{4}(_\d{2})?", suffix):
+            periods.append(suffix.replace("_", "-"))
+    return sorted(periods)
+
+
+async def rebuild_view(db: Database, table: str) -> None:
+    """(Re)create ``<table>_all`` over the hot table and all its partitions.
+
+    Columns are listed explicitly; partitions created before a column was
+    added to the hot table contribute NULL for it.
+    """
+    columns = await _columns(db, table)
+    selects = [f"SELECT {', '.join(columns)} FROM {table}"]
+    for period in await partitions(db, table):
+        name = partition_table(table, period)
+        present = set(await _columns(db, name))
+        selects.append(
+            "SELECT " + ", ".join(c if c in present else f"NULL AS {c}" for c in columns) + f" FROM {name}"
+        )
+    async with db.transaction():
+        await db.execute(f"DROP VIEW IF EXISTS {table}_all")
+        await db.execute(f"CREATE VIEW {table}_all AS " + " UNION ALL ".join(selects))
+
+
+class RetentionManager:
+    """Applies one :class:`RetentionPolicy` to its database."""
+
+    def __init__(self, db: Database, policy: RetentionPolicy, archive_dir: Path) -> None:
+        self.db = db
+        self.policy = policy
+        self.archive_dir = archive_dir / Path(db.db_path).stem / policy.table
+
+    async def partitions(self) -> List[str]:
+        """Period keys of the partition tables that exist, oldest first."""
+        return await partitions(self.db, self.policy.table)
+
+    async def _partition_ddl(self, period: str) -> str:
+        row = await self.db.fetch_one(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (self.policy.table,)
+        )
+        if row is None:
+            raise LookupError(f"Table {self.policy.table} does not exist in {self.db.db_path}")
+        # same columns and constraints, new name
+        return re.sub(
+            rf"^\s*CREATE\s+TABLE\s+(IF\s+NOT\s+EXISTS\s+)?[\"`\[]?{self.policy.table}[\"`\]]?",
+            f"CREATE TABLE IF NOT EXISTS {self.policy.partition_table(period)}",
+            row[0],
+            count=1,
+            flags=re.IGNORECASE,
+        )
+
+    async def rebuild_view(self) -> None:
+        await rebuild_view(self.db, self.policy.table)
+
+    async def move_cold_rows(self, today: Optional[date] = None) -> Dict[str, int]:
+        """Move hot-table rows older than ``hot_months`` into their partitions."""
+        p = self.policy
+        cutoff = p.cutoff(p.hot_months, today)
+        rows = await self.db.fetch_all(
+            f"SELECT DISTINCT substr({p.time_column}, 1, ?) FROM {p.table} WHERE {p.time_column} < ?",
+            (len(cutoff), cutoff),
+        )
+        moved: Dict[str, int] = {}
+        for (period,) in rows:
+            if not period or len(period) != len(cutoff):
+                logger.warning(f"{p.table}: skipping rows with unparseable {p.time_column} {period!r}")
+                continue
+            ddl = await self._partition_ddl(period)
+            bounds = (period, next_period(period))
+            where = f"{p.time_column} >= ? AND {p.time_column} < ?"
+            hot = await _columns(self.db, p.table)
+            # an existing partition may predate columns added to the hot table
+            present = set(await _columns(self.db, p.partition_table(period))) or set(hot)
+            columns = ", ".join(c for c in hot if c in present)
+            async with self.db.transaction():
+                await self.db.execute(ddl)
+                await self.db.execute(
+                    f"INSERT OR REPLACE INTO {p.partition_table(period)} ({columns}) "
+                    f"SELECT {columns} FROM {p.table} WHERE {where}",
+                    bounds,
+                )
+                cursor = await self.db.execute(f"DELETE FROM {p.table} WHERE {where}", bounds)
+                moved[period] = cursor.rowcount
+        return moved
+
+    def _archive_path(self, period: str) -> Path:
+        # late rows can re-create an archived period; never overwrite its file
+        target = self.archive_dir / f"{period}.parquet"
+        n = 0
+        while target.exists():
+            n += 1
+            target = self.archive_dir / f"{period}.{n}.parquet"
+        return target
+
+    async def archive_partition(self, period: str) -> Optional[Path]:
+        """Export one partition to Parquet and drop it; ``None`` if it was empty."""
+        name = self.policy.partition_table(period)
+        info = await self.db.fetch_all(f"PRAGMA table_info({name})")
+        schema = parquet.schema_from_sqlite([(row["name"], row["type"]) for row in info])
+        target = self._archive_path(period)
+
+        writer = parquet.AtomicParquetWriter(target, schema=schema)
+        try:
+            async for chunk in self.db.iterate(f"SELECT * FROM {name}", chunk_size=50_000, columnar=True):
+                writer.write(chunk)
+            path = writer.commit()
+        except BaseException:
+            writer.abort()
+            raise
+
+        async with self.db.transaction():
+            await self.db.execute(f"DROP TABLE {name}")
+        logger.info(f"Archived {name} to {path or '(empty partition)'} ({writer.rows} rows)")
+        return path
+
+    async def drop_expired(self, today: Optional[date] = None) -> List[str]:
+        """Delete partitions and Parquet files past ``drop_after_months``."""
+        p = self.policy
+        if p.drop_after_months is None:
+            return []
+        cutoff = p.cutoff(p.drop_after_months, today)
+        dropped = []
+        for period in await self.partitions():
+            if period < cutoff:
+                async with self.db.transaction():
+                    await self.db.execute(f"DROP TABLE {p.partition_table(period)}")
+                dropped.append(period)
+        if self.archive_dir.exists():
+            for file in self.archive_dir.glob("*.parquet"):
+                if file.stem < cutoff:
+                    file.unlink()
+                    dropped.append(file.stem)
+        return dropped
+
+    async def run(self, today: Optional[date] = None) -> Dict[str, Any]:
+        p = self.policy
+        summary: Dict[str, Any] = {"moved": await self.move_cold_rows(today), "archived": [], "dropped": []}
+        if p.archive_after_months is not None:
+            cutoff = p.cutoff(p.archive_after_months, today)
+            cold = [period for period in await self.partitions() if period < cutoff]
+            if cold and not parquet.available():
+                # never drop rows that could not be archived
+                logger.warning(f"pyarrow not installed; keeping {len(cold)} cold partitions of {p.table}")
+            elif cold:
+                for period in cold:
+                    await self.archive_partition(period)
+                    summary["archived"].append(period)
+        summary["dropped"] = await self.drop_expired(today)
+        await self.rebuild_view()
+        return summary
+
+
+class RetentionJob(Transform):
+    """Pipeline stage that applies every configured :class:`RetentionPolicy`."""
+
+    name = "RetentionJob"
+
+    def __init__(self, tables: Sequence[Mapping[str, Any]], archive_dir: str = "archive", **_: Any) -> None:
+        self.policies = [RetentionPolicy(**cfg) for cfg in tables]
+        self.archive_dir = Path(archive_dir)
+
+    async def run(self) -> Dict[str, Dict[str, Any]]:
+        results: Dict[str, Dict[str, Any]] = {}
+        for policy in self.policies:
+            # shares the file's writer with any sink running in this process
+            db = Database(policy.db_path, pooled=True, readers=1)
+            try:
+                summary = await RetentionManager(db, policy, self.archive_dir).run()
+                logger.info(f"Retention {policy.db_path}:{policy.table}: {summary}")
+                results[f"{policy.db_path}:{policy.table}"] = summary
+            except Exception as e:
+                logger.error(f"Retention of {policy.db_path}:{policy.table} failed: {e}", exc_info=True)
+            finally:
+                await db.close()
+        return results
+
+    async def __call__(self, items: AsyncIterator[Any]) -> AsyncIterator[None]:
+        async for _ in items:
+            await self.run()
+            yield None
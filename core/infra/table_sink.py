@@ -0,0 +1,407 @@
+"""
+table_sink.py – declarative SQLite sink: topic -> table mapping as configuration.
+
+A :class:`TableSink` is configured, not coded.  Each topic maps to a table,
+its conflict key and the content keys to store::
+
+    topics:
+      tcg.price_history:
+        table: price_history
+        pk: [sku_id, bucket_start_date]
+        cols: [product_id, sku_id, market_price, quantity_sold, bucket_start_date]
+        stamp: updated_at            # set from ParsedItem.discovered_at
+        hash: [market_price, quantity_sold]   # skip rows whose content is unchanged
+
+Plugins subclass it and set ``topics`` / ``migrations`` / ``scope`` as class
+attributes; a pipeline can also use ``core.infra.table_sink.TableSink``
+directly with the same keys as kwargs in pipelines.yml.
+
+Every sink gets the same write path:
+
+* the schema is brought up to date with :meth:`Database.migrate`
+* values are coerced to the declared SQLite column type (read from the
+  migrated table, overridable per column with ``types``); rows that cannot
+  be coerced are rejected and counted (also in :meth:`QueryStats.dropped`)
+  instead of failing the batch
+* with ``hash``, a digest of the listed columns is stored in the table's
+  ``row_hash`` column; the stored digests are loaded once per run (and
+  updated as rows commit) and rows whose digest matches are dropped before
+  they reach SQLite
+* rows go through a shared-writer :class:`BufferedWriter`, which
+  group-commits across all tables of the file
+* committed upserts and deletes are published on :data:`core.infra.cdc.change_bus`
+* per-topic counters (received / written / unchanged / deleted / rejected / failed)
+  are logged when the sink closes; ``written`` and ``failed`` are counted
+  when the group commit holding the row succeeds or rejects it
+
+Rows the database rejects (constraint violations) are isolated by the
+writer and counted as ``failed``; any other write error fails the sink and
+with it the run.
+
+Missing, ``None`` and NaN values are left out of the row, so an upsert never
+overwrites a stored column with NULL.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import numbers
+from collections import Counter, defaultdict
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Literal, Mapping, Optional, Sequence, Tuple, Union
+
+from pydantic import BaseModel, Field
+
+from ..interfaces import Sink
+from ..models import ParsedItem
+from . import retention
+from .cdc import change_bus
+from .db import BufferedWriter, Database, Migration, query_stats
+
+logger = logging.getLogger(__name__)
+
+# column holding the content digest of topics with a ``hash`` list
+ROW_HASH = "row_hash"
+
+ColumnType = Literal["text", "integer", "real", "boolean", "timestamp", "json", "any"]
+
+
+class DeleteSpec(BaseModel):
+    """Delete the matching row of another table when a content flag is set.
+
+    Used for removal events: the event itself is stored in the topic's
+    table, the entity is removed from ``table``.
+    """
+    table: str = Field(pattern=r"^\w+$")
+    key: List[str]
+    when: str = "removal_detected"
+
+
+class TopicSpec(BaseModel):
+    """Where and how one topic's content is stored."""
+    table: str = Field(pattern=r"^\w+$")
+    pk: List[str]
+    cols: List[str]
+    types: Dict[str, ColumnType] = Field(default_factory=dict)
+    stamp: Optional[str] = None
+    hash: Optional[List[str]] = None   # content columns compared to skip unchanged rows
+    delete: Optional[DeleteSpec] = None
+
+
+# --------------------------------------------------------------------------- #
+# Coercion
+# --------------------------------------------------------------------------- #
+
+def _iso(value: date) -> str:
+    # same text sqlite3's default date/datetime adapters produced
+    return value.isoformat(" ") if isinstance(value, datetime) else value.isoformat()
+
+
+def _to_text(value: Any) -> Any:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (datetime, date)):
+        return _iso(value)
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    if isinstance(value, (bytes, bool)):
+        return value
+    return str(value)
+
+
+def _to_integer(value: Any) -> int:
+    if isinstance(value, numbers.Integral):  # includes bool and numpy ints
+        return int(value)
+    if isinstance(value, numbers.Real):
+        if not float(value).is_integer():
+            raise ValueError(f"{value!r} is not an integer")
+        return int(value)
+    if isinstance(value, str):
+        return int(value.strip())
+    raise TypeError(f"cannot store {type(value).__name__} as integer")
+
+
+def _to_real(value: Any) -> float:
+    if isinstance(value, (numbers.Real, str)):
+        return float(value)
+    raise TypeError(f"cannot store {type(value).__name__} as real")
+
+
+def _to_boolean(value: Any) -> int:
+    if isinstance(value, str):
+        return int(value.strip().lower() not in ("", "0", "false", "no", "off"))
+    return int(bool(value))
+
+
+def _to_timestamp(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return _iso(value)
+    return value
+
+
+def _to_json(value: Any) -> Any:
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def _to_any(value: Any) -> Any:
+    return value
+
+
+COERCERS: Dict[str, Callable[[Any], Any]] = {
+    "text": _to_text,
+    "integer": _to_integer,
+    "real": _to_real,
+    "boolean": _to_boolean,
+    "timestamp": _to_timestamp,
+    "json": _to_json,
+    "any": _to_any,
+}
+
+
+def column_type(decltype: str) -> ColumnType:
+    """Coercion type for a SQLite declared column type (affinity rules, plus dates)."""
+    decl = (decltype or "").upper()
+    if "BOOL" in decl:
+        return "boolean"
+    if "INT" in decl:
+        return "integer"
+    if any(t in decl for t in ("CHAR", "CLOB", "TEXT")):
+        return "text"
+    if "DATE" in decl or "TIME" in decl:
+        return "timestamp"
+    if any(t in decl for t in ("REAL", "FLOA", "DOUB", "DEC", "NUM")):
+        return "real"
+    return "any"
+
+
+class _Plan:
+    """Compiled form of a :class:`TopicSpec`: column coercers resolved once."""
+
+    __slots__ = ("table", "pk", "columns", "stamp", "hash", "delete")
+
+    def __init__(self, spec: TopicSpec, columns: List[Tuple[str, Callable[[Any], Any]]]) -> None:
+        self.table = spec.table
+        self.pk = list(spec.pk)
+        self.columns = columns
+        self.stamp = spec.stamp
+        self.hash = spec.hash
+        self.delete = spec.delete
+
+    def row(self, item: ParsedItem) -> Dict[str, Any]:
+        content = item.content
+        row = {}
+        for name, coerce in self.columns:
+            value = content.get(name)
+            # NaN is how pandas-built content spells a missing value
+            if value is not None and not (isinstance(value, float) and value != value):
+                try:
+                    row[name] = coerce(value)
+                except (TypeError, ValueError) as e:
+                    raise ValueError(f"{self.table}.{name}: {e}") from None
+        if self.stamp is not None:
+            row[self.stamp] = item.discovered_at.isoformat()
+        return row
+
+    def key(self, row: Dict[str, Any]) -> Tuple[Any, ...]:
+        return tuple(row.get(col) for col in self.pk)
+
+    def digest(self, row: Dict[str, Any]) -> str:
+        # coerced values, so "1.50" and 1.5 hash alike for a REAL column
+        values = repr(tuple(row.get(col) for col in self.hash))
+        return hashlib.blake2b(values.encode(), digest_size=16).hexdigest()
+
+
+class TableSink(Sink):
+    """Upsert ParsedItems into SQLite tables according to a per-topic mapping."""
+
+    name = "TableSink"
+
+    # Subclasses declare their mapping here; kwargs override per pipeline
+    topics: Mapping[str, Union[TopicSpec, Mapping[str, Any]]] = {}
+    migrations: Sequence[Union[Migration, Mapping[str, Any]]] = ()
+    scope: Optional[str] = None
+    db_path: str = "scraper.db"
+
+    def __init__(
+        self,
+        db_path: Optional[Union[str, Path]] = None,
+        topics: Optional[Mapping[str, Mapping[str, Any]]] = None,
+        migrations: Optional[Sequence[Mapping[str, Any]]] = None,
+        scope: Optional[str] = None,
+        **writer_opts: Any,
+    ):
+        """
+        Initialize the sink.
+
+        Args:
+            db_path: SQLite file (class default if None)
+            topics: topic -> TopicSpec fields (class ``topics`` if None)
+            migrations: Migration steps as (version, name, statements) mappings
+            scope: schema_migrations scope (default: the sink's name)
+            **writer_opts: BufferedWriter options (max_rows, max_bytes, linger, durability)
+        """
+        self.db_path = str(db_path or self.db_path)
+        specs = self.topics if topics is None else topics
+        self.specs: Dict[str, TopicSpec] = {
+            topic: spec if isinstance(spec, TopicSpec) else TopicSpec.model_validate(spec)
+            for topic, spec in specs.items()
+        }
+        steps = self.migrations if migrations is None else migrations
+        self.steps: List[Migration] = [
+            step if isinstance(step, Migration) else Migration(**step) for step in steps
+        ]
+        self.scope = scope or self.scope or self.name
+        # Share the file's process-wide writer with readers in this process
+        self.db = Database(self.db_path, pooled=True, readers=0)
+        # Rows are group-committed across tables instead of one COMMIT per item
+        self.writer = BufferedWriter(self.db, on_commit=self._on_commit, on_reject=self._on_reject, **writer_opts)
+        self._plans: Dict[str, _Plan] = {}
+        # table -> {pk: row_hash} as committed, loaded on first use
+        self._hashes: Dict[str, Dict[Tuple[Any, ...], str]] = {}
+        # id(row) -> topic for rows buffered in the writer
+        self._queued: Dict[int, str] = {}
+        self.counters: Dict[str, Counter] = defaultdict(Counter)
+
+    async def __aenter__(self):
+        await self.db.connect()
+        if self.steps and await self.db.migrate(self.scope, self.steps):
+            # partitions behind <table>_all views keep their old columns
+            for table in dict.fromkeys(spec.table for spec in self.specs.values()):
+                if await retention.partitions(self.db, table):
+                    await retention.rebuild_view(self.db, table)
+        await self._compile()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def _compile(self) -> None:
+        """Resolve each topic's column coercers from the migrated schema."""
+        declared: Dict[str, Dict[str, str]] = {}
+        for topic, spec in self.specs.items():
+            if spec.table not in declared:
+                info = await self.db.fetch_all(f"PRAGMA table_info({spec.table})")
+                if not info:
+                    raise ValueError(f"{self.name}: table {spec.table} for topic {topic} does not exist")
+                declared[spec.table] = {row["name"]: row["type"] for row in info}
+            table_cols = declared[spec.table]
+            wanted = list(dict.fromkeys([*spec.pk, *spec.cols]))
+            if spec.stamp is not None:
+                wanted.append(spec.stamp)
+            if spec.hash:
+                wanted += [*spec.hash, ROW_HASH]
+            if spec.hash and not set(spec.hash) <= set(spec.cols):
+                raise ValueError(f"{self.name}: hash columns of topic {topic} must be listed in cols")
+            unknown = [c for c in wanted if c not in table_cols]
+            if unknown:
+                raise ValueError(f"{self.name}: {spec.table} has no column(s) {', '.join(unknown)} (topic {topic})")
+            columns = [
+                (c, COERCERS[spec.types.get(c) or column_type(table_cols[c])])
+                for c in dict.fromkeys(spec.cols)
+            ]
+            self._plans[topic] = _Plan(spec, columns)
+
+    async def handle(self, item: Any) -> None:
+        """Coerce and buffer one item's row; apply its delete if flagged."""
+        if not isinstance(item, ParsedItem):
+            return
+        counts = self.counters[item.topic]
+        counts["received"] += 1
+        plan = self._plans.get(item.topic)
+        if plan is None:
+            logger.debug(f"No table mapping for topic: {item.topic}")
+            counts["unmapped"] += 1
+            return
+
+        try:
+            row = plan.row(item)
+        except ValueError as e:
+            counts["rejected"] += 1
+            # lost like a row the database refused: the run must not count as clean
+            query_stats.record_dropped(1)
+            logger.warning(f"Rejected {item.topic} item: {e}")
+            return
+        if not row:
+            counts["rejected"] += 1
+            logger.warning(f"No data to insert for topic: {item.topic}")
+            return
+
+        if plan.hash:
+            hashes = await self._hash_index(plan)
+            digest = plan.digest(row)
+            if hashes.get(plan.key(row)) == digest:
+                counts["unchanged"] += 1
+                return
+            row[ROW_HASH] = digest
+
+        # write errors other than rejected rows propagate and fail the run
+        self._queued[id(row)] = item.topic
+        await self.writer.put(plan.table, row, plan.pk)
+        if plan.delete is not None and item.content.get(plan.delete.when):
+            await self._delete(plan.delete, item)
+            counts["deleted"] += 1
+
+    def _on_commit(self, table: str, pk_columns: Tuple[str, ...], rows: List[Dict[str, Any]]) -> None:
+        # the hash index only ever holds committed digests
+        hashes = self._hashes.get(table)
+        for row in rows:
+            topic = self._queued.pop(id(row), None)
+            if topic is not None:
+                self.counters[topic]["written"] += 1
+            if hashes is not None and ROW_HASH in row:
+                hashes[tuple(row.get(col) for col in pk_columns)] = row[ROW_HASH]
+
+    def _on_reject(self, table: str, row: Dict[str, Any], error: BaseException) -> None:
+        topic = self._queued.pop(id(row), None)
+        self.counters[topic or table]["failed"] += 1
+
+    async def _hash_index(self, plan: _Plan) -> Dict[Tuple[Any, ...], str]:
+        """Stored row hashes of *plan*'s table, read with one query per run."""
+        hashes = self._hashes.get(plan.table)
+        if hashes is None:
+            hashes = {}
+            pk = ", ".join(plan.pk)
+            async for chunk in self.db.iterate(
+                f"SELECT {pk}, {ROW_HASH} FROM {plan.table} WHERE {ROW_HASH} IS NOT NULL", chunk_size=10_000
+            ):
+                for row in chunk:
+                    hashes[tuple(row)[:-1]] = row[-1]
+            self._hashes[plan.table] = hashes
+            logger.debug(f"{self.name}: loaded {len(hashes)} row hashes of {plan.table}")
+        return hashes
+
+    async def _delete(self, spec: DeleteSpec, item: ParsedItem) -> None:
+        # the writer must be idle (and earlier upserts of the key committed)
+        # before we issue statements on the shared connection
+        await self.writer.flush()
+        params = tuple(item.content.get(col) for col in spec.key)
+        where = " AND ".join(f"{col} = ?" for col in spec.key)
+        key = [dict(zip(spec.key, params))]
+        capture = change_bus.wants(self.db.db_path, spec.table)
+        old = None
+        async with self.db.transaction() as conn:
+            if capture and change_bus.wants_old(self.db.db_path, spec.table):
+                old = await self.db._rows_by_pk(conn, spec.table, spec.key, key)
+            await self.db.execute(f"DELETE FROM {spec.table} WHERE {where}", params)
+        if capture:
+            change_bus.publish(change_bus.events(self.db.db_path, spec.table, "delete", spec.key, key, old))
+        # a deleted entity that comes back must be written again
+        if spec.table in self._hashes:
+            self._hashes[spec.table].pop(params, None)
+        logger.info(f"Deleted removed entity from {spec.table}: {params}")
+
+    async def report(self) -> None:
+        """Log the per-topic counters of this run."""
+        for topic, counts in sorted(self.counters.items()):
+            logger.info(f"{self.name} {topic}: " + ", ".join(f"{k}={v}" for k, v in sorted(counts.items())))
+
+    async def close(self) -> None:
+        """Flush buffered rows, log counters and close the database connection."""
+        try:
+            await self.writer.close()
+            await self.report()
+        finally:
+            await self.db.close()
@@ -9,13 +9,27 @@ from typing import Any, Dict
 
 from pydantic import BaseModel, Field
 
+from .infra import codec
+
 
 class RawItem(BaseModel):
-    """Raw data fetched from a source."""
+    """Raw data fetched from a source.
+
+    Fetchers that already hold a decoded JSON document can hand it over as
+    ``data`` instead of re-encoding it into ``payload``; parsers read either
+    form through :meth:`load_json`.
+    """
     source: str
-    payload: bytes
+    payload: bytes = b""
+    data: Any = Field(default=None, exclude=True)
     fetched_at: datetime = Field(default_factory=datetime.utcnow)
 
+    def load_json(self) -> Any:
+        """Return the decoded JSON document (``data`` if set, else ``payload``)."""
+        if self.data is not None:
+            return self.data
+        return codec.loads(self.payload)
+
 
 class ParsedItem(BaseModel):
     """Parsed and structured data."""
@@ -10,8 +10,11 @@ from pathlib import Path
 from typing import Any, AsyncIterator, Dict, List, Optional, Callable
 
 from .interfaces import Transform
+from .models import Event
 from .plugin_loader import get as load_transform_class
 from .infra.scheduler import Scheduler
+from .infra.db import configure_databases, query_stats
+from .infra.http import RetryBudget, http_stats, pipeline_scope, retry_budget_scope
 
 logger = logging.getLogger(__name__)
 
@@ -43,9 +46,31 @@ async def _drain(stages: List[Transform]) -> None:
             pass
 
 
-async def run_pipeline(cfg: Dict[str, Any]) -> None:
-    """Run a single pipeline from configuration."""
+def _make_retry_budget(cfg: Dict[str, Any]) -> Optional[RetryBudget]:
+    """Build the run's retry budget from the optional ``retry_budget`` key.
+
+    Omitted or ``false`` -> none (per-request retries only), ``true`` ->
+    default budget, mapping -> ``RetryBudget(**mapping)``.
+    """
+    budget_cfg = cfg.get("retry_budget")
+    if budget_cfg is None or budget_cfg is False:
+        return None
+    return RetryBudget(**(budget_cfg if isinstance(budget_cfg, dict) else {}))
+
+
+async def run_pipeline(cfg: Dict[str, Any]) -> Event:
+    """Run a single pipeline from configuration.
+
+    Returns an :class:`Event` describing the run: ``INFO`` when it completed,
+    ``WARNING`` when it completed partially because the retry budget ran out,
+    ``ERROR`` when it failed.
+    """
     pipeline_name = cfg.get("name", "unnamed")
+    budget = _make_retry_budget(cfg)
+    
+    # HTTP and SQL metrics are reported per run, so start from a clean slate
+    http_stats.reset(pipeline_name)
+    query_stats.reset(pipeline_name)
     
     try:
         logger.info(f"Starting pipeline: {pipeline_name}")
@@ -57,13 +82,33 @@ async def run_pipeline(cfg: Dict[str, Any]) -> None:
             kwargs = entry.get("kwargs", {})
             instances.append(cls(**kwargs))
         
-        # Execute the pipeline
-        await _drain(instances)
+        # Execute the pipeline; requests made by its stages are attributed to it
+        # and share one retry budget
+        with pipeline_scope(pipeline_name), retry_budget_scope(budget):
+            await _drain(instances)
         
-        logger.info(f"Pipeline completed: {pipeline_name}")
+        if budget is not None and budget.exhausted:
+            logger.warning(
+                f"Pipeline completed partially: {pipeline_name} "
+                f"(retry budget exhausted: {budget.snapshot()})"
+            )
+            event = Event(level="WARNING", message="completed partially: retry budget exhausted", source=pipeline_name)
+        else:
+            logger.info(f"Pipeline completed: {pipeline_name}")
+            event = Event(level="INFO", message="completed", source=pipeline_name)
         
     except Exception as e:
         logger.error(f"Pipeline {pipeline_name} failed: {e}", exc_info=True)
+        event = Event(level="ERROR", message=f"failed: {e}", source=pipeline_name)
+    finally:
+        http_stats.log_summary(pipeline_name)
+        query_stats.log_summary(pipeline_name)
+    
+    if budget is not None:
+        event.metadata["retry_budget"] = budget.snapshot()
+    event.metadata["http"] = http_stats.snapshot(pipeline_name).get(pipeline_name, {})
+    event.metadata["sql"] = query_stats.snapshot(pipeline_name, top=10)
+    return event
 
 
 async def run_pipeline_with_schedule(cfg: Dict[str, Any]) -> None:
@@ -192,6 +237,10 @@ def load_pipelines_config(config_path: str = "pipelines.yml") -> List[Dict[str,
     with path.open() as f:
         data = yaml.safe_load(f)
     
+    # per-file SQLite PRAGMA profiles, picked up by every Database on connect
+    if data.get("databases"):
+        configure_databases(data["databases"])
+    
     if "pipelines" not in data:
         logger.error(f"No 'pipelines' key found in {config_path}")
         return []
@@ -2,6 +2,7 @@
 Plugin loader for automatic discovery and registration of transform classes.
 """
 
+import importlib
 import importlib.util
 import inspect
 import logging
@@ -81,11 +82,25 @@ def refresh_registry() -> None:
     logger.info(f"Plugin discovery complete: {plugin_count} modules, {transform_count} transforms")
 
 
+def _import_core_transform(class_path: str) -> Type[Transform]:
+    """Import a Transform shipped with core, e.g. 'core.infra.retention.RetentionJob'."""
+    module_name, _, class_name = class_path.rpartition(".")
+    try:
+        obj = getattr(importlib.import_module(module_name), class_name)
+    except (ImportError, AttributeError) as e:
+        raise KeyError(f"Transform '{class_path}' not found: {e}") from e
+    if not (inspect.isclass(obj) and issubclass(obj, Transform)):
+        raise KeyError(f"'{class_path}' is not a Transform")
+    logger.debug(f"Registered core transform: {class_path}")
+    return obj
+
+
 def get(class_path: str) -> Type[Transform]:
     """Get a transform class by its plugin path.
     
     Args:
-        class_path: Format 'plugin_name.ClassName' (e.g., 'fi_shortinterest.FiFetcher')
+        class_path: Format 'plugin_name.ClassName' (e.g., 'fi_shortinterest.FiFetcher'),
+            or a dotted path to a core transform (e.g., 'core.infra.retention.RetentionJob')
     
     Returns:
         The transform class
@@ -96,6 +111,9 @@ def get(class_path: str) -> Type[Transform]:
     if not _REGISTRY:
         refresh_registry()
     
+    if class_path not in _REGISTRY and class_path.startswith("core."):
+        _REGISTRY[class_path] = _import_core_transform(class_path)
+    
     if class_path not in _REGISTRY:
         available = list(_REGISTRY.keys())
         raise KeyError(f"Transform '{class_path}' not found. Available: {available}")
@@ -9,6 +9,7 @@ Supports filtering for Pokémon and Star Wars sets.
 
 import sqlite3
 import os
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
@@ -22,6 +23,19 @@ DB_DIR = os.path.dirname(__file__)
 ROOT_DIR = os.path.abspath(os.path.join(DB_DIR, "../.."))  # Go up two directories to reach root
 DB_PATH = os.path.join(ROOT_DIR, "tcg.db")  # Database in root folder
 SETS_CSV = os.path.join(DB_DIR, "pokemon_sets.csv")
+ARCHIVE_DIR = os.path.join(ROOT_DIR, "archive")  # Parquet archive written by the retention job
+
+sys.path.insert(0, ROOT_DIR)
+from core.infra.analytics import Analytics  # noqa: E402
+from core.infra.db import snapshot  # noqa: E402
+
+
+def connect() -> sqlite3.Connection:
+    """
+    Open a read-only connection to a recent snapshot of the database,
+    so the analysis never holds locks on the file the pipelines write
+    """
+    return sqlite3.connect(f"file:{snapshot(DB_PATH)}?mode=ro", uri=True)
 
 # Star Wars set product IDs
 STAR_WARS_PRODUCT_IDS = {
@@ -44,7 +58,7 @@ def get_latest_data_date() -> str:
     """
     Get the most recent data update date from the database
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect()
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -115,8 +129,8 @@ def get_product_ids_by_set(include_star_wars: bool = True, include_pokemon: bool
     
     if df_sets.empty:
         # Fallback - get all product IDs from the database
-        conn = sqlite3.connect(DB_PATH)
-        product_query = "SELECT DISTINCT product_id FROM price_history"
+        conn = connect()
+        product_query = "SELECT DISTINCT product_id FROM price_history_all"
         product_ids = pd.read_sql_query(product_query, conn)['product_id'].tolist()
         conn.close()
         
@@ -189,56 +203,22 @@ def query_dollar_volume_by_set(latest_update_date: Optional[str] = None,
         print("No set information found. Unable to query data.")
         return pd.DataFrame()
     
-    conn = sqlite3.connect(DB_PATH)
-    
-    # Build a master dataframe with all results
-    all_data = []
-    
-    for set_name, product_ids in product_ids_by_set.items():
-        for product_id in product_ids:
-            query = """
-                SELECT 
-                    ? as set_name,
-                    ? as product_id,
-                    bucket_start_date as date,
-                    market_price,
-                    quantity_sold,
-                    (market_price * quantity_sold) as dollar_volume,
-                    created_at
-                FROM 
-                    price_history
-                WHERE 
-                    product_id = ?
-                    AND market_price IS NOT NULL
-                    AND quantity_sold IS NOT NULL
-            """
-            params = [set_name, product_id, product_id]
-            
-            # Add date filter if provided
-            if latest_update_date:
-                query += " AND created_at = ?"
-                params.append(latest_update_date)
-            
-            # Execute query
-            try:
-                df = pd.read_sql_query(query, conn, params=params)
-                if not df.empty:
-                    all_data.append(df)
-            except Exception as e:
-                print(f"Error querying data for product {product_id}: {e}")
-                continue
-    
-    conn.close()
+    # One vectorized scan over the snapshot (and any Parquet archive)
+    # instead of one query per product id
+    try:
+        with Analytics({"tcg": snapshot(DB_PATH)}, archive_dir=ARCHIVE_DIR) as analytics:
+            combined_df = analytics.dollar_volume_by_set(product_ids_by_set, created_at=latest_update_date)
+    except Exception as e:
+        print(f"Error querying dollar volume: {e}")
+        return pd.DataFrame()
     
-    # Combine all results
-    if all_data:
-        combined_df = pd.concat(all_data, ignore_index=True)
-        # Convert date to datetime
-        combined_df['date'] = pd.to_datetime(combined_df['date'])
-        return combined_df
-    else:
+    if combined_df.empty:
         print("No data found for the specified products.")
         return pd.DataFrame()
+    
+    # Convert date to datetime
+    combined_df['date'] = pd.to_datetime(combined_df['date'])
+    return combined_df
 
 def aggregate_data_by_set_and_date(df: pd.DataFrame) -> pd.DataFrame:
     """
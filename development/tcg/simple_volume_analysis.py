@@ -8,6 +8,7 @@ the total dollar volume (market_price * quantity_sold) over time for different s
 
 import sqlite3
 import os
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
@@ -18,6 +19,9 @@ import numpy as np
 DB_DIR = os.path.dirname(__file__)
 DB_PATH = os.path.join(DB_DIR, "tcg.db")
 
+sys.path.insert(0, os.path.abspath(os.path.join(DB_DIR, "../..")))
+from core.infra.db import snapshot  # noqa: E402
+
 def main():
     """Main function to analyze and visualize TCG dollar volume"""
     print("TCG Dollar Volume Analysis")
@@ -29,13 +33,13 @@ def main():
         return
     
     try:
-        # Connect to the database
-        conn = sqlite3.connect(DB_PATH)
+        # Query a snapshot, never the live file the pipelines write to
+        conn = sqlite3.connect(f"file:{snapshot(DB_PATH)}?mode=ro", uri=True)
         
         # Get all product IDs from price history
         product_query = """
             SELECT DISTINCT product_id 
-            FROM price_history
+            FROM price_history_all
             ORDER BY product_id
         """
         
@@ -55,7 +59,7 @@ def main():
                 quantity_sold,
                 (market_price * quantity_sold) as dollar_volume
             FROM 
-                price_history
+                price_history_all
             WHERE 
                 product_id IN ({})
                 AND market_price IS NOT NULL
@@ -10,11 +10,12 @@ Changes in this revision (v2)
 * `BACKOFF_429` constant removed.
 * All public behaviour (yielded ``RawItem.source`` strings, constructor args)
   remains unchanged.
+* Decoded API responses are handed over as ``RawItem.data`` – no
+  ``json.dumps`` → ``json.loads`` round trip between fetcher and parser.
 """
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 import re
 from datetime import datetime, timezone
@@ -113,7 +114,7 @@ class AppMagicFetcher(Fetcher):
         publishers_in_group = grp_payload.get("publishers", [])
         yield RawItem(
             source="appmagic.groups",
-            payload=json.dumps({"company": company, "groups": publishers_in_group}).encode(),
+            data={"company": company, "groups": publishers_in_group},
             fetched_at=fetched_at,
         )
 
@@ -128,7 +129,7 @@ class AppMagicFetcher(Fetcher):
         publishers = self._extract_publishers(search)
         yield RawItem(
             source="appmagic.publishers",
-            payload=json.dumps({"company": company, "publishers": publishers}).encode(),
+            data={"company": company, "publishers": publishers},
             fetched_at=fetched_at,
         )
 
@@ -149,7 +150,7 @@ class AppMagicFetcher(Fetcher):
                 if ctry:
                     yield RawItem(
                         source="appmagic.publisher.country.metrics",
-                        payload=json.dumps({"united_publisher_id": up_id, "countries": ctry}).encode(),
+                        data={"united_publisher_id": up_id, "countries": ctry},
                         fetched_at=fetched_at,
                     )
 
@@ -165,12 +166,12 @@ class AppMagicFetcher(Fetcher):
 
             yield RawItem(
                 source="appmagic.publisher_apps_api",
-                payload=json.dumps({
+                data={
                     "united_publisher_id": up_id,
                     "company": company,
                     "applications": apps,
                     "from_offset": offset,
-                }).encode(),
+                },
                 fetched_at=fetched_at,
             )
 
@@ -16,7 +16,6 @@ Compared with the original implementation this version
 """
 from __future__ import annotations
 
-import json
 import logging
 from datetime import datetime
 from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
@@ -275,7 +274,7 @@ class AppMagicParser(Transform):
             if isinstance(itm, RawItem):
                 handler = _HANDLER.get(itm.source, _noop)
                 try:
-                    payload = json.loads(itm.payload)
+                    payload = itm.load_json()
                 except Exception as exc:  # noqa: BLE001
                     logger.warning("Bad JSON in %s: %s", itm.source, exc)
                     continue
@@ -3,28 +3,28 @@
 AppMagicSink
 ============
 
-• Creates every required table on first use (SQLite: CREATE TABLE IF NOT EXISTS).
-• Implements the abstract `handle()` method expected by core.interfaces.Sink.
-• Upserts rows according to the ParsedItem → table mapping.
+• Creates every required table on first use through a versioned migration
+  (applied once per database file, see ``Database.migrate``).
+• Declares the ParsedItem → table mapping; coercion, group-committed
+  upserts and per-topic counters come from :class:`core.infra.table_sink.TableSink`.
 """
 
 from __future__ import annotations
 
 import logging
-from pathlib import Path
-from typing import Any, Dict, List
-import json
+from typing import Any, Dict
 
-from core.interfaces import Sink
-from core.models import ParsedItem
-from core.infra.db import Database
+from core.infra.db import Migration
+from core.infra.table_sink import TableSink
 
 logger = logging.getLogger(__name__)
 
 
-class AppMagicSink(Sink):
+class AppMagicSink(TableSink):
     # ------------------------------------------------------------------ #
     name = "AppMagicSink"
+    scope = "appmagic"
+    db_path = "mobile_analytics.db"
 
     # ------------------------------ DDL ------------------------------- #
     _DDL: Dict[str, str] = {
@@ -148,7 +148,7 @@ CREATE TABLE IF NOT EXISTS PublisherAppsSummary (
     }
 
     # ---------------------------- mapping ---------------------------- #
-    _TOPIC_CFG: Dict[str, Dict[str, Any]] = {
+    topics: Dict[str, Dict[str, Any]] = {
         # reference
         "country": {
             "table": "Countries",
@@ -305,83 +305,22 @@ CREATE TABLE IF NOT EXISTS PublisherAppsSummary (
         },
     }
 
-    # ------------------------------------------------------------------ #
-    def __init__(self, db_path: str | Path = "mobile_analytics.db", **_) -> None:
-        self.db = Database(db_path=db_path)
-        self._ddl_executed = False  # run once lazily
-
-    # ------------------------------------------------------------------ #
-    async def handle(self, item: ParsedItem) -> None:  # abstract method ✓
-        """Upsert a single ParsedItem."""
-        # Lazily create tables on the first ever insert
-        if not self._ddl_executed:
-            await self._create_all_tables()
-            self._ddl_executed = True
-
-        cfg = self._TOPIC_CFG.get(item.topic)
-        if cfg is None:  # unknown topic – just ignore
-            logger.debug("No sink rule for topic %s", item.topic)
-            return
-
-        logger.debug(f"Sinking item to table {cfg['table']}: {item.topic}")
-        await self._upsert(cfg["table"], cfg["pk"], cfg["cols"], item.content)
-        logger.debug(f"Successfully sunk item to {cfg['table']}")
+    # recorded in schema_migrations; append steps for future changes
+    migrations = [
+        Migration(1, "initial schema", list(_DDL.values())),
+        # full-history view; core.infra.retention rebuilds it over partitions
+        Migration(2, "snapshot metrics view", [
+            "CREATE VIEW IF NOT EXISTS ApplicationSnapshotMetrics_all "
+            "AS SELECT * FROM ApplicationSnapshotMetrics",
+        ]),
+    ]
 
     # ------------------------------------------------------------------ #
-    async def __call__(self, stream):
-        logger.info("AppMagicSink: Starting to process items")
-        item_count = 0
-        topic_counts = {}
-        
-        async for itm in stream:
-            if isinstance(itm, ParsedItem):
-                await self.handle(itm)
-                item_count += 1
-                topic_counts[itm.topic] = topic_counts.get(itm.topic, 0) + 1
-            yield None  # sink is terminal but keeps the pipeline contract
-        
-        logger.info(f"AppMagicSink: Processed {item_count} total items")
-        for topic, count in topic_counts.items():
-            logger.info(f"  - {topic}: {count} items")
-        
-        # Log table record counts
+    async def report(self) -> None:
+        """Log per-topic counters and table record counts."""
+        await super().report()
         await self._log_table_counts()
 
-    # ------------------------------------------------------------------ #
-    async def __aenter__(self):
-        """Async context manager entry."""
-        await self.db.connect()
-        await self._create_all_tables()
-        self._ddl_executed = True
-        return self
-
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit."""
-        await self.db.close()
-
-    # ------------------------------------------------------------------ #
-    async def _create_all_tables(self) -> None:
-        for ddl in self._DDL.values():
-            await self.db.execute(ddl)
-
-    # ------------------------------------------------------------------ #
-    async def _upsert(
-        self, table: str, pk: List[str], cols: List[str], row: Dict[str, Any]
-    ) -> None:
-        # Extract only the columns that have data
-        data = {}
-        for c in cols:
-            if c in row:
-                value = row[c]
-                # Convert lists to JSON strings for SQLite compatibility
-                if isinstance(value, list):
-                    data[c] = json.dumps(value)
-                else:
-                    data[c] = value
-        
-        # Use the Database's upsert method which handles commits properly
-        await self.db.upsert(table, data, pk)
-
     # ------------------------------------------------------------------ #
     async def _log_table_counts(self) -> None:
         """Log the number of records in each table for debugging."""
@@ -39,8 +39,9 @@ AVANZA_HEADERS = {
 async def _fetch_avanza_data(http_client: HttpClient, url: str, params: dict) -> dict:
     # HttpClient handles retries, status checks, and JSON parsing.
     # Pass AVANZA_HEADERS per request as they are specific to this API.
+    # Lookups are on the interactive path, so hedge slow responses.
     try:
-        return await http_client.get_json(url, params=params, headers=AVANZA_HEADERS)
+        return await http_client.get_json(url, params=params, headers=AVANZA_HEADERS, hedge=True)
     except Exception as e:
         logger.error(f"Error fetching Avanza data from {url} with params {params}: {e}", exc_info=True)
         raise # Re-raise to be handled by the caller, or return None/empty dict
@@ -81,7 +82,8 @@ class FiShortInterestDiscordCommands(DiscordCommands):
     async def setup(self, bot: Bot) -> None:
         if not hasattr(bot, 'fi_short_db'):
             fi_db_path = os.path.join(os.getcwd(), "db", "fi_shortinterest.db")
-            db_instance = Database(fi_db_path)
+            # read pool + result cache for the commands; writes share the pipelines' writer
+            db_instance = Database(fi_db_path, pooled=True, readers=4, query_cache=256)
             try:
                 await db_instance.connect()
                 setattr(bot, 'fi_short_db', db_instance) 
@@ -116,7 +118,7 @@ class FiShortInterestDiscordCommands(DiscordCommands):
             try:
                 query = """
                     SELECT DISTINCT company_name 
-                    FROM short_positions_history 
+                    FROM short_positions_history_all 
                     WHERE LOWER(company_name) LIKE ? 
                     ORDER BY company_name 
                     LIMIT 5
@@ -145,7 +147,7 @@ class FiShortInterestDiscordCommands(DiscordCommands):
             db = bot.fi_short_db
             sql_name = """
                 SELECT company_name
-                  FROM short_positions_history
+                  FROM short_positions_history_all
                  WHERE LOWER(company_name) LIKE ?
                  LIMIT 1
             """
@@ -160,25 +162,30 @@ class FiShortInterestDiscordCommands(DiscordCommands):
             ago = now - pd.DateOffset(months=3)
             sql_data = """
                 SELECT event_timestamp, position_percent
-                  FROM short_positions_history
+                  FROM short_positions_history_all
                  WHERE company_name = ?
                    AND event_timestamp BETWEEN ? AND ?
                  ORDER BY event_timestamp
             """
-            rows = await db.fetch_all(
-                sql_data,
-                (
-                    company_name,
-                    ago.strftime("%Y-%m-%d %H:%M"),
-                    now.strftime("%Y-%m-%d %H:%M"),
-                ),
-            )
-            if not rows:
+            # stream the window as column chunks, like /hedgeshort
+            frames = [
+                pd.DataFrame(chunk)
+                async for chunk in db.iterate(
+                    sql_data,
+                    (
+                        company_name,
+                        ago.strftime("%Y-%m-%d %H:%M"),
+                        now.strftime("%Y-%m-%d %H:%M"),
+                    ),
+                    columnar=True,
+                )
+            ]
+            if not frames:
                 return await interaction.followup.send(
                     f"Company: {company_name}, no data available."
                 )
 
-            df = pd.DataFrame([dict(r) for r in rows])
+            df = pd.concat(frames, ignore_index=True)
             df["event_timestamp"] = pd.to_datetime(df["event_timestamp"])
             df.set_index("event_timestamp", inplace=True)
             daily = df.resample("D").last().ffill()
@@ -233,16 +240,22 @@ class FiShortInterestDiscordCommands(DiscordCommands):
 
             sql_data = """
                 SELECT event_timestamp, entity_name, isin, position_percent
-                  FROM position_holders_history
+                  FROM position_holders_history_all
                  WHERE event_timestamp <= ?
                  ORDER BY event_timestamp, entity_name, isin
             """
-            rows = await db.fetch_all(
-                sql_data,
-                (now.strftime("%Y-%m-%d %H:%M:%S"),),
-            )
+            # stream the history as column chunks; no per-row Row/dict objects
+            frames = [
+                pd.DataFrame(chunk)
+                async for chunk in db.iterate(
+                    sql_data,
+                    (now.strftime("%Y-%m-%d %H:%M:%S"),),
+                    chunk_size=20000,
+                    columnar=True,
+                )
+            ]
 
-            if not rows:
+            if not frames:
                 # Simplified empty plot logic
                 plt.figure(figsize=(4, 2)); rcParams.update({"font.size": 7})
                 plt.title("MCAP Weighted Aggregated Shorts % Last 3m".upper(), fontsize=6, weight="bold", loc="left")
@@ -258,7 +271,7 @@ class FiShortInterestDiscordCommands(DiscordCommands):
                 )
                 return
 
-            df = pd.DataFrame([dict(r) for r in rows])
+            df = pd.concat(frames, ignore_index=True)
             df["event_timestamp"] = pd.to_datetime(df["event_timestamp"])
             df["event_date"] = df["event_timestamp"].dt.normalize()
             df["position_percent"] = pd.to_numeric(df["position_percent"], errors='coerce').fillna(0)
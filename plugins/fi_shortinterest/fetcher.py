@@ -41,8 +41,8 @@ class FiFetcher(Fetcher):
     async def fetch(self) -> AsyncIterator[RawItem]:
         """Fetch FI short interest data - single poll, no infinite loop."""
         try:
-            # 1) Poll timestamp
-            html = await self.http.get_text(self.URL_TS)
+            # 1) Poll timestamp (hedged: a single slow response dominates the poll)
+            html = await self.http.get_text(self.URL_TS, hedge=True)
             soup = BeautifulSoup(html, "html.parser")
             tag = soup.find("p", string=lambda t: t and "Listan uppdaterades:" in t)
             ts = tag.text.split(": ", 1)[1].strip() if tag else None
@@ -1,25 +1,23 @@
 """
-Database sink that implements the Transform interface.
+Database sink for FI short interest data.
 """
 
-import logging
-from typing import Dict, List, AsyncIterator, Any
-from datetime import datetime
+from core.infra.db import Migration
+from core.infra.table_sink import TableSink
 
-from core.interfaces import Sink
-from core.models import ParsedItem
-from core.infra.db import Database
 
+class DatabaseSink(TableSink):
+    """Sink that persists FI short interest data to SQLite.
 
-logger = logging.getLogger(__name__)
-
-
-class DatabaseSink(Sink):
-    """Sink that persists data to SQLite database."""
+    Removal diffs are stored in the history table and delete the entity
+    from the corresponding current-state table.
+    """
     
     name = "DatabaseSink"
+    scope = "fi_shortinterest"
+    db_path = "scraper.db"
     
-    _TABLE_MAP = {
+    topics = {
         "fi.short.aggregate": {
             "table": "short_positions",
             "pk": ["lei"],
@@ -30,6 +28,8 @@ class DatabaseSink(Sink):
                 "latest_position_date",
                 "timestamp",
             ],
+            # timestamp changes on every run; only store real changes
+            "hash": ["company_name", "position_percent", "latest_position_date"],
         },
         "fi.short.aggregate.diff": {
             "table": "short_positions_history",
@@ -43,6 +43,7 @@ class DatabaseSink(Sink):
                 "old_pct",
                 "new_pct",
             ],
+            "delete": {"table": "short_positions", "key": ["lei"]},
         },
         "fi.short.positions": {
             "table": "position_holders",
@@ -56,6 +57,7 @@ class DatabaseSink(Sink):
                 "timestamp",
                 "comment",
             ],
+            "hash": ["position_percent", "position_date", "comment"],
         },
         "fi.short.positions.diff": {
             "table": "position_holders_history", 
@@ -70,178 +72,94 @@ class DatabaseSink(Sink):
                 "old_pct",
                 "new_pct",
             ],
+            "delete": {"table": "position_holders", "key": ["entity_name", "issuer_name", "isin"]},
         },
     }
 
-    def __init__(self, db_path: str = "scraper.db", **kwargs):
-        """Initialize DatabaseSink with configurable database path."""
-        self.db = Database(db_path)
-
-    async def _create_tables(self) -> None:
-        """Create FI short interest tables."""
-        # Create main tables
-        await self.db.execute("""
-            CREATE TABLE IF NOT EXISTS short_positions (
-                lei TEXT PRIMARY KEY,
-                company_name TEXT NOT NULL,
-                position_percent REAL NOT NULL,
-                latest_position_date TEXT,
-                timestamp TEXT NOT NULL
-            )
-        """)
-        
-        await self.db.execute("""
-            CREATE TABLE IF NOT EXISTS position_holders (
-                entity_name TEXT NOT NULL,
-                issuer_name TEXT NOT NULL,
-                isin TEXT NOT NULL,
-                position_percent REAL NOT NULL,
-                position_date TEXT,
-                timestamp TEXT NOT NULL,
-                comment TEXT,
-                PRIMARY KEY (entity_name, issuer_name, isin)
-            )
-        """)
-        
-        # Create history tables
-        await self.db.execute("""
-            CREATE TABLE IF NOT EXISTS short_positions_history (
-                lei TEXT NOT NULL,
-                company_name TEXT NOT NULL,
-                position_percent REAL NOT NULL,
-                latest_position_date TEXT,
-                event_timestamp TEXT NOT NULL,
-                old_pct REAL,
-                new_pct REAL,
-                PRIMARY KEY (lei, event_timestamp)
-            )
-        """)
-        
-        await self.db.execute("""
-            CREATE TABLE IF NOT EXISTS position_holders_history (
-                entity_name TEXT NOT NULL,
-                issuer_name TEXT NOT NULL,
-                isin TEXT NOT NULL,
-                position_percent REAL NOT NULL,
-                position_date TEXT,
-                event_timestamp TEXT NOT NULL,
-                comment TEXT,
-                old_pct REAL,
-                new_pct REAL,
-                PRIMARY KEY (entity_name, issuer_name, isin, event_timestamp)
-            )
-        """)
-        
-        # Create indexes for better performance
-        await self.db.execute("""
-            CREATE INDEX IF NOT EXISTS idx_short_positions_company 
-            ON short_positions(company_name)
-        """)
-        
-        await self.db.execute("""
-            CREATE INDEX IF NOT EXISTS idx_position_holders_issuer 
-            ON position_holders(issuer_name)
-        """)
-        
-        await self.db.execute("""
-            CREATE INDEX IF NOT EXISTS idx_position_holders_timestamp 
-            ON position_holders(timestamp)
-        """)
-
-    async def handle(self, item: ParsedItem) -> None:
-        """Handle a parsed item by upserting to database."""
-        if item.topic not in self._TABLE_MAP:
-            logger.debug(f"No table mapping for topic: {item.topic}")
-            return
-        
-        config = self._TABLE_MAP[item.topic]
-        table = config["table"]
-        columns = config["cols"]
-        pk_columns = config["pk"]
-        
-        # Extract data for the configured columns
-        data = {}
-        for col in columns:
-            value = item.content.get(col)
-            if value is not None:
-                data[col] = value
-        
-        if not data:
-            logger.warning(f"No data to insert for topic: {item.topic}")
-            return
-        
-        try:
-            # Check if this is a removal event (for diff topics)
-            if (item.topic.endswith('.diff') and 
-                item.content.get('removal_detected') and 
-                float(item.content.get('new_pct', 0)) == 0.0):
-                
-                # For removal events, delete from the main table and add to history
-                await self._handle_removal(item, config)
-            else:
-                # Normal upsert operation
-                await self.db.upsert(table, data, pk_columns)
-        except Exception as e:
-            logger.error(f"Failed to handle item for {table}: {e}")
-
-    async def _handle_removal(self, item: ParsedItem, config: Dict) -> None:
-        """Handle removal events by deleting from main table and recording in history."""
-        table = config["table"]
-        columns = config["cols"] 
-        pk_columns = config["pk"]
-        
-        # Always insert into history table
-        data = {}
-        for col in columns:
-            value = item.content.get(col)
-            if value is not None:
-                data[col] = value
-        
-        await self.db.upsert(table, data, pk_columns)
-        logger.info(f"Recorded removal event in {table}")
-        
-        # Determine the main table to delete from based on topic
-        if item.topic == "fi.short.aggregate.diff":
-            main_table = "short_positions"
-            where_clause = "lei = ?"
-            where_params = (item.content.get("lei"),)
-        elif item.topic == "fi.short.positions.diff":
-            main_table = "position_holders"
-            where_clause = "entity_name = ? AND issuer_name = ? AND isin = ?"
-            where_params = (
-                item.content.get("entity_name"),
-                item.content.get("issuer_name"), 
-                item.content.get("isin")
-            )
-        else:
-            logger.warning(f"Unknown removal topic: {item.topic}")
-            return
-        
-        # Delete from main table
-        delete_query = f"DELETE FROM {main_table} WHERE {where_clause}"
-        await self.db.execute(delete_query, where_params)
-        # Ensure the deletion is committed to the database
-        await self.db._connection.commit()
-        logger.info(f"Deleted removed entity from {main_table}: {where_params}")
-
-    async def close(self) -> None:
-        """Close the database connection."""
-        await self.db.close()
-
-    async def __call__(self, items: AsyncIterator[Any]) -> AsyncIterator[None]:
-        """Transform interface: handle ParsedItems and pass them through."""
-        async for item in items:
-            if isinstance(item, ParsedItem):
-                await self.handle(item)
-            # Sinks typically don't yield anything, but we yield None to complete the chain
-            yield None
-
-    async def __aenter__(self):
-        """Async context manager entry."""
-        await self.db.connect()
-        await self._create_tables()
-        return self
-
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit."""
-        await self.close()
+    # Applied once per database file and recorded in schema_migrations.
+    # Append new steps; never edit a step that has shipped.
+    migrations = [
+        Migration(1, "initial schema", [
+            """
+                CREATE TABLE IF NOT EXISTS short_positions (
+                    lei TEXT PRIMARY KEY,
+                    company_name TEXT NOT NULL,
+                    position_percent REAL NOT NULL,
+                    latest_position_date TEXT,
+                    timestamp TEXT NOT NULL
+                )
+            """,
+            """
+                CREATE TABLE IF NOT EXISTS position_holders (
+                    entity_name TEXT NOT NULL,
+                    issuer_name TEXT NOT NULL,
+                    isin TEXT NOT NULL,
+                    position_percent REAL NOT NULL,
+                    position_date TEXT,
+                    timestamp TEXT NOT NULL,
+                    comment TEXT,
+                    PRIMARY KEY (entity_name, issuer_name, isin)
+                )
+            """,
+            """
+                CREATE TABLE IF NOT EXISTS short_positions_history (
+                    lei TEXT NOT NULL,
+                    company_name TEXT NOT NULL,
+                    position_percent REAL NOT NULL,
+                    latest_position_date TEXT,
+                    event_timestamp TEXT NOT NULL,
+                    old_pct REAL,
+                    new_pct REAL,
+                    PRIMARY KEY (lei, event_timestamp)
+                )
+            """,
+            """
+                CREATE TABLE IF NOT EXISTS position_holders_history (
+                    entity_name TEXT NOT NULL,
+                    issuer_name TEXT NOT NULL,
+                    isin TEXT NOT NULL,
+                    position_percent REAL NOT NULL,
+                    position_date TEXT,
+                    event_timestamp TEXT NOT NULL,
+                    comment TEXT,
+                    old_pct REAL,
+                    new_pct REAL,
+                    PRIMARY KEY (entity_name, issuer_name, isin, event_timestamp)
+                )
+            """,
+            """
+                CREATE INDEX IF NOT EXISTS idx_short_positions_company 
+                ON short_positions(company_name)
+            """,
+            """
+                CREATE INDEX IF NOT EXISTS idx_position_holders_issuer 
+                ON position_holders(issuer_name)
+            """,
+            """
+                CREATE INDEX IF NOT EXISTS idx_position_holders_timestamp 
+                ON position_holders(timestamp)
+            """,
+        ]),
+        Migration(2, "history lookup indexes", [
+            # /short looks up one company over a time window
+            """
+                CREATE INDEX IF NOT EXISTS idx_short_positions_history_company_ts
+                ON short_positions_history(company_name, event_timestamp)
+            """,
+            # /hedgeshort scans holder history by time
+            """
+                CREATE INDEX IF NOT EXISTS idx_position_holders_history_ts
+                ON position_holders_history(event_timestamp)
+            """,
+        ]),
+        # full-history views; core.infra.retention rebuilds them over partitions
+        Migration(3, "history views", [
+            "CREATE VIEW IF NOT EXISTS short_positions_history_all AS SELECT * FROM short_positions_history",
+            "CREATE VIEW IF NOT EXISTS position_holders_history_all AS SELECT * FROM position_holders_history",
+        ]),
+        # content digests for TableSink's unchanged-row skipping
+        Migration(4, "row hashes", [
+            "ALTER TABLE short_positions ADD COLUMN row_hash TEXT",
+            "ALTER TABLE position_holders ADD COLUMN row_hash TEXT",
+        ]),
+    ]
@@ -118,9 +118,8 @@ class TcgPlayerPriceHistoryFetcher(Fetcher):
                     # TCGPlayer API endpoint for price history
                     url = f"https://infinite-api.tcgplayer.com/price/history/{product_id}/detailed?range=annual"
                     
-                    # Fetch JSON data as text, then encode to bytes
-                    response_text = await self.http.get_text(url, headers=self.headers)
-                    response_bytes = response_text.encode('utf-8')
+                    # Keep the raw JSON bytes; the parser decodes them once
+                    response_bytes = await self.http.get_bytes(url, headers=self.headers)
                     
                     yield RawItem(
                         source=f"tcgplayer.price_history.{product_id}",
@@ -3,12 +3,12 @@ Parsers for TCGPlayer plugin.
 """
 
 import csv
-import json
 from io import StringIO
 from typing import AsyncIterator, Any, List, Dict
 
 from core.interfaces import Transform
 from core.models import RawItem, ParsedItem
+from core.infra import codec
 
 
 class PokemonSetsParser(Transform):
@@ -92,8 +92,7 @@ class PriceHistoryParser(Transform):
             product_id = raw_item.source.split(".")[-1]
             
             # Parse JSON response
-            json_text = raw_item.payload.decode('utf-8')
-            data = json.loads(json_text)
+            data = codec.loads(raw_item.payload)
             
             parsed_items = []
             
@@ -2,28 +2,11 @@
 Database sink for TCGPlayer plugin.
 """
 
-from typing import Any
-from datetime import datetime
+from core.infra.db import Migration
+from core.infra.table_sink import TableSink
 
-from core.interfaces import Sink
-from core.models import ParsedItem
-from core.infra.db import Database
 
-
-class TcgDatabaseSink(Sink):
-    """Database sink for TCG data persistence."""
-    
-    def __init__(self, db_path: str = "tcg.db"):
-        """Initialize with database path."""
-        self.db_path = db_path
-        self.db = Database(db_path)
-        
-        # Table configurations for different topics
-        self._table_configs = {
-            "tcg.pokemon_sets": {
-                "table": "pokemon_sets",
-                "primary_key": ["set_name"],  # Use set_name as unique identifier
-                "schema": """
+_POKEMON_SETS_SCHEMA = """
                     CREATE TABLE IF NOT EXISTS pokemon_sets (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
                         set_name TEXT NOT NULL UNIQUE,
@@ -35,11 +18,8 @@ class TcgDatabaseSink(Sink):
                         updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                     )
                 """
-            },
-            "tcg.price_history": {
-                "table": "price_history",
-                "primary_key": ["sku_id", "bucket_start_date"],  # Composite key for uniqueness
-                "schema": """
+
+_PRICE_HISTORY_SCHEMA = """
                     CREATE TABLE IF NOT EXISTS price_history (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
                         product_id INTEGER NOT NULL,
@@ -57,50 +37,77 @@ class TcgDatabaseSink(Sink):
                         UNIQUE(sku_id, bucket_start_date)
                     )
                 """
-            }
-        }
-    
-    @property
-    def name(self) -> str:
-        return "TcgDatabaseSink"
-    
-    async def __aenter__(self):
-        """Initialize database connection and create tables."""
-        # Connect to database first
-        await self.db.connect()
-        
-        # Create all tables
-        for topic_config in self._table_configs.values():
-            await self.db.execute(topic_config["schema"])
-        
-        return self
-    
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Clean up database connection."""
-        await self.db.close()
-    
-    async def handle(self, item: ParsedItem) -> None:
-        """Handle a ParsedItem by persisting to database."""
-        if not isinstance(item, ParsedItem):
-            return
-        
-        config = self._table_configs.get(item.topic)
-        if not config:
-            print(f"Warning: No table config found for topic '{item.topic}'")
-            return
-        
-        table_name = config["table"]
-        primary_key = config["primary_key"]
-        data = dict(item.content)  # Make a copy
-        
-        # Add timestamp if not present
-        if item.discovered_at:
-            data["updated_at"] = item.discovered_at.isoformat()
-        else:
-            data["updated_at"] = datetime.now().isoformat()
-        
-        # Use the database upsert method which handles commits
-        try:
-            await self.db.upsert(table_name, data, primary_key)
-        except Exception as e:
-            print(f"Error upserting to {table_name}: {e}")
+
+
+class TcgDatabaseSink(TableSink):
+    """Database sink for TCG data persistence."""
+
+    name = "TcgDatabaseSink"
+    scope = "tcgplayer"
+    db_path = "tcg.db"
+
+    # updated_at is stamped from the item's discovered_at
+    topics = {
+        "tcg.pokemon_sets": {
+            "table": "pokemon_sets",
+            "pk": ["set_name"],  # Use set_name as unique identifier
+            "cols": [
+                "set_name",
+                "release_date",
+                "booster_product_id",
+                "booster_box_product_id",
+                "group_id",
+            ],
+            "stamp": "updated_at",
+            "hash": ["release_date", "booster_product_id", "booster_box_product_id", "group_id"],
+        },
+        "tcg.price_history": {
+            "table": "price_history",
+            "pk": ["sku_id", "bucket_start_date"],  # Composite key for uniqueness
+            "cols": [
+                "product_id",
+                "sku_id",
+                "variant",
+                "language",
+                "condition",
+                "market_price",
+                "quantity_sold",
+                "low_sale_price",
+                "high_sale_price",
+                "bucket_start_date",
+            ],
+            "stamp": "updated_at",
+            # re-fetched buckets are mostly identical; skip them
+            "hash": [
+                "product_id",
+                "variant",
+                "language",
+                "condition",
+                "market_price",
+                "quantity_sold",
+                "low_sale_price",
+                "high_sale_price",
+            ],
+        },
+    }
+
+    # Ordered schema steps; append new ones, never edit shipped steps
+    migrations = [
+        Migration(1, "initial schema", [_POKEMON_SETS_SCHEMA, _PRICE_HISTORY_SCHEMA]),
+        Migration(2, "price history lookup index", [
+            # price lookups filter on product and bucket date, not sku
+            """
+                CREATE INDEX IF NOT EXISTS idx_price_history_product_bucket
+                ON price_history(product_id, bucket_start_date)
+            """,
+        ]),
+        # full-history view; core.infra.retention rebuilds it over partitions
+        Migration(3, "price history view", [
+            "CREATE VIEW IF NOT EXISTS price_history_all AS SELECT * FROM price_history",
+        ]),
+        # content digests for TableSink's unchanged-row skipping
+        Migration(4, "row hashes", [
+            "ALTER TABLE pokemon_sets ADD COLUMN row_hash TEXT",
+            "ALTER TABLE price_history ADD COLUMN row_hash TEXT",
+        ]),
+    ]
@@ -0,0 +1,52 @@
+"""
+Shared fixtures: a throwaway database file, reading it back, and a small TableSink.
+"""
+
+import asyncio
+
+import pytest
+
+from core.infra.db import Database, Migration
+from core.infra.table_sink import TableSink
+
+
+class PriceSink(TableSink):
+    """Prices with a CHECK constraint the database enforces, plus a second topic."""
+
+    name = "TestSink"
+    scope = "test"
+    topics = {
+        "prices": {"table": "prices", "pk": ["sku"], "cols": ["sku", "price"], "hash": ["price"]},
+        "sets": {"table": "sets", "pk": ["name"], "cols": ["name", "size"]},
+    }
+    migrations = [Migration(1, "prices", [
+        "CREATE TABLE prices (sku TEXT PRIMARY KEY, price REAL NOT NULL CHECK (price >= 0), row_hash TEXT)",
+        "CREATE TABLE sets (name TEXT PRIMARY KEY, size INTEGER)",
+    ])]
+
+
+async def _fetch(path, sql):
+    db = Database(path)
+    await db.connect()
+    try:
+        return [tuple(r) for r in await db.fetch_all(sql)]
+    finally:
+        await db.close()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "test.db")
+
+
+@pytest.fixture
+def rows(db_path):
+    """``rows(sql)``: the result of *sql* on ``db_path`` as tuples, read on a fresh connection."""
+    def read(sql, path=db_path):
+        return asyncio.run(_fetch(path, sql))
+    return read
+
+
+@pytest.fixture
+def price_sink():
+    return PriceSink
@@ -0,0 +1,107 @@
+"""
+BufferedWriter group commits: rejected rows, acks, failures and cancellation.
+"""
+
+import asyncio
+import sqlite3
+
+import pytest
+
+from core.infra.db import BufferedWriter, Database
+
+
+async def _database(path):
+    db = Database(path, pooled=True, readers=0)
+    await db.connect()
+    await db.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)")
+    return db
+
+
+def _locked(*_):
+    raise sqlite3.OperationalError("database is locked")
+
+
+async def _hang(*_):
+    await asyncio.Event().wait()
+
+
+def test_writer_isolates_rejected_rows(db_path, rows, price_sink):
+    rejected = []
+
+    async def run():
+        db = Database(db_path, pooled=True, readers=0)
+        await db.connect()
+        await db.migrate("test", price_sink.migrations)
+        writer = BufferedWriter(db, on_reject=lambda table, row, e: rejected.append((table, row["sku"])))
+        await writer.put("prices", {"sku": "a", "price": 1.0}, ["sku"])
+        await writer.put("prices", {"sku": "bad", "price": -1.0}, ["sku"])
+        await writer.put("sets", {"name": "s", "size": 3}, ["name"])
+        await writer.close()
+        await db.close()
+        return writer
+
+    writer = asyncio.run(run())
+
+    assert rejected == [("prices", "bad")]
+    assert (writer.rows_written, writer.rows_rejected) == (2, 1)
+    assert rows("SELECT sku FROM prices") == [("a",)]
+    assert rows("SELECT name FROM sets") == [("s",)]
+
+
+def test_acked_puts_return_after_one_group_commit(db_path):
+    async def run():
+        db = await _database(db_path)
+        writer = BufferedWriter(db, durability="acked", linger=0.01)
+        await asyncio.gather(*(writer.put("t", {"id": i, "v": "x"}, ["id"]) for i in range(5)))
+        committed = (writer.commits, writer.rows_written)
+        await writer.close()
+        await db.close()
+        return committed
+
+    assert asyncio.run(run()) == (1, 5)
+
+
+def test_acked_failure_reaches_every_producer_of_the_batch(db_path, monkeypatch):
+    async def run():
+        db = await _database(db_path)
+        monkeypatch.setattr(db, "_upsert_batches", _locked)
+        writer = BufferedWriter(db, durability="acked", linger=0.01)
+        results = await asyncio.gather(
+            *(writer.put("t", {"id": i}, ["id"]) for i in range(3)), return_exceptions=True
+        )
+        await writer.close()
+        await db.close()
+        return results
+
+    results = asyncio.run(run())
+    assert [type(r) for r in results] == [sqlite3.OperationalError] * 3
+
+
+def test_buffered_failure_is_raised_once(db_path, monkeypatch):
+    async def run():
+        db = await _database(db_path)
+        monkeypatch.setattr(db, "_upsert_batches", _locked)
+        writer = BufferedWriter(db)
+        await writer.put("t", {"id": 1}, ["id"])
+        with pytest.raises(sqlite3.OperationalError):
+            await writer.flush()
+        await writer.close()
+        await db.close()
+
+    asyncio.run(run())
+
+
+def test_cancelled_commit_fails_waiting_producers(db_path, monkeypatch):
+    async def run():
+        db = await _database(db_path)
+        monkeypatch.setattr(db, "_upsert_batches", _hang)
+        writer = BufferedWriter(db, durability="acked", linger=0.01)
+        producers = [asyncio.create_task(writer.put("t", {"id": i}, ["id"])) for i in range(2)]
+        await asyncio.sleep(0.05)
+        writer._task.cancel()
+        results = await asyncio.wait_for(asyncio.gather(*producers, return_exceptions=True), 1.0)
+        await db.close()
+        return results
+
+    results = asyncio.run(run())
+    assert [type(r) for r in results] == [RuntimeError] * 2
@@ -0,0 +1,33 @@
+"""
+Closing a change_bus subscription.
+"""
+
+import asyncio
+
+from core.infra.cdc import ChangeBus
+
+
+def test_close_wakes_waiting_consumers():
+    async def run():
+        sub = ChangeBus().subscribe()
+
+        async def consume():
+            return [event async for event in sub]
+
+        consumers = [asyncio.create_task(consume()) for _ in range(2)]
+        await asyncio.sleep(0)
+        sub.close()
+        return await asyncio.wait_for(asyncio.gather(*consumers), 1.0)
+
+    assert asyncio.run(run()) == [[], []]
+
+
+def test_close_drains_queued_events_first():
+    async def run():
+        sub = ChangeBus().subscribe(maxsize=2)
+        sub._offer("a")
+        sub._offer("b")
+        sub.close()
+        return [event async for event in sub]
+
+    assert asyncio.run(run()) == ["a", "b"]
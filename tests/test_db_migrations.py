@@ -0,0 +1,61 @@
+"""
+Database.migrate: versioned, recorded, all-or-nothing schema steps.
+"""
+
+import asyncio
+import sqlite3
+
+import pytest
+
+from core.infra.db import Database, Migration
+
+_V1 = Migration(1, "items", ["CREATE TABLE items (id INTEGER PRIMARY KEY)"])
+_V2 = Migration(2, "item names", "ALTER TABLE items ADD COLUMN name TEXT")
+
+
+async def _migrate(path, *runs):
+    db = Database(path)
+    await db.connect()
+    try:
+        return [await db.migrate(scope, steps) for scope, steps in runs]
+    finally:
+        await db.close()
+
+
+def test_steps_are_applied_once_and_appended_steps_later(db_path, rows):
+    assert asyncio.run(_migrate(db_path, ("test", [_V1]), ("test", [_V1]))) == [[1], []]
+    assert asyncio.run(_migrate(db_path, ("test", [_V1, _V2]))) == [[2]]
+    assert rows("SELECT scope, version, name FROM schema_migrations ORDER BY version") == [
+        ("test", 1, "items"), ("test", 2, "item names"),
+    ]
+
+
+def test_scopes_are_versioned_independently(db_path):
+    other = Migration(1, "other", ["CREATE TABLE other (id INTEGER)"])
+
+    applied = asyncio.run(_migrate(db_path, ("a", [_V1]), ("b", [other])))
+    assert applied == [[1], [1]]
+
+
+def test_failed_step_rolls_back_the_whole_run(db_path, rows):
+    broken = Migration(2, "broken", ["CREATE TABLE extra (id INTEGER)", "ALTER TABLE nosuch ADD COLUMN x"])
+
+    with pytest.raises(sqlite3.OperationalError):
+        asyncio.run(_migrate(db_path, ("test", [_V1, broken])))
+
+    assert rows("SELECT name FROM sqlite_master WHERE type = 'table' AND name != 'schema_migrations'") == []
+    assert rows("SELECT version FROM schema_migrations") == []
+
+
+def test_versions_must_be_unique_and_ascending(db_path):
+    with pytest.raises(ValueError):
+        asyncio.run(_migrate(db_path, ("test", [_V2, _V1])))
+
+
+def test_concurrent_connections_apply_a_step_once(db_path, rows):
+    async def run():
+        return await asyncio.gather(*(_migrate(db_path, ("test", [_V1])) for _ in range(3)))
+
+    applied = sorted(result for [result] in asyncio.run(run()))
+    assert applied == [[], [], [1]]
+    assert rows("SELECT version FROM schema_migrations") == [(1,)]
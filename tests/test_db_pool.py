@@ -0,0 +1,102 @@
+"""
+Pooled Database instances sharing one writer connection per file.
+"""
+
+import asyncio
+
+import pytest
+
+from core.infra import db as db_module
+from core.infra.db import Database
+
+
+def _writer_for(path):
+    return db_module._WRITERS.get(path.resolve())
+
+
+def test_writer_is_shared_and_closed_with_the_last_instance(tmp_path):
+    path = tmp_path / "p.db"
+
+    async def run():
+        a = Database(str(path), pooled=True, readers=1)
+        b = Database(str(path), pooled=True, readers=1)
+        await a.connect()
+        await b.connect()
+        assert a._writer is b._writer and a._writer.refs == 2
+        writer = a._writer
+        await a.close()
+        assert _writer_for(path) is writer and writer.connection is not None
+        await b.close()
+        return writer
+
+    writer = asyncio.run(run())
+    assert writer.connection is None and _writer_for(path) is None
+
+
+def test_acquire_during_release_keeps_a_single_writer(tmp_path):
+    path = tmp_path / "p.db"
+
+    async def run():
+        a = Database(str(path), pooled=True, readers=0)
+        await a.connect()
+        writer = a._writer
+        # a transaction elsewhere holds the writer while a closes and b opens
+        await writer.lock.acquire()
+        closing = asyncio.create_task(a.close())
+        await asyncio.sleep(0)
+        b = Database(str(path), pooled=True, readers=0)
+        opening = asyncio.create_task(b.connect())
+        await asyncio.sleep(0)
+        writer.lock.release()
+        await asyncio.gather(closing, opening)
+
+        # b reuses the same writer; it was never closed or replaced
+        assert b._writer is writer is _writer_for(path)
+        assert writer.connection is not None and writer.refs == 1
+        await b.execute("CREATE TABLE t (x)")
+        await b.close()
+
+    asyncio.run(run())
+
+
+def test_open_after_retired_writer_gets_a_fresh_one(tmp_path):
+    path = tmp_path / "p.db"
+
+    async def run():
+        a = Database(str(path), pooled=True, readers=0)
+        await a.connect()
+        old = a._writer
+        closing = asyncio.create_task(a.close())
+        await asyncio.sleep(0)
+        b = Database(str(path), pooled=True, readers=0)
+        await b.connect()
+        await closing
+
+        assert b._writer is not old and b._writer is _writer_for(path)
+        assert old.connection is None and b._writer.connection is not None
+        await b.close()
+
+    asyncio.run(run())
+
+
+def test_pooled_execute_outside_transaction_is_not_rolled_back_by_another_instance(tmp_path):
+    path = tmp_path / "p.db"
+
+    async def run():
+        a = Database(str(path), pooled=True, readers=1)
+        b = Database(str(path), pooled=True, readers=1)
+        await a.connect()
+        await b.connect()
+        try:
+            await a.execute("CREATE TABLE t (x)")
+            await a.execute("INSERT INTO t VALUES (1)")
+            with pytest.raises(RuntimeError):
+                async with b.transaction() as conn:
+                    await conn.execute("INSERT INTO t VALUES (2)")
+                    raise RuntimeError("rollback")
+            return [tuple(r) for r in await b.fetch_all("SELECT x FROM t")]
+        finally:
+            await a.close()
+            await b.close()
+
+    assert asyncio.run(run()) == [(1,)]
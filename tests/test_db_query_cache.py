@@ -0,0 +1,68 @@
+"""
+Database query cache: in-process writes invalidate cached reads, views included.
+"""
+
+import asyncio
+
+import pytest
+
+from core.infra.db import Database, Migration
+
+_SCHEMA = Migration(1, "history", [
+    "CREATE TABLE history (id INTEGER PRIMARY KEY, v TEXT)",
+    "CREATE TABLE history_2023 (id INTEGER PRIMARY KEY, v TEXT)",
+    "CREATE VIEW history_all AS SELECT * FROM history UNION ALL SELECT * FROM history_2023",
+])
+
+
+async def _open(path, pooled):
+    db = Database(path, pooled=pooled, readers=2, query_cache=16)
+    await db.connect()
+    await db.migrate("test", [_SCHEMA])
+    return db
+
+
+@pytest.mark.parametrize("pooled", [False, True])
+def test_write_is_seen_through_view(db_path, pooled):
+    async def run():
+        db = await _open(db_path, pooled)
+        try:
+            sql = "SELECT id, v FROM history_all ORDER BY id"
+            assert await db.fetch_all(sql) == []
+            assert await db.fetch_all(sql) == []
+            hits = db.cache_hits
+
+            await db.upsert("history_2023", {"id": 1, "v": "old"}, ["id"])
+            assert [tuple(r) for r in await db.fetch_all(sql)] == [(1, "old")]
+
+            await db.upsert("history", {"id": 2, "v": "new"}, ["id"])
+            assert [tuple(r) for r in await db.fetch_all(sql)] == [(1, "old"), (2, "new")]
+            return hits
+        finally:
+            await db.close()
+
+    assert asyncio.run(run()) == 1
+
+
+def test_redefined_view_is_expanded_again(db_path):
+    async def run():
+        db = await _open(db_path, True)
+        try:
+            sql = "SELECT count(*) FROM history_all"
+            assert (await db.fetch_one(sql))[0] == 0
+
+            # retention re-creates the view over a new partition
+            async with db.transaction():
+                await db.execute("CREATE TABLE history_2022 (id INTEGER PRIMARY KEY, v TEXT)")
+                await db.execute("DROP VIEW history_all")
+                await db.execute(
+                    "CREATE VIEW history_all AS SELECT * FROM history UNION ALL SELECT * FROM history_2022"
+                )
+            assert (await db.fetch_one(sql))[0] == 0
+
+            await db.upsert("history_2022", {"id": 1, "v": "older"}, ["id"])
+            return (await db.fetch_one(sql))[0]
+        finally:
+            await db.close()
+
+    assert asyncio.run(run()) == 1
@@ -0,0 +1,71 @@
+"""
+DiffParser state snapshots: partitioned history and shared preloads.
+"""
+
+import asyncio
+
+from core.infra.db import Database
+from core.infra.diff import DiffParser
+from core.infra.retention import rebuild_view
+from core.models import ParsedItem
+
+_SPEC = {
+    "state": "metrics",
+    "key": ["app_id"],
+    "compare": {"downloads": 0},
+    "latest": "scrape_date",
+    "forward": "changed",
+}
+
+
+async def _seed(path):
+    db = Database(path)
+    await db.connect()
+    await db.execute("CREATE TABLE metrics (app_id TEXT, scrape_date TEXT, downloads INTEGER)")
+    await db.execute("CREATE TABLE metrics__p2024_01 (app_id TEXT, scrape_date TEXT, downloads INTEGER)")
+    await db.execute("INSERT INTO metrics__p2024_01 VALUES ('a', '2024-01-05', 10), ('b', '2024-01-05', 5)")
+    await db.execute("INSERT INTO metrics VALUES ('b', '2024-06-01', 7)")
+    await rebuild_view(db, "metrics")
+    await db.close()
+
+
+async def _diff(path, items):
+    async def source():
+        for item in items:
+            yield item
+
+    async with DiffParser(db_path=path, topics={"m": _SPEC, "n": _SPEC}) as parser:
+        queries = []
+        iterate = parser.db.iterate
+
+        def counting(sql, *args, **kwargs):
+            queries.append(sql)
+            return iterate(sql, *args, **kwargs)
+
+        parser.db.iterate = counting
+        out = [(item.topic, item.content["app_id"]) async for item in parser(source())]
+    return out, queries
+
+
+def test_partitioned_rows_count_as_stored(db_path):
+    asyncio.run(_seed(db_path))
+    items = [
+        ParsedItem(topic="m", content={"app_id": "a", "downloads": 10}),  # only in a partition
+        ParsedItem(topic="m", content={"app_id": "b", "downloads": 7}),   # newest row is hot
+        ParsedItem(topic="m", content={"app_id": "c", "downloads": 1}),
+    ]
+
+    out, _ = asyncio.run(_diff(db_path, items))
+    assert out == [("m", "c")]
+
+
+def test_topics_with_the_same_state_share_one_preload(db_path):
+    asyncio.run(_seed(db_path))
+    items = [
+        ParsedItem(topic="m", content={"app_id": "a", "downloads": 11}),
+        ParsedItem(topic="n", content={"app_id": "b", "downloads": 5}),
+    ]
+
+    out, queries = asyncio.run(_diff(db_path, items))
+    assert out == [("m", "a"), ("n", "b")]
+    assert len(queries) == 1 and "metrics_all" in queries[0]
@@ -0,0 +1,132 @@
+"""
+/short against a seeded fi_shortinterest database.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("discord")
+pytest.importorskip("matplotlib")
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+from core.infra.db import Database
+from core.infra.retention import RetentionManager, RetentionPolicy
+from core.models import ParsedItem
+from plugins.fi_shortinterest.discord import FiShortInterestDiscordCommands
+from plugins.fi_shortinterest.sinks import DatabaseSink
+
+
+class _Tree:
+    def __init__(self):
+        self.commands = {}
+
+    def command(self, name, **_):
+        def register(fn):
+            self.commands[name] = fn
+            return fn
+        return register
+
+
+class _Bot:
+    def __init__(self, db):
+        self.tree = _Tree()
+        self.fi_short_db = db
+
+
+class _Response:
+    async def defer(self, **_):
+        pass
+
+
+class _Followup:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, content=None, **kwargs):
+        self.sent.append((content, kwargs))
+
+
+class _Interaction:
+    def __init__(self):
+        self.response = _Response()
+        self.followup = _Followup()
+
+
+async def _seed(db_path, company="Acme AB", days_ago=(20, 10, 1)):
+    now = datetime.utcnow()
+    async with DatabaseSink(db_path) as sink:
+        for days, pct in zip(days_ago, (1.2, 1.5, 1.75)):
+            stamp = now - timedelta(days=days)
+            await sink.handle(ParsedItem(
+                topic="fi.short.aggregate.diff",
+                content={
+                    "lei": company,
+                    "company_name": company,
+                    "position_percent": pct,
+                    "latest_position_date": stamp.date().isoformat(),
+                    "event_timestamp": stamp.strftime("%Y-%m-%d %H:%M:%S"),
+                },
+                discovered_at=stamp,
+            ))
+
+
+async def _short(db_path, company):
+    db = Database(db_path, pooled=True, readers=1)
+    await db.connect()
+    try:
+        bot = _Bot(db)
+        FiShortInterestDiscordCommands().register(bot)
+        interaction = _Interaction()
+        await bot.tree.commands["short"](interaction, company)
+        return interaction.followup.sent
+    finally:
+        await db.close()
+
+
+def test_short_plots_seeded_history(tmp_path):
+    db_path = str(tmp_path / "fi.db")
+    asyncio.run(_seed(db_path))
+
+    sent = asyncio.run(_short(db_path, "acme"))
+
+    assert len(sent) == 1
+    content, kwargs = sent[0]
+    assert content.startswith("Company: Acme AB, 1.75% total shorted")
+    assert kwargs["file"].filename == "plot.png"
+
+
+def test_short_unknown_company(tmp_path):
+    db_path = str(tmp_path / "fi.db")
+    asyncio.run(_seed(db_path))
+
+    sent = asyncio.run(_short(db_path, "nosuch"))
+
+    assert sent == [("Kan inte hitta någon blankning för nosuch.", {})]
+
+
+async def _partition_history(db_path, tmp_path):
+    db = Database(db_path, pooled=True, readers=1)
+    await db.connect()
+    try:
+        policy = RetentionPolicy(
+            db_path=db_path, table="short_positions_history", time_column="event_timestamp", hot_months=1
+        )
+        await RetentionManager(db, policy, tmp_path).run()
+    finally:
+        await db.close()
+
+
+def test_short_finds_company_with_partitioned_history(tmp_path):
+    db_path = str(tmp_path / "fi.db")
+    asyncio.run(_seed(db_path, company="Old AB", days_ago=(400, 300, 200)))
+    asyncio.run(_partition_history(db_path, tmp_path))
+
+    sent = asyncio.run(_short(db_path, "old"))
+
+    # the name resolves through the partitions; there is just nothing in the window
+    assert sent == [("Company: Old AB, no data available.", {})]
@@ -0,0 +1,61 @@
+"""
+FingerprintFilter only records payloads whose rows all reached the database.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from core.infra.db import query_stats
+from core.infra.fingerprint import FingerprintFilter
+from core.models import ParsedItem, RawItem
+
+
+@pytest.fixture
+def run(tmp_path, db_path, price_sink):
+    def run(prices):
+        return asyncio.run(_run(str(tmp_path / "fp.db"), lambda: price_sink(db_path), prices))
+    return run
+
+
+async def _run(fp_path, make_sink, prices):
+    """One run: fetch -> fingerprint filter -> parse -> sink; the sources that got through."""
+    raw = RawItem(source="prices", payload=json.dumps(prices).encode())
+
+    async def fetched():
+        yield raw
+
+    passed = []
+    async with FingerprintFilter(db_path=fp_path) as fp:
+        async with make_sink() as sink:
+            async for item in fp(fetched()):
+                passed.append(item.source)
+                for sku, price in json.loads(item.payload).items():
+                    await sink.handle(ParsedItem(topic="prices", content={"sku": sku, "price": price}))
+    return passed
+
+
+def test_rejected_rows_keep_the_payload_unrecorded(run):
+    query_stats.reset()
+    bad = {"a": 1.0, "b": -1.0}
+
+    assert run(bad) == ["prices"]
+    # a row was lost, so the same payload is processed again
+    assert run(bad) == ["prices"]
+
+
+def test_clean_run_records_the_payload(run):
+    query_stats.reset()
+    good = {"a": 1.0, "b": 2.0}
+
+    assert run(good) == ["prices"]
+    assert run(good) == []
+
+
+def test_uncoercible_rows_keep_the_payload_unrecorded(run):
+    query_stats.reset()
+    bad = {"a": 1.0, "b": "n/a"}
+
+    assert run(bad) == ["prices"]
+    assert run(bad) == ["prices"]
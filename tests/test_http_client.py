@@ -0,0 +1,113 @@
+"""
+HttpClient against a local aiohttp server.
+"""
+
+import asyncio
+
+import pytest
+from aiohttp import ClientResponseError, web
+
+from core.infra.http import HttpClient, RetryBudget, http_stats, retry_budget_scope
+
+
+async def _serve(handler, run):
+    app = web.Application()
+    app.router.add_get("/", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        return await run(f"127.0.0.1:{port}")
+    finally:
+        await runner.cleanup()
+
+
+def test_hedges_do_not_count_as_requests_or_credit_the_retry_budget():
+    http_stats.reset()
+    calls = {"n": 0}
+
+    async def handler(request):
+        calls["n"] += 1
+        # every 5th request stalls long enough to be hedged
+        await asyncio.sleep(0.5 if calls["n"] % 5 == 0 else 0.001)
+        return web.json_response({})
+
+    async def run(host):
+        budget = RetryBudget(ratio=1.0, min_retries=0)
+        with retry_budget_scope(budget):
+            async with HttpClient(hedge_percentile=0.5, hedge_min_samples=3) as client:
+                for _ in range(30):
+                    await client.get_json(f"http://{host}/", hedge=True)
+        return host, budget
+
+    host, budget = asyncio.run(_serve(handler, run))
+    stats = http_stats.snapshot()["-"][host]
+
+    assert stats["hedges"] > 0
+    assert stats["requests"] == stats["attempts"] == budget.requests == 30
+
+
+def test_hedge_delay_ignores_backoff():
+    http_stats.reset()
+    calls = {"n": 0}
+
+    async def handler(request):
+        calls["n"] += 1
+        if calls["n"] % 2:
+            return web.Response(status=503)
+        return web.json_response({})
+
+    async def run(host):
+        async with HttpClient(base_delay=0.2, max_delay=0.2, circuit_breaker=False) as client:
+            for _ in range(3):
+                await client.get_json(f"http://{host}/")
+        return host
+
+    host = asyncio.run(_serve(handler, run))
+
+    # each request slept 0.2s+ before its retry; per-attempt latencies don't include that
+    assert http_stats.snapshot()["-"][host]["timings"]["total"]["avg"] > 0.2
+    assert max(http_stats.latencies(host)) < 0.2
+
+
+def test_non_retryable_status_does_not_spend_the_retry_budget():
+    async def handler(request):
+        return web.Response(status=404)
+
+    async def run(host):
+        budget = RetryBudget(ratio=0.0, min_retries=1, max_retries=1)
+        with retry_budget_scope(budget):
+            async with HttpClient(max_retries=3, base_delay=0.001, circuit_breaker=False) as client:
+                with pytest.raises(ClientResponseError):
+                    await client.get_json(f"http://{host}/")
+        return budget
+
+    budget = asyncio.run(_serve(handler, run))
+    assert (budget.retries, budget.denied) == (0, 0)
+
+
+def test_retryable_status_spends_the_retry_budget():
+    async def handler(request):
+        return web.Response(status=503)
+
+    async def run(host):
+        budget = RetryBudget(ratio=0.0, min_retries=1, max_retries=1)
+        with retry_budget_scope(budget):
+            async with HttpClient(max_retries=3, base_delay=0.001, circuit_breaker=False) as client:
+                with pytest.raises(ClientResponseError):
+                    await client.get_json(f"http://{host}/")
+        return budget
+
+    budget = asyncio.run(_serve(handler, run))
+    assert (budget.retries, budget.denied) == (1, 1)
+
+
+def test_hedging_a_non_get_request_is_rejected():
+    async def run():
+        async with HttpClient() as client:
+            await client.post_json("http://127.0.0.1:9/", {}, hedge=True)
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())
@@ -0,0 +1,103 @@
+"""
+History retention: cold rows move into partitions behind <table>_all, old ones to Parquet.
+"""
+
+import asyncio
+from datetime import date
+
+import pytest
+
+from core.infra.db import Database
+from core.infra.retention import RetentionManager, RetentionPolicy, next_period
+
+TODAY = date(2024, 6, 15)
+
+_HISTORY = [
+    (1, "2024-01-10T08:00:00", 1.0),
+    (2, "2024-02-03T08:00:00", 2.0),
+    (3, "2024-02-28T23:59:59", 3.0),
+    (4, "2024-05-20T08:00:00", 4.0),
+]
+
+
+async def _seed(path):
+    db = Database(path)
+    await db.connect()
+    try:
+        await db.execute("CREATE TABLE history (id INTEGER PRIMARY KEY, ts TEXT NOT NULL, v REAL)")
+        for row in _HISTORY:
+            await db.execute("INSERT INTO history VALUES (?, ?, ?)", row)
+        await db.commit()
+    finally:
+        await db.close()
+
+
+async def _retain(path, archive_dir, before=None, **policy):
+    db = Database(path, pooled=True, readers=1)
+    await db.connect()
+    try:
+        if before is not None:
+            await db.execute(before)
+        manager = RetentionManager(
+            db, RetentionPolicy(db_path=path, table="history", time_column="ts", **policy), archive_dir
+        )
+        return await manager.run(TODAY)
+    finally:
+        await db.close()
+
+
+def test_periods():
+    policy = RetentionPolicy(db_path="x.db", table="t", time_column="ts")
+    assert policy.cutoff(3, TODAY) == "2024-03"
+    assert policy.cutoff(6, TODAY) == "2023-12"
+    assert next_period("2024-12") == "2025-01"
+    assert next_period("2024") == "2025"
+    assert RetentionPolicy(db_path="x.db", table="t", time_column="ts", partition="year").cutoff(6, TODAY) == "2023"
+
+
+def test_cold_rows_move_into_partitions_behind_the_view(db_path, rows, tmp_path):
+    asyncio.run(_seed(db_path))
+
+    summary = asyncio.run(_retain(db_path, tmp_path, hot_months=3))
+
+    assert summary["moved"] == {"2024-01": 1, "2024-02": 2}
+    assert rows("SELECT id FROM history") == [(4,)]
+    assert rows("SELECT id FROM history__p2024_02 ORDER BY id") == [(2,), (3,)]
+    assert rows("SELECT id, ts, v FROM history_all ORDER BY id") == _HISTORY
+
+    # a second run finds nothing left to move
+    assert asyncio.run(_retain(db_path, tmp_path, hot_months=3))["moved"] == {}
+
+
+def test_partitions_predating_a_new_column_read_null_through_the_view(db_path, rows, tmp_path):
+    asyncio.run(_seed(db_path))
+    asyncio.run(_retain(db_path, tmp_path, hot_months=3))
+
+    asyncio.run(_retain(db_path, tmp_path, before="ALTER TABLE history ADD COLUMN note TEXT", hot_months=3))
+
+    assert rows("SELECT id, note FROM history_all ORDER BY id") == [(1, None), (2, None), (3, None), (4, None)]
+
+
+def test_old_partitions_are_archived_to_parquet_and_dropped(db_path, rows, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    asyncio.run(_seed(db_path))
+
+    summary = asyncio.run(_retain(db_path, tmp_path / "archive", hot_months=3, archive_after_months=4))
+
+    assert summary["archived"] == ["2024-01"]
+    assert rows("SELECT id FROM history_all ORDER BY id") == [(2,), (3,), (4,)]
+    archived = pq.read_table(tmp_path / "archive" / "test" / "history" / "2024-01.parquet")
+    assert archived.to_pylist() == [{"id": 1, "ts": "2024-01-10T08:00:00", "v": 1.0}]
+
+
+def test_expired_partitions_and_archives_are_dropped(db_path, rows, tmp_path):
+    asyncio.run(_seed(db_path))
+    archive = tmp_path / "archive" / "test" / "history"
+    archive.mkdir(parents=True)
+    (archive / "2023-11.parquet").write_bytes(b"")
+
+    summary = asyncio.run(_retain(db_path, tmp_path / "archive", hot_months=3, drop_after_months=4))
+
+    assert sorted(summary["dropped"]) == ["2023-11", "2024-01"]
+    assert not (archive / "2023-11.parquet").exists()
+    assert rows("SELECT id FROM history_all ORDER BY id") == [(2,), (3,), (4,)]
@@ -0,0 +1,41 @@
+"""
+Rows the database rejects inside a TableSink's group commit.
+"""
+
+import asyncio
+
+from core.infra.db import query_stats
+from core.models import ParsedItem
+
+
+def _price(sku, price):
+    return ParsedItem(topic="prices", content={"sku": sku, "price": price})
+
+
+def test_sink_counts_rejects_per_topic_and_keeps_hash_index_committed(db_path, price_sink):
+    query_stats.reset()
+
+    async def run(items):
+        async with price_sink(db_path) as sink:
+            for item in items:
+                await sink.handle(item)
+            await sink.writer.flush()
+            index = dict(await sink._hash_index(sink._plans["prices"]))
+        return sink.counters, index
+
+    counters, index = asyncio.run(run([
+        _price("a", 1.0),
+        _price("b", -2.0),
+        ParsedItem(topic="sets", content={"name": "s", "size": 3}),
+    ]))
+
+    assert counters["prices"]["written"] == 1
+    assert counters["prices"]["failed"] == 1
+    assert counters["sets"]["written"] == 1
+    assert set(index) == {("a",)}
+    assert query_stats.dropped() == 1
+
+    # the rejected key is not treated as unchanged on the next run
+    counters, _ = asyncio.run(run([_price("a", 1.0), _price("b", 2.0)]))
+    assert counters["prices"]["unchanged"] == 1
+    assert counters["prices"]["written"] == 1